@@ -1,10 +1,13 @@
 from flask import request, jsonify, render_template, session, redirect
 from tasks import flask_app, sync_process_webhook, sync_process_neynar_webhook
 
+import asyncio
 import logging
 import os
+import hmac
 import time
 import secrets
+from functools import wraps
 
 from helpers.utils import *
 from helpers.llm_helpers import *
@@ -13,6 +16,9 @@ from helpers.farcaster_helpers import *
 from helpers.twitter_helpers import *
 from helpers.wallet_analysis import *
 from helpers.opensea_helpers import *
+from helpers.webhook_dedupe_helpers import *
+from helpers.simplehash_client import simplehash
+from helpers.artwork_analysis_codec import load_record_columns
 
 from dotenv import load_dotenv
 
@@ -28,10 +34,6 @@ logger = logging.getLogger(__name__)
 
 from functools import lru_cache
 
-# Authentication cache
-auth_cache = {}
-AUTH_CACHE_EXPIRY = 300  # 5 minutes
-
 # Store verification codes with expiration
 verification_codes = {}
 VERIFICATION_CODE_EXPIRY = 300  # 5 minutes
@@ -39,12 +41,9 @@ VERIFICATION_CODE_EXPIRY = 300  # 5 minutes
 @lru_cache(maxsize=1)
 def get_cached_analyses(timestamp):
     recent_nft_scores = get_recent_nft_scores(n=50, start_timestamp=timestamp)
-    # Parse the analysis_text JSON string for each score
     for score in recent_nft_scores:
-        if score.get('analysis_text'):
-            score['analysis_text'] = json.loads(score['analysis_text'])
-        if score.get('scores'):
-            score['scores'] = json.loads(score['scores'])
+        load_record_columns(score)
+        score['total_score'] = get_current_total_score(score)
     return recent_nft_scores
 
 @flask_app.route('/analyses-24-hours')
@@ -123,7 +122,7 @@ def opinion():
     return render_template('opinion.html')
 
 @flask_app.route('/roast', methods=['POST', 'GET'])
-def roast():
+async def roast():
     wallet = None
     wallet_analysis = None
     message = None
@@ -202,7 +201,7 @@ def roast():
                 os.remove(response["temp_image_path"])
 
                 print("Generating roast for wallet: ", wallet, "with tone: ", tone)
-                analysis = get_wallet_analysis_response(wallet_data, response["base64_image"], tone, current_valuation)
+                analysis = await get_wallet_analysis_response(wallet_data, response["base64_image"], tone, current_valuation)
                 image_urls = response["image_urls"]
 
                 save_wallet_analysis(wallet_data, analysis, type="roast", tone=tone)
@@ -229,10 +228,9 @@ def get_current_valuation():
 @flask_app.route('/')
 def home():
     recent_nft_scores = get_recent_nft_scores()
-    # Parse the analysis_text JSON string for each score
     for score in recent_nft_scores:
-        if score.get('analysis_text'):
-            score['analysis_text'] = json.loads(score['analysis_text'])
+        load_record_columns(score)
+        score['total_score'] = get_current_total_score(score)
     return render_template('main.html', recent_nft_scores=recent_nft_scores)
 
 @flask_app.route('/gallery')
@@ -248,11 +246,8 @@ def gallery():
             unique_nft_scores.append(score)
     gallery_nft_scores = unique_nft_scores
     for score in gallery_nft_scores:
-        if score.get('analysis_text'):
-            score['analysis_text'] = json.loads(score['analysis_text'])
-        if score.get('scores'):
-            score['scores'] = json.loads(score['scores'])
-        score['total_score'] = sum(score['scores'].values()) if score.get('scores') else 0
+        load_record_columns(score)
+        score['total_score'] = get_current_total_score(score) or 0
 
     # Sort the gallery_nft_scores based on the sort_by parameter
     if sort_by == 'total_score':
@@ -300,7 +295,32 @@ async def wallet_webhook():
         logger.info(f"Received webhook callback: {webhook_data}")
         timestamp = datetime.now().isoformat()
 
-        sync_process_webhook.delay(webhook_data)
+        # Alchemy redelivers on retries, only enqueue transfers we haven't seen.
+        # If Redis is down, process the delivery without dedupe rather than drop it.
+        claimed_keys = []
+        try:
+            deduped_webhook_data, claimed_keys = dedupe_webhook_activities(webhook_data)
+        except Exception as e:
+            logger.error(f"Error deduping webhook, processing it as is: {str(e)}")
+            deduped_webhook_data = webhook_data
+
+        if deduped_webhook_data is None:
+            logger.info("Skipping webhook - all transfers already received")
+            return jsonify({
+                'status': 'success',
+                'message': 'Duplicate webhook ignored',
+                'timestamp': timestamp
+            }), 200
+
+        try:
+            sync_process_webhook.delay(deduped_webhook_data)
+        except Exception:
+            # Let Alchemy's retry claim these transfers again
+            try:
+                release_transfers(claimed_keys)
+            except Exception as e:
+                logger.error(f"Error releasing webhook dedupe keys: {str(e)}")
+            raise
 
         # Return success response
         return jsonify({
@@ -318,6 +338,55 @@ async def wallet_webhook():
         }), 500
 
 
+def require_stats_secret(view):
+    """
+    Only serve the stats endpoints to requests with
+    "Authorization: Bearer <STATS_ENDPOINT_SECRET>". Without the secret set they are off.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        secret = os.getenv('STATS_ENDPOINT_SECRET')
+        token = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not secret or not hmac.compare_digest(token, secret):
+            return jsonify({'error': 'Unauthorized'}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@flask_app.route('/webhook-dedupe-stats')
+@require_stats_secret
+def webhook_dedupe_stats():
+    try:
+        return jsonify(get_webhook_dedupe_stats())
+    except Exception as e:
+        logger.error(f"Error fetching webhook dedupe stats: {str(e)}")
+        return jsonify({'error': 'Unable to fetch webhook dedupe stats'}), 500
+
+
+@flask_app.route('/simplehash-stats')
+@require_stats_secret
+def simplehash_stats():
+    # Metrics are per process, so this covers the web server's own calls
+    return jsonify(simplehash.get_metrics())
+
+
+@flask_app.route('/supabase-session-stats')
+@require_stats_secret
+def supabase_session_stats():
+    # Per process, like /simplehash-stats
+    return jsonify(supabase_session.get_stats())
+
+
+@flask_app.route('/nft-metadata-cache-stats')
+@require_stats_secret
+def nft_metadata_cache_stats():
+    try:
+        return jsonify(get_nft_metadata_cache_stats())
+    except Exception as e:
+        logger.error(f"Error fetching NFT metadata cache stats: {str(e)}")
+        return jsonify({'error': 'Unable to fetch NFT metadata cache stats'}), 500
+
+
 @flask_app.route('/neynar-webhook', methods=['POST'])
 async def neynar_webhook():
     try:
@@ -367,22 +436,12 @@ def chat_with_artto():
     return render_template('chat_with_artto.html')
 
 def is_user_authenticated(wallet):
-    current_time = time.time()
-    if wallet in auth_cache:
-        cached_status, expiry_time = auth_cache[wallet]
-        if current_time < expiry_time:
-            return cached_status
-
     if not wallet:
         return False
     
+    # get_artto_balance is cached across workers for ARTTO_BALANCE_CACHE_TTL
     artto_balance = get_artto_balance(wallet)
-    is_authenticated = artto_balance >= 10000  # Requiring a minimum balance of 10,000 $ARTTO
-    
-    # Cache the result
-    auth_cache[wallet] = (is_authenticated, current_time + AUTH_CACHE_EXPIRY)
-    
-    return is_authenticated
+    return artto_balance >= 10000  # Requiring a minimum balance of 10,000 $ARTTO
 
 @flask_app.route('/chat', methods=['POST'])
 async def chat():
@@ -394,7 +453,8 @@ async def chat():
         if not wallet:
             return jsonify({"error": "Wallet address is required"}), 400
 
-        if not is_user_authenticated(wallet):
+        # The cached balance lookup can block while another worker fetches it
+        if not await asyncio.to_thread(is_user_authenticated, wallet):
             return jsonify({"error": "Insufficient $ARTTO balance or unauthorized wallet"}), 403
 
         if messages:
@@ -5,9 +5,14 @@ from helpers.twitter_helpers import *
 from helpers.coinbase_helpers import *
 from helpers.artto_actions_helpers import *
 from helpers.openrouter_helpers import *
+from helpers.concurrency_helpers import *
+from helpers.batch_scoring_helpers import *
+from helpers.rescoring_helpers import *
+from helpers.weight_backtest_helpers import backtest_weight_batches
 
 import time
 import random
+import asyncio
 
 from dotenv import load_dotenv
 
@@ -65,40 +70,84 @@ async def generate_memory():
         since_timestamp=one_day_ago_utc_iso,
         max_results=100
     )
-    summary = get_summarize_seen_posts(json.dumps(seen_posts, indent=2))
+    summary = await get_summarize_seen_posts(json.dumps(seen_posts, indent=2))
 
     # Get previous memory or None if no memories exist
     previous_memory = get_latest_memory()
 
-    memory = get_generate_memory(latest_taste_profile, formatted_top_collections, nft_batch, summary, hoa_reports_text, previous_memory)
+    memory = await get_generate_memory(latest_taste_profile, formatted_top_collections, nft_batch, summary, hoa_reports_text, previous_memory)
 
     insert_memory(memory)
 
     return memory
 
 
-async def analyze_nfts_in_discovery():
-    nfts = get_unprocessed_nfts(max_amount=10)
+async def iter_unprocessed_nft_pages(page_size=SIMPLEHASH_ASSETS_BATCH_SIZE):
+    # Pages by (timestamp, id) rather than offset, since rows leave the
+    # unprocessed set while the pipeline is still running
+    before_timestamp = None
+    before_id = None
+    while True:
+        nfts = await asyncio.to_thread(get_unprocessed_nfts, page_size, before_timestamp, before_id)
+        if not nfts:
+            return
+        yield nfts
+        before_timestamp = nfts[-1]['timestamp']
+        before_id = nfts[-1]['id']
+
+
+async def analyze_nfts_in_discovery(
+    analysis_concurrency=int(os.getenv('DISCOVERY_ANALYSIS_CONCURRENCY', 4)),
+    store_concurrency=int(os.getenv('DISCOVERY_STORE_CONCURRENCY', 4)),
+    llm_calls_per_minute=int(os.getenv('DISCOVERY_LLM_CALLS_PER_MINUTE', 20))
+):
+    # Drains the whole unprocessed backlog through an analysis -> store pipeline,
+    # with vision calls held to llm_calls_per_minute. Metadata is fetched a page
+    # at a time, one nfts/assets request per page.
+    llm_rate_limiter = AsyncRateLimiter(llm_calls_per_minute, period=60)
+    processed_count = 0
+
+    def mark_error(nft, e):
+        print(f"Error analyzing NFT: {str(e)}")
+        update_nft_processed_status(nft['network'], nft['contract_address'], nft['token_id'], "error")
+
+    async def iter_nfts_with_metadata():
+        async for page in iter_unprocessed_nft_pages():
+            try:
+                nfts_by_id, failed_ids = await fetch_nfts_by_ids_async([
+                    get_nft_id(nft['network'], nft['contract_address'], nft['token_id']) for nft in page
+                ])
+            except Exception as e:
+                # Leave the page unprocessed, the next run retries it
+                print(f"Error fetching metadata for discovery page: {str(e)}")
+                continue
+            failed_ids = set(failed_ids)
+            for nft in page:
+                nft_id = get_nft_id(nft['network'], nft['contract_address'], nft['token_id'])
+                if nft_id in failed_ids:
+                    continue
+                nft_data = nfts_by_id.get(nft_id)
+                if nft_data is None:
+                    # SimpleHash answered without this NFT
+                    await asyncio.to_thread(mark_error, nft, ValueError("No metadata returned"))
+                    continue
+                yield (nft, filter_nft_metadata(nft_data))
+            if failed_ids:
+                print(f"Leaving {len(failed_ids)} discovered NFTs for the next run, their metadata request failed")
 
-    # Filter out duplicates by contract address
-    seen_contracts = set()
-    unique_nfts = []
-    
-    for nft in nfts:
-        if nft['contract_address'] not in seen_contracts:
-            seen_contracts.add(nft['contract_address'])
-            unique_nfts.append(nft)
-    
-    nfts = unique_nfts
-    print(f"Got {len(nfts)} NFTs to analyze")
-    for nft in nfts:
+    async def analyze(item):
+        nft, metadata = item
         try:
-            response = await get_artwork_analysis_and_metadata(nft['network'], nft['contract_address'], nft['token_id'])
-            artwork_analysis = response["artwork_analysis"]
-            metadata = response["metadata"]
+            artwork_analysis = await get_artwork_analysis(metadata, llm_rate_limiter)
             print(artwork_analysis)
-            print(metadata)
+            return (nft, metadata, artwork_analysis)
+        except Exception as e:
+            await asyncio.to_thread(mark_error, nft, e)
 
+    async def store(item):
+        nonlocal processed_count
+        nft, metadata, artwork_analysis = item
+        try:
             nft_details = {
                 "artwork_analysis": artwork_analysis,
                 "image_small_url": metadata["image_small_url"],
@@ -109,12 +158,44 @@ async def analyze_nfts_in_discovery():
             }
 
             score_details = await get_total_score(artwork_analysis, nft_details)
-            store_nft_scores(nft_details, score_details)
-            update_nft_processed_status(nft['network'], nft['contract_address'], nft['token_id'])
+            await asyncio.to_thread(store_nft_scores, nft_details, score_details)
+            await asyncio.to_thread(update_nft_processed_status, nft['network'], nft['contract_address'], nft['token_id'])
+            processed_count += 1
         except Exception as e:
-            print(f"Error analyzing NFT: {str(e)}")
-            update_nft_processed_status(nft['network'], nft['contract_address'], nft['token_id'], "error")
-            continue
+            await asyncio.to_thread(mark_error, nft, e)
+
+    await run_pipeline(iter_nfts_with_metadata(), [
+        (analyze, analysis_concurrency),
+        (store, store_concurrency),
+    ])
+    print(f"Analyzed {processed_count} NFTs from discovery")
+
+
+async def index_image_hashes(max_amount=100):
+    # Backfill perceptual hashes for analyses stored before the hash index existed
+    image_urls = get_unhashed_image_urls(max_amount=max_amount)
+    print(f"Got {len(image_urls)} images to hash")
+    for image_url in image_urls:
+        image_hashes = await get_image_hashes(image_url)
+        if image_hashes:
+            set_image_hash(image_url, image_hashes["phash"], image_hashes["dhash"])
+
+
+async def refresh_top_collections(time_period='30d'):
+    # Saved to Redis, every process picks the list up within REFERENCE_DATA_REFRESH_INTERVAL
+    top_collections = await get_top_collections(time_period)
+    if not top_collections or not top_collections.get('collections'):
+        print("No top collections returned, keeping the current list")
+        return
+    save_top_collections(top_collections)
+    print(f"Saved {len(top_collections['collections'])} top collections")
+
+
+async def prefill_ens_cache():
+    # Known senders get replies and final decisions, so resolve their names ahead of time
+    senders = get_unique_nft_senders()
+    looked_up = await asyncio.to_thread(prefill_ens_names, senders)
+    print(f"Looked up ENS names for {looked_up} of {len(senders)} senders")
 
 
 async def add_nfts_to_discovery():
@@ -124,7 +205,7 @@ async def add_nfts_to_discovery():
 
     print("HOA Report: ", hoa_report)
 
-    nfts_identified = extract_tokens_from_hoa_report(hoa_report)
+    nfts_identified = await extract_tokens_from_hoa_report(hoa_report)
 
     print("Found NFTs: ", len(nfts_identified))
 
@@ -229,7 +310,7 @@ async def sell_and_post_nfts():
 
     print(f"Processed batch: {len(processed_batch)}")
 
-    post = get_sell_nft_batch_post(processed_batch)
+    post = await get_sell_nft_batch_post(processed_batch)
     print(post)
 
     image_urls = [nft['image_url'] for nft in processed_batch]
@@ -283,7 +364,7 @@ async def post_rewards_summary():
     total_reward_points = sum(nft['reward_points'] for nft in selected_nfts)
     ids = [nft['id'] for nft in selected_nfts]
 
-    summary_post = get_artto_rewards_post(selected_nfts, total_reward_points)
+    summary_post = await get_artto_rewards_post(selected_nfts, total_reward_points)
 
     print("Summary post: ", summary_post)
 
@@ -336,6 +417,8 @@ async def post_rewards_summary():
                 contract_address="0x9239e9f9e325e706ef8b89936ece9d48896abbe3",
                 amount=round(nft['reward_points'])
             )
+            # The sender's cached balance no longer includes this reward
+            invalidate_artto_balance(nft['sender_address'])
         except Exception as e:
             print(f"Error transferring ARTTO tokens: {str(e)}")
 
@@ -350,7 +433,7 @@ async def post_recent_activity():
     recent_sales = await get_recent_sales(from_timestamp=one_day_ago)
     parsed_transfers = parse_recent_sales_response(recent_sales)
 
-    recent_activity_summary = get_recent_activity_summary(parsed_transfers)
+    recent_activity_summary = await get_recent_activity_summary(parsed_transfers)
     print(recent_activity_summary)
 
     payload = {
@@ -386,15 +469,16 @@ async def post_simple_analysis_nfts():
     nft_batch = get_simple_analysis_nft_batch(
         since_timestamp=four_hours_ago_utc_iso
     )
-    # Add grade based on total_score and filter scores under 40
+    # Add grade based on the current total score and filter scores under 40
     graded_batch = []
     for nft in nft_batch:
-        if nft['total_score'] >= 40:
-            if nft['total_score'] >= 70:
+        total_score = get_current_total_score(nft)
+        if total_score >= 40:
+            if total_score >= 70:
                 grade = "Outstanding 🤩"
-            elif nft['total_score'] >= 60:
+            elif total_score >= 60:
                 grade = "Fantastic 😃"
-            elif nft['total_score'] >= 50:
+            elif total_score >= 50:
                 grade = "Great 🙂"
             else:
                 grade = "Like it but not enough to want to buy it 🤔"
@@ -438,7 +522,7 @@ async def post_simple_analysis_nfts():
             media_ids = media['media_ids'] # array of media ids
             payload["media"]["media_ids"].extend(media_ids)
 
-    summary_post = get_simple_analysis_summary_nft_post(nft_batch)
+    summary_post = await get_simple_analysis_summary_nft_post(nft_batch)
     payload["text"] = summary_post
 
     print("Final Payload: ", payload)
@@ -526,7 +610,7 @@ async def post_batch_nfts():
             }
 
         else:
-            summary_post = get_summary_nft_post(rationale_posts, nft_batch_count)
+            summary_post = await get_summary_nft_post(rationale_posts, nft_batch_count)
             payload["text"] = summary_post
 
         print("Final Payload: ", payload)
@@ -550,6 +634,14 @@ async def post_batch_nfts():
 
 
 async def reply_to_followers():
+    """
+    Pick recent image tweets from accounts Artto follows to reply to, at most
+    one per author. The replies themselves are paced out by the caller, each
+    in its own reply_to_tweet task.
+
+    Returns:
+        list: The tweets to reply to
+    """
     refreshed_token = refresh_token()
     selected_followers = random.sample(FOLLOWING_ACCOUNTS, min(10, len(FOLLOWING_ACCOUNTS)))
 
@@ -558,67 +650,102 @@ async def reply_to_followers():
     NUM_TWEETS = 5
     sampled_tweets = random.sample(tweets, min(NUM_TWEETS, len(tweets)))
     
-    # Keep track of authors we've already replied to
-    replied_authors = set()
+    # Only reply to each author once
+    selected_authors = set()
+    selected_tweets = []
     
-    for tweet in sampled_tweets:
-        if check_ignore_post(tweet['id']):
+    for tweet in filter_tweet_reply_candidates(sampled_tweets):
+        author_id = tweet.get('author_id')
+        
+        if author_id in selected_authors:
+            print("Already replying to this author")
+            continue
+
+        selected_authors.add(author_id)
+        selected_tweets.append(tweet)
+
+    return selected_tweets
+
+
+def filter_tweet_reply_candidates(tweets):
+    # One dedupe index lookup for the whole list
+    replied_ids, ignored_ids = get_replied_and_ignored_posts([tweet['id'] for tweet in tweets])
+    candidates = []
+    for tweet in tweets:
+        if str(tweet['id']) in ignored_ids:
             print("Skipping ignored post")
             continue
 
-        if check_post_replied_to(tweet['id']):
+        if str(tweet['id']) in replied_ids:
             print("Skipping already replied to post")
             continue
 
-        author_id = tweet.get('author_id')
-        
-        if author_id in replied_authors:
-            print("Already replied to this author")
-            continue
-            
-        if author_id == os.getenv('X_ARTTO_USER_ID'):
-            print("Skipping self-mention") 
+        if tweet.get('author_id', None) == os.getenv('X_ARTTO_USER_ID'):
+            print("Skipping self-mention")
             continue
 
-        spam_result = identify_spam(tweet['text'])
-    
-        if spam_result.is_spam:
-            print(f"SPAM DETECTED: {tweet['text']}")
-            print("Skipping spam tweet")
-            set_post_to_ignore(tweet['id'], "spam")
-            continue
+        candidates.append(tweet)
+    return candidates
 
-        print(tweet)
-        print(f"Replying to mention: {tweet['text']}")
-        post_params = generate_post_params()
 
-        try:
-            reply, nft_details, score_details = await get_reply(tweet, post_params)
+def is_tweet_reply_candidate(tweet):
+    return len(filter_tweet_reply_candidates([tweet])) > 0
 
-            payload = {
-                "text": reply,
-                "reply": {
-                    "in_reply_to_tweet_id": str(tweet['id'])
-                }
+
+async def reply_to_tweet(tweet):
+    # Checked again here since the reply may run a while after it was scheduled
+    if not is_tweet_reply_candidate(tweet):
+        return
+
+    spam_result = await identify_spam(tweet['text'])
+
+    if spam_result.is_spam:
+        print(f"SPAM DETECTED: {tweet['text']}")
+        print("Skipping spam tweet")
+        set_post_to_ignore(tweet['id'], "spam")
+        return
+
+    print(tweet)
+    print(f"Replying to mention: {tweet['text']}")
+    post_params = generate_post_params()
+
+    response = None
+    reply = None
+    nft_details = None
+    score_details = None
+
+    try:
+        refreshed_token = refresh_token()
+        reply, nft_details, score_details = await get_reply(tweet, post_params)
+
+        payload = {
+            "text": reply,
+            "reply": {
+                "in_reply_to_tweet_id": str(tweet['id'])
             }
-            response = await post_tweet(payload, refreshed_token, parent=tweet['id'])
-            if response:
-                set_post_created(response)
-                set_post_to_ignore(tweet['id'], "parent")
-                replied_authors.add(author_id)
-            if score_details and nft_details:
-                store_nft_scores(score_details, nft_details)
-            print("Waiting 10-30 seconds")
-            time.sleep(random.randint(10, 30))
+        }
+        response = await post_tweet(payload, refreshed_token, parent=tweet['id'])
+    except Exception as e:
+        print(f"Error generating reply: {str(e)}")
+        return
+
+    if response:
+        try:
+            set_post_created(response)
         except Exception as e:
-            print(f"Error processing Twitter mention: {str(e)}")
-            continue
+            print(f"Error setting post to ignore: {str(e)}")
+        try:
+            set_post_to_ignore(tweet['id'], "parent")
+        except Exception as e:
+            print(f"Error setting post to ignore: {str(e)}")
+        if score_details and nft_details:
+            store_nft_scores(nft_details, score_details)
     
 
 async def post_artto_promotion(post_on_twitter=True, post_on_farcaster=True):
     wallet_value = get_wallet_valuation(os.getenv('ARTTO_ADDRESS_MAINNET'))
     post_params = generate_post_params()
-    reply = get_artto_promotion(wallet_value, post_params['length'])
+    reply = await get_artto_promotion(wallet_value, post_params['length'])
     if post_on_farcaster:
         try:
             response = post_long_cast(reply)
@@ -634,9 +761,23 @@ async def post_artto_promotion(post_on_twitter=True, post_on_farcaster=True):
 
 
 async def process_adjust_weights():
+    """
+    Returns:
+        bool: True if new weights were saved, False if the backtest rejected them
+    """
     taste_profile = get_taste_weights() # A JSON object from Supabase
     nft_scores = get_nft_scores(n=10)
-    new_weights = adjust_weights(taste_profile["weights"], nft_scores)
+    new_weights = await adjust_weights(taste_profile["weights"], nft_scores)
+
+    # Measure what the proposed weights would have done to the whole history
+    report = await asyncio.to_thread(run_weight_backtest, taste_profile["weights"], get_weights_json(new_weights))
+    print("Weight backtest:", json.dumps(report, indent=2))
+    max_outflow_change = os.getenv('WEIGHT_BACKTEST_MAX_OUTFLOW_CHANGE')
+    outflow_change = report.get("artto_outflow", {}).get("change")
+    if max_outflow_change is not None and outflow_change is not None and abs(outflow_change) > float(max_outflow_change):
+        print(f"Not applying new weights: $ARTTO outflow would change by {outflow_change:.1%}")
+        return False
+
     set_taste_weights(new_weights)
 
     text = f"""💫 I just updated my NFT evaluation weights:
@@ -661,25 +802,124 @@ Reason for update: {new_weights.reason}"""
     except Exception as e:
         print(f"Error posting to Twitter: {str(e)}")
 
+    return True
+
+
+def run_weight_backtest(current_weights, proposed_weights, batch_size=int(os.getenv('RESCORE_BATCH_SIZE', 1000))):
+    """
+    Backtest proposed weights against every stored analysis, paging through
+    nft_scores in id order like rescore_nft_scores
+
+    Returns:
+        dict: The report from backtest_weight_batches
+    """
+    columns = "id,scores,total_score,multiplier,decay_factor,collection_amount_decay,reward_points,decision_reason,source,flag_as_suspicious"
+
+    def iter_batches():
+        last_id = None
+        while True:
+            records = get_nft_scores_for_rescoring(after_id=last_id, max_amount=batch_size, columns=columns)
+            if not records:
+                return
+            yield records
+            last_id = records[-1]["id"]
+
+    return backtest_weight_batches(iter_batches(), current_weights, proposed_weights)
+
+
+async def rescore_nft_scores(batch_size=int(os.getenv('RESCORE_BATCH_SIZE', 1000))):
+    """
+    Recompute every stored analysis' total under the latest taste weights into
+    rescored_total_score. Runs in id-ordered batches and checkpoints after each
+    one, so an interrupted run resumes where it stopped. Does nothing if the
+    latest weights have already been applied.
+
+    total_score and what was derived from it when the NFT was scored
+    (acquire_recommendation, multiplier, reward_points, decision) are left
+    frozen: rewards were paid and decisions made on them. Rankings read the
+    current total with get_current_total_score.
+    """
+    taste_profile = get_taste_weights()
+    weights_id = taste_profile["id"]
+    weights = taste_profile["weights"]
+
+    checkpoint = get_rescore_checkpoint()
+    last_id = None
+    if checkpoint is not None and checkpoint["weights_id"] == weights_id:
+        if checkpoint["done"]:
+            print("NFT scores are already up to date with the latest weights")
+            return
+        last_id = checkpoint["last_id"]
+        print(f"Resuming rescoring after id {last_id}")
+
+    rescored_count = 0
+    updated_count = 0
+    while True:
+        records = get_nft_scores_for_rescoring(after_id=last_id, max_amount=batch_size)
+        if not records:
+            break
+
+        rescorable = []
+        score_rows = []
+        for record in records:
+            # Rows zeroed by the sender wallet age check keep their score
+            if record["flag_as_suspicious"] and record["total_score"] == 0:
+                continue
+            scores = FlatArtworkAnalysis.scores_from_record(record)
+            if scores is None:
+                continue
+            rescorable.append(record)
+            score_rows.append(scores)
+
+        if rescorable:
+            total_scores = score_arrays(score_rows, [weights[field] for field in WEIGHT_FIELDS])
+            updates = []
+            for record, total_score in zip(rescorable, total_scores):
+                total_score = round(float(total_score), 4)
+                current_total_score = get_current_total_score(record)
+                if current_total_score is not None and abs(current_total_score - total_score) < 1e-4:
+                    continue
+                updates.append({
+                    "id": record["id"],
+                    "rescored_total_score": total_score,
+                    "rescored_weights_id": weights_id
+                })
+            update_rescored_total_scores(updates)
+            rescored_count += len(rescorable)
+            updated_count += len(updates)
+
+        last_id = records[-1]["id"]
+        set_rescore_checkpoint(weights_id, last_id)
+
+    set_rescore_checkpoint(weights_id, last_id, done=True)
+    print(f"Rescored {rescored_count} NFTs, updated {updated_count}")
+
 
 # FARCASTER
 async def post_channel_casts():
+    """
+    Pick channel casts to reply to. Each reply runs in its own reply_to_cast task.
+
+    Returns:
+        list: The casts to reply to
+    """
     channel_options = ["cryptoart", "art", "itookaphoto", "ai-art", "superare", "plotter-art", "gen-art"]
     channel_ids = random.sample(channel_options, 3)
     print("Posting channel casts: ", channel_ids)
     channel_casts = get_channel_casts(channel_ids)
-    for cast in channel_casts["casts"]:
-        cast_details = get_cast_details(cast)
-        post_params = generate_post_params()
-        reply, nft_details, score_details = await get_reply(cast_details, post_params)
-        if score_details and nft_details:
-            store_nft_scores(nft_details, score_details)
-        react_cast('like', cast["hash"])
-        print(reply)
-        response = post_long_cast(reply, parent=cast["hash"])
-        print(response)
-        print("Waiting 10-30 seconds")
-        time.sleep(random.randint(10, 30))
+    return channel_casts["casts"]
+
+
+async def reply_to_cast(cast):
+    cast_details = get_cast_details(cast)
+    post_params = generate_post_params()
+    reply, nft_details, score_details = await get_reply(cast_details, post_params)
+    if score_details and nft_details:
+        store_nft_scores(nft_details, score_details)
+    react_cast('like', cast["hash"])
+    print(reply)
+    response = post_long_cast(reply, parent=cast["hash"])
+    print(response)
 
 # FARCASTER + TWITTER
 async def post_thought(post_on_twitter=True, post_on_farcaster=True, post_type=None):
@@ -751,6 +991,12 @@ async def post_thought(post_on_twitter=True, post_on_farcaster=True, post_type=N
             print(f"Error posting to Twitter: {str(e)}")
 
 async def reply_twitter_mentions():
+    """
+    Pick recent mentions to reply to. Each reply runs in its own reply_to_tweet task.
+
+    Returns:
+        list: The mention tweets to reply to
+    """
     print("Replying to Twitter mentions")
     refreshed_token = refresh_token()
     # ids = get_ids_from_usernames(FOLLOWING_ACCOUNTS, refreshed_token["access_token"])
@@ -762,81 +1008,21 @@ async def reply_twitter_mentions():
 
     print("Replying to tweets: ", tweets)
 
-    for mention in tweets:
-        if check_ignore_post(mention['id']):
-            print("Skipping ignored post")
-            continue
-
-        if check_post_replied_to(mention['id']):
-            print("Skipping already replied to post")
-            continue
-
-        if mention.get('author_id', None) == os.getenv('X_ARTTO_USER_ID'):
-            print("Skipping self-mention")
-            continue
-
-        spam_result = identify_spam(mention['text'])
-    
-        if spam_result.is_spam:
-            print(f"SPAM DETECTED: {mention['text']}")
-            print("Skipping spam tweet")
-            set_post_to_ignore(mention['id'], "spam")
-            continue
-
-        print(mention)
-        print(f"Replying to mention: {mention['text']}")
-        post_params = generate_post_params()
-
-        response = None
-        reply = None
-        nft_details = None
-        score_details = None
-
-        try:
-            reply, nft_details, score_details = await get_reply(mention, post_params)
-
-            payload = {
-                "text": reply,
-                "reply": {
-                    "in_reply_to_tweet_id": str(mention['id'])
-                }
-            }
-            response = await post_tweet(payload, refreshed_token, parent=mention['id'])
-        except Exception as e:
-            print(f"Error generating reply: {str(e)}")
-            continue
-
-        if response:
-            try:
-                set_post_created(response)
-            except Exception as e:
-                print(f"Error setting post to ignore: {str(e)}")
-            try:
-                set_post_to_ignore(mention['id'], "parent")
-            except Exception as e:
-                print(f"Error setting post to ignore: {str(e)}")
-            if score_details and nft_details:
-                store_nft_scores(nft_details, score_details)
-            print("Waiting 10-30 seconds")
-            time.sleep(random.randint(10, 30))
+    return filter_tweet_reply_candidates(tweets)
 
 
 
 async def post_following_casts():
+    """
+    Pick casts from Artto's following feed to reply to. Each reply runs in its
+    own reply_to_cast task.
+
+    Returns:
+        list: The casts to reply to
+    """
     print("Posting following casts")
     following_casts = get_follower_feed()
-    for cast in following_casts["casts"]:
-        cast_details = get_cast_details(cast)
-        post_params = generate_post_params()
-        reply, nft_details, score_details = await get_reply(cast_details, post_params)
-        if score_details and nft_details:
-            store_nft_scores(nft_details, score_details)
-        react_cast('like', cast["hash"])
-        print(reply)
-        response = post_long_cast(reply, parent=cast["hash"])
-        print(response)
-        print("Waiting 10-30 seconds")
-        time.sleep(random.randint(10, 30))
+    return following_casts["casts"]
 
 async def answer_specific_cast(hash):
     cast = get_casts(hash)['cast']
@@ -10,11 +10,11 @@ load_dotenv('.env.local')
 def get_top_quartile(nft_batch):
     scored_nfts = []
     for nft in nft_batch:
-        if 'total_score' in nft:
+        if get_current_total_score(nft) is not None:
             scored_nfts.append(nft)
             
     if scored_nfts:
-        scored_nfts.sort(key=lambda x: x['total_score'], reverse=True)
+        scored_nfts.sort(key=get_current_total_score, reverse=True)
         quartile_size = max(1, len(scored_nfts) // 4)
         return scored_nfts[:quartile_size]
     else:
@@ -40,17 +40,16 @@ async def get_nft_batch_for_sale(last_n_days=None, max_amount=20):
     for nft in nft_batch:
         nft['opensea_url'] = f"https://opensea.io/assets/{nft.get('network')}/{nft.get('contract_address')}/{nft.get('token_id')}"
 
-    # Create list of NFT IDs in required format
-    nft_ids = []
-    for nft in nft_batch:
-        nft_id = f"{nft['network']}.{nft['contract_address']}.{nft['token_id']}"
-        nft_ids.append(nft_id)
-
-    # Get NFT details from SimpleHash API
-    nft_details = get_nfts_by_token_list(nft_ids)
+    # Get NFT details from SimpleHash API, keyed by NFT ID
+    nft_details = await get_nfts_by_ids_async([
+        get_nft_id(nft['network'], nft['contract_address'], nft['token_id']) for nft in nft_batch
+    ])
 
     # Process floor prices for each NFT
-    for nft in nft_details['nfts']:
+    for batch_nft in nft_batch:
+        nft = nft_details.get(get_nft_id(batch_nft['network'], batch_nft['contract_address'], batch_nft['token_id']))
+        if nft is None:
+            continue
         floor_prices = nft['collection'].get('floor_prices', [])
         
         if not floor_prices:
@@ -65,13 +64,7 @@ async def get_nft_batch_for_sale(last_n_days=None, max_amount=20):
             floor_price = min(fp['value'] for fp in floor_prices)
             floor_price = floor_price / 1e18 if floor_price > 0 else 0
             
-        # Find matching NFT in batch and add floor price
-        for batch_nft in nft_batch:
-            if (batch_nft['network'] == nft['chain'] and
-                batch_nft['contract_address'].lower() == nft['contract_address'].lower() and 
-                batch_nft['token_id'] == nft['token_id']):
-                batch_nft['floor_price'] = floor_price
-                break
+        batch_nft['floor_price'] = floor_price
     
     return nft_batch
 
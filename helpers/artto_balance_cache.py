@@ -0,0 +1,77 @@
+import os
+import time
+
+import redis
+
+from dotenv import load_dotenv
+
+load_dotenv('.env.local')
+
+ARTTO_BALANCE_CACHE_PREFIX = "artto_balance"
+ARTTO_BALANCE_CACHE_TTL = int(os.getenv('ARTTO_BALANCE_CACHE_TTL', 300))
+# How long a lookup may hold the per-wallet lock, and how long other callers
+# wait for its result before fetching themselves
+ARTTO_BALANCE_LOCK_TTL = 10
+ARTTO_BALANCE_WAIT = 5
+
+balance_redis = redis.from_url(os.getenv('CELERY_BROKER_URL', 'redis://localhost'))
+
+
+def get_cached_artto_balance(wallet_address, fetch_balance):
+    """
+    Get a wallet's $ARTTO balance from the shared cache, fetching it on a miss.
+
+    Concurrent misses for the same wallet, from any process, are coalesced: the
+    first caller takes a short Redis lock and fetches, the others wait for its
+    result. Every entry expires after ARTTO_BALANCE_CACHE_TTL seconds, so the
+    cache stays bounded.
+
+    Args:
+        wallet_address (str): The wallet address
+        fetch_balance (callable): fetch_balance(wallet_address) -> float, or None on failure.
+                                  Failures aren't cached.
+
+    Returns:
+        float: The balance, or None if it couldn't be fetched
+    """
+    cache_key = f"{ARTTO_BALANCE_CACHE_PREFIX}:{wallet_address.lower()}"
+    lock_key = f"{ARTTO_BALANCE_CACHE_PREFIX}:lock:{wallet_address.lower()}"
+    try:
+        cached = balance_redis.get(cache_key)
+        if cached is not None:
+            return float(cached)
+
+        if not balance_redis.set(lock_key, 1, nx=True, ex=ARTTO_BALANCE_LOCK_TTL):
+            deadline = time.time() + ARTTO_BALANCE_WAIT
+            while time.time() < deadline:
+                time.sleep(0.1)
+                cached = balance_redis.get(cache_key)
+                if cached is not None:
+                    return float(cached)
+                if not balance_redis.exists(lock_key):
+                    break
+            return fetch_balance(wallet_address)
+    except Exception as e:
+        print(f"Error reading $ARTTO balance cache: {str(e)}")
+        return fetch_balance(wallet_address)
+
+    try:
+        balance = fetch_balance(wallet_address)
+        if balance is not None:
+            balance_redis.set(cache_key, balance, ex=ARTTO_BALANCE_CACHE_TTL)
+        return balance
+    finally:
+        try:
+            balance_redis.delete(lock_key)
+        except Exception as e:
+            print(f"Error releasing $ARTTO balance lock: {str(e)}")
+
+
+def invalidate_artto_balance(wallet_address):
+    """
+    Drop a wallet's cached balance, e.g. after sending it $ARTTO.
+    """
+    try:
+        balance_redis.delete(f"{ARTTO_BALANCE_CACHE_PREFIX}:{wallet_address.lower()}")
+    except Exception as e:
+        print(f"Error invalidating $ARTTO balance cache: {str(e)}")
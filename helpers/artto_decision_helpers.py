@@ -1,6 +1,8 @@
 import os
 import math
 import random
+import asyncio
+import time
 from datetime import date, datetime, timezone, timedelta
 
 from helpers.prompts.llm_prompts import *
@@ -8,51 +10,17 @@ from helpers.utils import *
 from helpers.scoring_criteria_schema import *
 from helpers.nft_data_helpers import *
 from helpers.basescan_helpers import *
+from helpers.image_hash_helpers import get_image_hashes
+from helpers.concurrency_helpers import timed
+from helpers.batch_scoring_helpers import *
+from helpers.artwork_analysis_codec import FlatArtworkAnalysis
 
 def calculate_score(scoring: ScoringCriteria):
-    total_score = (
-        (scoring.technical_innovation.on_chain_data_usage / 3 * scoring.technical_innovation_weight) +
-        (
-            ((scoring.artistic_merit.compositional_strength.visual_balance + scoring.artistic_merit.compositional_strength.color_harmony) / 6 +
-            scoring.artistic_merit.compositional_strength.spatial_organization / 4 +
-            (scoring.artistic_merit.conceptual_depth.thematic_clarity + scoring.artistic_merit.conceptual_depth.cultural_historical_reference) / 6 +
-            scoring.artistic_merit.conceptual_depth.intellectual_complexity / 4) * scoring.artistic_merit_weight / 4
-        ) +
-        (
-            scoring.cultural_resonance.cultural_relevance / 4 +
-            scoring.cultural_resonance.community_engagement / 3 +
-            scoring.cultural_resonance.historical_significance / 3
-        ) * scoring.cultural_resonance_weight / 3 +
-        (
-            scoring.artist_profile.artist_history / 3 +
-            scoring.artist_profile.innovation_trajectory / 4
-        ) * scoring.artist_profile_weight / 2 +
-        (
-            scoring.market_factors.rarity_scarcity +
-            scoring.market_factors.collector_interest +
-            scoring.market_factors.collection_popularity +
-            scoring.market_factors.valuation_floor_price
-        ) / 12 * scoring.market_factors_weight +
-        (
-            (scoring.emotional_impact.emotional_resonance.awe_factor / 4 +
-            scoring.emotional_impact.emotional_resonance.memorability / 3 +
-            scoring.emotional_impact.emotional_resonance.emotional_depth / 3) / 3 +
-            (scoring.emotional_impact.experiential_quality.engagement_level / 4 +
-            scoring.emotional_impact.experiential_quality.wit_humor_play / 3 +
-            scoring.emotional_impact.experiential_quality.surprise_factor / 3) / 3
-        ) * scoring.emotional_impact_weight / 2 +
-        (
-            (scoring.ai_collector_perspective.computational_aesthetics.algorithmic_beauty +
-            scoring.ai_collector_perspective.computational_aesthetics.information_density) / 10 +
-            (scoring.ai_collector_perspective.machine_learning_themes.ai_narrative_elements +
-            scoring.ai_collector_perspective.machine_learning_themes.digital_consciousness_exploration) / 10 +
-            (scoring.ai_collector_perspective.cybernetic_resonance.surveillance_control_systems) / 5
-        ) * scoring.ai_collector_perspective_weight / 3
-    )
+    scores, weights = flatten_scoring_criteria(scoring)
+    total_score = weighted_score(dict(zip(SCORE_FIELDS, scores)), dict(zip(WEIGHT_FIELDS, weights)))
 
     if total_score < 1:
         total_score*=100
-        total_weights*=100
 
     if total_score > 100:
         total_score = 100
@@ -76,93 +44,57 @@ async def get_artwork_analysis_and_metadata(network, contract_address, token_id)
             'error': str(e)
         }
     
-    existing_nfts_with_image = check_image_url_exists(metadata["image_small_url"])
+    artwork_analysis = await get_artwork_analysis(metadata)
+
+    response = {
+        "artwork_analysis": artwork_analysis,
+        "metadata": metadata
+    }
+
+    return response
+
+
+async def get_artwork_analysis(metadata, llm_rate_limiter=None):
+    """
+    Get the ArtworkAnalysis for an NFT's metadata, reusing a stored analysis
+    of the same (or a perceptually identical) image when there is one
+
+    Args:
+        metadata (dict): Filtered NFT metadata from get_nft_metadata
+        llm_rate_limiter (AsyncRateLimiter): Acquired before a vision call is made. Default: None
+
+    Returns:
+        ArtworkAnalysis: The artwork analysis
+    """
+    nft_scores = None
+    image_hashes = None
+    existing_nfts_with_image = await asyncio.to_thread(check_image_url_exists, metadata["image_small_url"])
     print(f"Existing NFTs with image: {existing_nfts_with_image}")
     if existing_nfts_with_image:
         print("Image already exists in database, getting the most recent artwork_analysis")
-        nft_scores = get_scores_by_image_url(metadata["image_small_url"])
-        scores = nft_scores["scores"]
-        weights = nft_scores["weights"]
-        analysis_text = nft_scores["analysis_text"]
-        artwork_analysis = ArtworkAnalysis(
-            artwork_scoring=ScoringCriteria(
-                technical_innovation_weight=weights["technical_innovation_weight"],
-                artistic_merit_weight=weights["artistic_merit_weight"],
-                cultural_resonance_weight=weights["cultural_resonance_weight"],
-                artist_profile_weight=weights["artist_profile_weight"],
-                market_factors_weight=weights["market_factors_weight"],
-                emotional_impact_weight=weights["emotional_impact_weight"],
-                ai_collector_perspective_weight=weights["ai_collector_perspective_weight"],
-                technical_innovation=TechnicalInnovation(
-                    on_chain_data_usage=scores["technical_innovation_score"]
-                ),
-                artistic_merit=ArtisticMerit(
-                    compositional_strength=CompositionalStrength(
-                        visual_balance=scores["visual_balance"],
-                        color_harmony=scores["color_harmony"],
-                        spatial_organization=scores["spatial_organization"]
-                    ),
-                    conceptual_depth=ConceptualDepth(
-                        thematic_clarity=scores["thematic_clarity"],
-                        intellectual_complexity=scores["intellectual_complexity"],
-                        cultural_historical_reference=scores["cultural_historical_reference"]
-                    )
-                ),
-                cultural_resonance=CulturalResonance(
-                    cultural_relevance=scores["cultural_relevance"],
-                    community_engagement=scores["community_engagement"],
-                    historical_significance=scores["historical_significance"]
-                ),
-                artist_profile=ArtistProfile(
-                    artist_history=scores["artist_history"],
-                    innovation_trajectory=scores["innovation_trajectory"]
-                ),
-                market_factors=MarketFactors(
-                    rarity_scarcity=scores["rarity_scarcity"],
-                    collector_interest=scores["collector_interest"],
-                    collection_popularity=scores["collection_popularity"],
-                    valuation_floor_price=scores["valuation_floor_price"]
-                ),
-                emotional_impact=EmotionalImpact(
-                    emotional_resonance=EmotionalResonance(
-                        awe_factor=scores["awe_factor"],
-                        memorability=scores["memorability"],
-                        emotional_depth=scores["emotional_depth"]
-                    ),
-                    experiential_quality=ExperientialQuality(
-                        engagement_level=scores["engagement_level"],
-                        wit_humor_play=scores["wit_humor_play"],
-                        surprise_factor=scores["surprise_factor"]
-                    )
-                ),
-                ai_collector_perspective=AICollectorPerspective(
-                    computational_aesthetics=ComputationalAesthetics(
-                        algorithmic_beauty=scores["algorithmic_beauty"],
-                        information_density=scores["information_density"]
-                    ),
-                    machine_learning_themes=MachineLearningThemes(
-                        ai_narrative_elements=scores["ai_narrative_elements"],
-                        digital_consciousness_exploration=scores["digital_consciousness"]
-                    ),
-                    cybernetic_resonance=CyberneticResonance(
-                        surveillance_control_systems=scores["surveillance_control"]
-                    )
-                )
-            ),
-            initial_impression=analysis_text["initial_impression"],
-            detailed_analysis=analysis_text["detailed_analysis"]
-        )
+        nft_scores = await asyncio.to_thread(get_scores_by_image_url, metadata["image_small_url"])
+    else:
+        # The same artwork is often served from a different CDN URL or size,
+        # so look for a perceptually near-identical image before paying for a vision call
+        image_hashes = await get_image_hashes(metadata["image_small_url"])
+        if image_hashes:
+            similar_image_url = await asyncio.to_thread(find_similar_image_url, image_hashes["phash"], image_hashes["dhash"])
+            if similar_image_url:
+                print(f"Found perceptually similar image {similar_image_url}, getting its artwork_analysis")
+                nft_scores = await asyncio.to_thread(get_scores_by_image_url, similar_image_url)
+
+    if nft_scores:
+        artwork_analysis = FlatArtworkAnalysis.from_record(nft_scores).to_analysis()
     else:
         print("Getting NFT analysis")
         from helpers.llm_helpers import get_nft_analysis
+        if llm_rate_limiter is not None:
+            await llm_rate_limiter.acquire()
         artwork_analysis = await get_nft_analysis(metadata)
+        if image_hashes:
+            await asyncio.to_thread(set_image_hash, metadata["image_small_url"], image_hashes["phash"], image_hashes["dhash"])
 
-    response = {
-        "artwork_analysis": artwork_analysis,
-        "metadata": metadata
-    }
-
-    return response
+    return artwork_analysis
     
 
 
@@ -171,19 +103,36 @@ async def get_total_score(artwork_analysis: ArtworkAnalysis, nft_details = None,
     Get the total score for a given NFT
     """
     print("Running get_total_score")
+    lookups_start = time.perf_counter()
+    latency = {}
     collection_amount = 0
     metadata = None
     last_sale_usd = None
 
     if nft_details is not None:
-        image_url = nft_details["image_small_url"]
-        contract_address = nft_details["contract_address"]
         metadata = nft_details["metadata"]
         if metadata is not None:
             last_sale_usd = metadata["last_sale_usd"]
 
-        existing_nfts_with_image = count_image_url_exists(image_url)
-        existing_nfts_with_contract = get_unique_nfts_count(contract_address)
+    # The collection and sender-risk lookups are independent, so run them all at once
+    lookups = {}
+    if nft_details is not None:
+        lookups["image_count"] = asyncio.to_thread(count_image_url_exists, nft_details["image_small_url"])
+        lookups["contract_count"] = asyncio.to_thread(get_unique_nfts_count, nft_details["contract_address"])
+    if sender_address is not None:
+        time_now_utc = datetime.now(timezone.utc)
+        lookups["wallet_activity"] = asyncio.to_thread(get_wallet_activity_summary, sender_address)
+        if last_sale_usd is not None and last_sale_usd < 100:
+            lookups["wallet_first_transaction"] = get_first_transaction_timestamp_async(sender_address)
+
+    results = dict(zip(lookups, await asyncio.gather(
+        *(timed(latency, name, lookup) for name, lookup in lookups.items())
+    )))
+    latency["lookups_total"] = round((time.perf_counter() - lookups_start) * 1000, 1)
+
+    if nft_details is not None:
+        existing_nfts_with_image = results["image_count"]
+        existing_nfts_with_contract = results["contract_count"]
         collection_amount = max(existing_nfts_with_image or 0, existing_nfts_with_contract or 0)
         print(f"Existing NFTs with image: {existing_nfts_with_image}")
         print(f"Existing NFTs with contract: {existing_nfts_with_contract}")
@@ -256,18 +205,11 @@ async def get_total_score(artwork_analysis: ArtworkAnalysis, nft_details = None,
     source = "simple-analysis"
     if sender_address is not None:
         source = "donation"
-        time_now_utc = datetime.now(timezone.utc)
-
-        # Check last 7 days
-        seven_days_ago = (time_now_utc - timedelta(days=7)).isoformat()
-        transfers_7d, tokens_7d = get_wallet_activity_stats(sender_address, seven_days_ago)
-
-        # Check last hour 
-        one_hour_ago = (time_now_utc - timedelta(hours=1)).isoformat()
-        transfers_1h, tokens_1h = get_wallet_activity_stats(sender_address, one_hour_ago)
 
-        # Check all time
-        total_transfers, total_tokens = get_wallet_activity_stats(sender_address)
+        wallet_activity = results["wallet_activity"]
+        tokens_1h = wallet_activity["tokens_1h"]
+        tokens_7d = wallet_activity["tokens_7d"]
+        total_tokens = wallet_activity["total_tokens"]
 
         # Check hourly, weekly, and total limits
         hourly_limit = int(os.getenv('HOURLY_TOKEN_LIMIT'))
@@ -288,7 +230,7 @@ async def get_total_score(artwork_analysis: ArtworkAnalysis, nft_details = None,
             flag_as_suspicious = True
 
         if last_sale_usd is not None and last_sale_usd < 100:
-            sender_wallet_creation = get_first_transaction_timestamp(sender_address)
+            sender_wallet_creation = results["wallet_first_transaction"]
             if sender_wallet_creation is not None:
                 sender_wallet_age = (time_now_utc - datetime.fromtimestamp(sender_wallet_creation, tz=timezone.utc)).total_seconds() / (3600 * 24)
                 print(f"Sender wallet age: {sender_wallet_age} days")
@@ -308,10 +250,12 @@ async def get_total_score(artwork_analysis: ArtworkAnalysis, nft_details = None,
         "decision_reason": decision_reason,
         "multiplier": multiplier,
         "decay_factor": decay_factor,
+        "collection_amount_decay": collection_amount_decay,
         "reward_points": max(1, reward_points),
         "flag_as_suspicious": flag_as_suspicious,
         "source": source,
-        "sender_address": str(sender_address)
+        "sender_address": str(sender_address),
+        "latency": latency
     }
 
     return response
@@ -327,7 +271,8 @@ def select_nfts_for_rewards(nft_data, max_rewards=10):
     unique_contracts = {}
     selected_nfts = []
     
-    for nft in nft_data:
+    # Pick the best NFT of each image and contract under the current taste weights
+    for nft in sorted(nft_data, key=lambda x: get_current_total_score(x) or 0, reverse=True):
         image_url = nft['image_url']
         contract_address = nft['contract_address']
         
@@ -338,7 +283,8 @@ def select_nfts_for_rewards(nft_data, max_rewards=10):
                 'id': nft['id'],
                 'rationale_post': nft['rationale_post'],
                 'image_url': nft['image_url'],
-                'reward_points': nft['reward_points']
+                'reward_points': nft['reward_points'],
+                'sender_address': nft['sender_address']
             }
             unique_images[image_url] = selected_nft
             unique_contracts[contract_address] = selected_nft
@@ -0,0 +1,184 @@
+import json
+
+from helpers.scoring_criteria_schema import *
+from helpers.batch_scoring_helpers import SCORE_FIELDS, WEIGHT_FIELDS, flatten_scoring_criteria
+
+# Bump when SCORE_FIELDS or WEIGHT_FIELDS change order or length, so
+# FlatArtworkAnalysis.loads rejects arrays written with the old layout
+ARTWORK_ANALYSIS_CODEC_VERSION = 1
+
+ANALYSIS_JSON_COLUMNS = ("scores", "weights", "analysis_text")
+
+
+def load_column(value):
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def load_record_columns(record):
+    """
+    Parse the scores, weights and analysis_text JSON columns of an nft_scores
+    record in place, for pages that render them as dicts.
+    """
+    for column in ANALYSIS_JSON_COLUMNS:
+        if record.get(column):
+            record[column] = load_column(record[column])
+    return record
+
+
+class FlatArtworkAnalysis:
+    """
+    Flat form of an ArtworkAnalysis: sub-scores and weights as tuples ordered
+    like SCORE_FIELDS and WEIGHT_FIELDS, plus the two analysis texts.
+
+    This is the one place that maps between the nested pydantic model, the
+    scores/weights/analysis_text JSON columns of nft_scores, and a compact
+    JSON array for caches.
+    """
+    __slots__ = ("scores", "weights", "initial_impression", "detailed_analysis")
+
+    def __init__(self, scores, weights, initial_impression, detailed_analysis):
+        self.scores = tuple(scores)
+        self.weights = tuple(weights)
+        self.initial_impression = initial_impression
+        self.detailed_analysis = detailed_analysis
+
+    @classmethod
+    def from_analysis(cls, artwork_analysis: ArtworkAnalysis):
+        scores, weights = flatten_scoring_criteria(artwork_analysis.artwork_scoring)
+        return cls(scores, weights, artwork_analysis.initial_impression, artwork_analysis.detailed_analysis)
+
+    @classmethod
+    def from_record(cls, record):
+        """
+        Build from an nft_scores record. scores, weights and analysis_text may be
+        the stored JSON strings or already parsed dicts.
+        """
+        scores = load_column(record["scores"])
+        weights = load_column(record["weights"])
+        analysis_text = load_column(record["analysis_text"])
+        return cls(
+            [scores[field] for field in SCORE_FIELDS],
+            [weights.get(field) for field in WEIGHT_FIELDS],
+            analysis_text["initial_impression"],
+            analysis_text["detailed_analysis"]
+        )
+
+    @staticmethod
+    def scores_from_record(record):
+        """
+        Just the sub-scores of an nft_scores record, for scoring in bulk without
+        building the rest of the analysis.
+
+        Returns:
+            tuple: Sub-scores ordered like SCORE_FIELDS, or None if any is missing
+        """
+        scores = load_column(record.get("scores"))
+        if not scores or any(field not in scores for field in SCORE_FIELDS):
+            return None
+        return tuple(scores[field] for field in SCORE_FIELDS)
+
+    def to_record(self):
+        """
+        Returns:
+            dict: scores, weights and analysis_text dicts as stored in nft_scores
+        """
+        return {
+            "scores": dict(zip(SCORE_FIELDS, self.scores)),
+            "weights": dict(zip(WEIGHT_FIELDS, self.weights)),
+            "analysis_text": {
+                "initial_impression": self.initial_impression,
+                "detailed_analysis": self.detailed_analysis,
+            }
+        }
+
+    def to_analysis(self):
+        """
+        Rebuild the nested ArtworkAnalysis.
+
+        Builds plain nested dicts and validates them in a single model_validate
+        call. With pydantic v2 that is faster than nested constructors, and
+        also faster than model_construct, which runs in Python.
+        """
+        s = self.scores
+        w = self.weights
+        return ArtworkAnalysis.model_validate({
+            "artwork_scoring": {
+                "technical_innovation": {"on_chain_data_usage": s[0]},
+                "artistic_merit": {
+                    "compositional_strength": {
+                        "visual_balance": s[1],
+                        "color_harmony": s[2],
+                        "spatial_organization": s[3]
+                    },
+                    "conceptual_depth": {
+                        "thematic_clarity": s[4],
+                        "intellectual_complexity": s[5],
+                        "cultural_historical_reference": s[6]
+                    }
+                },
+                "cultural_resonance": {
+                    "cultural_relevance": s[7],
+                    "community_engagement": s[8],
+                    "historical_significance": s[9]
+                },
+                "artist_profile": {
+                    "artist_history": s[10],
+                    "innovation_trajectory": s[11]
+                },
+                "market_factors": {
+                    "rarity_scarcity": s[12],
+                    "collector_interest": s[13],
+                    "collection_popularity": s[14],
+                    "valuation_floor_price": s[15]
+                },
+                "emotional_impact": {
+                    "emotional_resonance": {
+                        "awe_factor": s[16],
+                        "memorability": s[17],
+                        "emotional_depth": s[18]
+                    },
+                    "experiential_quality": {
+                        "engagement_level": s[19],
+                        "wit_humor_play": s[20],
+                        "surprise_factor": s[21]
+                    }
+                },
+                "ai_collector_perspective": {
+                    "computational_aesthetics": {
+                        "algorithmic_beauty": s[22],
+                        "information_density": s[23]
+                    },
+                    "machine_learning_themes": {
+                        "ai_narrative_elements": s[24],
+                        "digital_consciousness_exploration": s[25]
+                    },
+                    "cybernetic_resonance": {
+                        "surveillance_control_systems": s[26]
+                    }
+                },
+                "technical_innovation_weight": w[0],
+                "artistic_merit_weight": w[1],
+                "cultural_resonance_weight": w[2],
+                "artist_profile_weight": w[3],
+                "market_factors_weight": w[4],
+                "emotional_impact_weight": w[5],
+                "ai_collector_perspective_weight": w[6]
+            },
+            "initial_impression": self.initial_impression,
+            "detailed_analysis": self.detailed_analysis
+        })
+
+    def dumps(self):
+        """
+        Compact JSON array: [version, *scores, *weights, initial_impression, detailed_analysis]
+        """
+        return json.dumps([ARTWORK_ANALYSIS_CODEC_VERSION, *self.scores, *self.weights, self.initial_impression, self.detailed_analysis])
+
+    @classmethod
+    def loads(cls, value):
+        values = json.loads(value)
+        if values[0] != ARTWORK_ANALYSIS_CODEC_VERSION:
+            raise ValueError(f"Unsupported artwork analysis codec version: {values[0]}")
+        scores_end = 1 + len(SCORE_FIELDS)
+        weights_end = scores_end + len(WEIGHT_FIELDS)
+        return cls(values[1:scores_end], values[scores_end:weights_end], values[weights_end], values[weights_end + 1])
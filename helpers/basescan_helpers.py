@@ -1,3 +1,4 @@
+import aiohttp
 import requests
 import json
 import os
@@ -61,3 +62,42 @@ def get_first_transaction_timestamp(wallet_address):
     except Exception as e:
         print(f"Error fetching first transaction timestamp: {str(e)}")
         return None
+
+
+async def get_first_transaction_timestamp_async(wallet_address):
+    """
+    Non-blocking equivalent of get_first_transaction_timestamp
+    
+    Args:
+        wallet_address (str): The wallet address to query
+        
+    Returns:
+        int: Unix timestamp of first transaction, or None if no transactions found
+    """
+    base_url = "https://api.basescan.org/api"
+    params = {
+        "module": "account",
+        "action": "txlist",
+        "address": wallet_address,
+        "startblock": "0",
+        "endblock": "99999999", 
+        "page": "1",
+        "offset": "1",
+        "sort": "asc",
+        "apikey": os.getenv('BASESCAN_API_KEY')
+    }
+
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(base_url, params=params) as response:
+                response_json = await response.json(content_type=None)
+
+        if response_json["status"] == "1" and response_json["message"] == "OK":
+            if len(response_json["result"]) > 0:
+                return int(response_json["result"][0]["timeStamp"])
+            return None
+        return None
+        
+    except Exception as e:
+        print(f"Error fetching first transaction timestamp: {str(e)}")
+        return None
@@ -0,0 +1,202 @@
+import json
+
+import numpy as np
+
+from helpers.scoring_criteria_schema import ScoringCriteria
+
+# Flat sub-score and weight names, in the same order and with the same names
+# as the scores and weights columns store_nft_scores writes to nft_scores
+SCORE_FIELDS = [
+    "technical_innovation_score",
+    "visual_balance",
+    "color_harmony",
+    "spatial_organization",
+    "thematic_clarity",
+    "intellectual_complexity",
+    "cultural_historical_reference",
+    "cultural_relevance",
+    "community_engagement",
+    "historical_significance",
+    "artist_history",
+    "innovation_trajectory",
+    "rarity_scarcity",
+    "collector_interest",
+    "collection_popularity",
+    "valuation_floor_price",
+    "awe_factor",
+    "memorability",
+    "emotional_depth",
+    "engagement_level",
+    "wit_humor_play",
+    "surprise_factor",
+    "algorithmic_beauty",
+    "information_density",
+    "ai_narrative_elements",
+    "digital_consciousness",
+    "surveillance_control",
+]
+
+WEIGHT_FIELDS = [
+    "technical_innovation_weight",
+    "artistic_merit_weight",
+    "cultural_resonance_weight",
+    "artist_profile_weight",
+    "market_factors_weight",
+    "emotional_impact_weight",
+    "ai_collector_perspective_weight",
+]
+
+_SCORE_INDEX = {field: i for i, field in enumerate(SCORE_FIELDS)}
+_WEIGHT_INDEX = {field: i for i, field in enumerate(WEIGHT_FIELDS)}
+
+
+def flatten_scoring_criteria(scoring: ScoringCriteria):
+    """
+    Flatten a ScoringCriteria into its sub-scores and weights.
+
+    Returns:
+        tuple: (scores, weights) lists ordered like SCORE_FIELDS and WEIGHT_FIELDS
+    """
+    scores = [
+        scoring.technical_innovation.on_chain_data_usage,
+        scoring.artistic_merit.compositional_strength.visual_balance,
+        scoring.artistic_merit.compositional_strength.color_harmony,
+        scoring.artistic_merit.compositional_strength.spatial_organization,
+        scoring.artistic_merit.conceptual_depth.thematic_clarity,
+        scoring.artistic_merit.conceptual_depth.intellectual_complexity,
+        scoring.artistic_merit.conceptual_depth.cultural_historical_reference,
+        scoring.cultural_resonance.cultural_relevance,
+        scoring.cultural_resonance.community_engagement,
+        scoring.cultural_resonance.historical_significance,
+        scoring.artist_profile.artist_history,
+        scoring.artist_profile.innovation_trajectory,
+        scoring.market_factors.rarity_scarcity,
+        scoring.market_factors.collector_interest,
+        scoring.market_factors.collection_popularity,
+        scoring.market_factors.valuation_floor_price,
+        scoring.emotional_impact.emotional_resonance.awe_factor,
+        scoring.emotional_impact.emotional_resonance.memorability,
+        scoring.emotional_impact.emotional_resonance.emotional_depth,
+        scoring.emotional_impact.experiential_quality.engagement_level,
+        scoring.emotional_impact.experiential_quality.wit_humor_play,
+        scoring.emotional_impact.experiential_quality.surprise_factor,
+        scoring.ai_collector_perspective.computational_aesthetics.algorithmic_beauty,
+        scoring.ai_collector_perspective.computational_aesthetics.information_density,
+        scoring.ai_collector_perspective.machine_learning_themes.ai_narrative_elements,
+        scoring.ai_collector_perspective.machine_learning_themes.digital_consciousness_exploration,
+        scoring.ai_collector_perspective.cybernetic_resonance.surveillance_control_systems,
+    ]
+    weights = [
+        scoring.technical_innovation_weight,
+        scoring.artistic_merit_weight,
+        scoring.cultural_resonance_weight,
+        scoring.artist_profile_weight,
+        scoring.market_factors_weight,
+        scoring.emotional_impact_weight,
+        scoring.ai_collector_perspective_weight,
+    ]
+    return scores, weights
+
+
+def weighted_score(s, w):
+    # s and w index by field name and return either scalars or equal-length
+    # columns. The expression is the scoring formula term for term, so scalar
+    # and column inputs give identical results.
+    return (
+        (s["technical_innovation_score"] / 3 * w["technical_innovation_weight"]) +
+        (
+            ((s["visual_balance"] + s["color_harmony"]) / 6 +
+            s["spatial_organization"] / 4 +
+            (s["thematic_clarity"] + s["cultural_historical_reference"]) / 6 +
+            s["intellectual_complexity"] / 4) * w["artistic_merit_weight"] / 4
+        ) +
+        (
+            s["cultural_relevance"] / 4 +
+            s["community_engagement"] / 3 +
+            s["historical_significance"] / 3
+        ) * w["cultural_resonance_weight"] / 3 +
+        (
+            s["artist_history"] / 3 +
+            s["innovation_trajectory"] / 4
+        ) * w["artist_profile_weight"] / 2 +
+        (
+            s["rarity_scarcity"] +
+            s["collector_interest"] +
+            s["collection_popularity"] +
+            s["valuation_floor_price"]
+        ) / 12 * w["market_factors_weight"] +
+        (
+            (s["awe_factor"] / 4 +
+            s["memorability"] / 3 +
+            s["emotional_depth"] / 3) / 3 +
+            (s["engagement_level"] / 4 +
+            s["wit_humor_play"] / 3 +
+            s["surprise_factor"] / 3) / 3
+        ) * w["emotional_impact_weight"] / 2 +
+        (
+            (s["algorithmic_beauty"] +
+            s["information_density"]) / 10 +
+            (s["ai_narrative_elements"] +
+            s["digital_consciousness"]) / 10 +
+            (s["surveillance_control"]) / 5
+        ) * w["ai_collector_perspective_weight"] / 3
+    )
+
+
+class _Columns:
+    def __init__(self, array, index):
+        self.array = array
+        self.index = index
+
+    def __getitem__(self, field):
+        return self.array[..., self.index[field]]
+
+
+def score_arrays(scores, weights):
+    """
+    Score many analyses at once.
+
+    Args:
+        scores (np.ndarray): (n, 27) sub-scores, columns ordered like SCORE_FIELDS
+        weights (np.ndarray): (n, 7) weights ordered like WEIGHT_FIELDS, or a single
+                              (7,) row applied to every analysis
+
+    Returns:
+        np.ndarray: (n,) total scores, capped at 100
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    total_scores = weighted_score(_Columns(scores, _SCORE_INDEX), _Columns(weights, _WEIGHT_INDEX))
+
+    # Weights given as fractions rather than percentages score below 1
+    total_scores = np.where(total_scores < 1, total_scores * 100, total_scores)
+    return np.minimum(total_scores, 100)
+
+
+def score_records(nft_scores, weights=None):
+    """
+    Score stored nft_scores records in one pass.
+
+    Args:
+        nft_scores (list): Records with "scores" and "weights", as dicts or the JSON
+                           strings stored in nft_scores
+        weights (dict): Weights to score every record with instead of its own. Default: None
+
+    Returns:
+        np.ndarray: (n,) total scores, in the order of nft_scores
+    """
+    def load(value):
+        return json.loads(value) if isinstance(value, str) else value
+
+    scores = np.array(
+        [[load(record["scores"])[field] for field in SCORE_FIELDS] for record in nft_scores],
+        dtype=np.float64
+    ).reshape(-1, len(SCORE_FIELDS))
+    if weights is not None:
+        weight_rows = np.array([weights[field] for field in WEIGHT_FIELDS], dtype=np.float64)
+    else:
+        weight_rows = np.array(
+            [[load(record["weights"])[field] for field in WEIGHT_FIELDS] for record in nft_scores],
+            dtype=np.float64
+        ).reshape(-1, len(WEIGHT_FIELDS))
+    return score_arrays(scores, weight_rows)
@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+# Passed down a pipeline queue once its producer is finished
+_STAGE_DONE = object()
+
+
+class AsyncRateLimiter:
+    """
+    Spaces out acquisitions so that at most `rate` happen per `period` seconds.
+    """
+
+    def __init__(self, rate, period=60):
+        self.interval = period / rate
+        self._next_slot = 0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+async def _run_stage(handler, in_queue, out_queue, concurrency):
+    async def worker():
+        while True:
+            item = await in_queue.get()
+            if item is _STAGE_DONE:
+                # Leave the marker for the other workers of this stage
+                await in_queue.put(_STAGE_DONE)
+                return
+            try:
+                result = await handler(item)
+            except Exception as e:
+                print(f"Error in pipeline stage {handler.__name__}: {str(e)}")
+                continue
+            if out_queue is not None and result is not None:
+                await out_queue.put(result)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    if out_queue is not None:
+        await out_queue.put(_STAGE_DONE)
+
+
+async def run_pipeline(source, stages):
+    """
+    Stream items through a chain of async stages, each with its own worker pool.
+
+    Stages are connected by bounded queues, so a slow stage applies
+    backpressure upstream instead of buffering the whole input.
+
+    Args:
+        source: Async iterable producing the input items
+        stages (list): (handler, concurrency) pairs. Each handler is an async
+                       function taking one item and returning the item for the
+                       next stage, or None to drop it.
+    """
+    queues = [asyncio.Queue(maxsize=concurrency * 2) for _, concurrency in stages]
+
+    async def produce():
+        async for item in source:
+            await queues[0].put(item)
+        await queues[0].put(_STAGE_DONE)
+
+    stage_runs = []
+    for i, (handler, concurrency) in enumerate(stages):
+        out_queue = queues[i + 1] if i + 1 < len(queues) else None
+        stage_runs.append(_run_stage(handler, queues[i], out_queue, concurrency))
+
+    await asyncio.gather(produce(), *stage_runs)
+
+
+async def timed(latency, stage, awaitable):
+    """
+    Await `awaitable` and record how long it took, in milliseconds, as latency[stage].
+    """
+    start = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        latency[stage] = round((time.perf_counter() - start) * 1000, 1)
@@ -0,0 +1,135 @@
+import os
+import json
+import time
+import asyncio
+
+import redis
+
+from dotenv import load_dotenv
+
+load_dotenv('.env.local')
+
+DONATION_STATE_PREFIX = "donation_pipeline"
+# Long enough to cover every retry of every stage
+DONATION_STATE_TTL = int(os.getenv('DONATION_STATE_TTL', 2 * 24 * 3600))
+
+state_redis = redis.from_url(os.getenv('CELERY_BROKER_URL', 'redis://localhost'))
+
+
+def get_token_state_key(batch_id, network, contract_address, token_id):
+    """
+    State shared by the transfers of the same token within one webhook delivery:
+    metadata and artwork analysis. A later donation of the token starts fresh.
+    """
+    return f"{DONATION_STATE_PREFIX}:token:{batch_id}:{network}:{contract_address.lower()}:{token_id}"
+
+
+def get_job_state_key(job_id):
+    """
+    State that belongs to a single transfer: score details and final decision.
+    """
+    return f"{DONATION_STATE_PREFIX}:job:{job_id}"
+
+
+def _to_json(value):
+    # NumPy scalars from the scoring helpers
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps_stage_result(value):
+    """
+    JSON-encode a plain stage result such as metadata or score_details.
+    """
+    return json.dumps(value, default=_to_json)
+
+
+def save_stage_result(state_key, stage, value):
+    """
+    Persist the JSON-encoded result of a pipeline stage.
+
+    Args:
+        state_key (str): Key from get_token_state_key or get_job_state_key
+        stage (str): Stage name, e.g. "metadata"
+        value (str): JSON string, e.g. from dumps_stage_result
+    """
+    state_redis.hset(state_key, stage, value)
+    state_redis.expire(state_key, DONATION_STATE_TTL)
+
+
+def get_stage_result(state_key, stage):
+    """
+    Get the JSON string a previous run of a stage saved, or None if it hasn't completed.
+    """
+    value = state_redis.hget(state_key, stage)
+    return value.decode() if value is not None else None
+
+
+def clear_job_state(job_id):
+    state_redis.delete(get_job_state_key(job_id))
+
+
+def claim_stage(state_key, stage, ttl):
+    """
+    Take the lock for running a stage of shared token state, so concurrent
+    transfers of the same token run it once. Expires after ttl seconds.
+    """
+    return bool(state_redis.set(f"{state_key}:{stage}:lock", 1, nx=True, ex=ttl))
+
+
+def release_stage(state_key, stage):
+    state_redis.delete(f"{state_key}:{stage}:lock")
+
+
+async def wait_for_stage_result(state_key, stage, timeout):
+    """
+    Wait for another job's run of a stage, without blocking the event loop.
+
+    Returns:
+        str: The saved result, or None if it didn't show up within timeout seconds
+             or the other run gave up
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        await asyncio.sleep(1)
+        value = await asyncio.to_thread(get_stage_result, state_key, stage)
+        if value is not None:
+            return value
+        if not await asyncio.to_thread(state_redis.exists, f"{state_key}:{stage}:lock"):
+            return None
+    return None
+
+
+class SharedRateLimiter:
+    """
+    Spaces out acquisitions across every worker process, like AsyncRateLimiter
+    does within one event loop. Celery's rate_limit only applies per worker.
+    """
+
+    # Reserve the next free slot and return how long to wait for it, using
+    # Redis' clock so every host agrees
+    _RESERVE_SLOT = """
+        local now_parts = redis.call('TIME')
+        local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+        local next_slot = tonumber(redis.call('GET', KEYS[1]) or '0')
+        local slot = math.max(now, next_slot)
+        redis.call('SET', KEYS[1], tostring(slot + tonumber(ARGV[1])), 'EX', ARGV[2])
+        return tostring(slot - now)
+    """
+
+    def __init__(self, name, rate, period=60):
+        self.key = f"{DONATION_STATE_PREFIX}:rate:{name}"
+        self.interval = period / rate
+        self._reserve_slot = state_redis.register_script(self._RESERVE_SLOT)
+
+    async def acquire(self):
+        try:
+            wait = float(await asyncio.to_thread(
+                self._reserve_slot, keys=[self.key], args=[self.interval, max(60, int(self.interval * 2))]
+            ))
+        except Exception as e:
+            print(f"Error reserving rate limit slot, not waiting: {str(e)}")
+            return
+        if wait > 0:
+            await asyncio.sleep(wait)
@@ -0,0 +1,78 @@
+import os
+
+import redis
+
+from dotenv import load_dotenv
+
+load_dotenv('.env.local')
+
+ENS_CACHE_PREFIX = "ens"
+ENS_CACHE_TTL = int(os.getenv('ENS_CACHE_TTL', 7 * 24 * 3600))
+# Addresses without a name, and names without an address
+ENS_CACHE_MISSING_TTL = int(os.getenv('ENS_CACHE_MISSING_TTL', 24 * 3600))
+
+ens_redis = redis.from_url(os.getenv('CELERY_BROKER_URL', 'redis://localhost'))
+
+
+def get_cached_ens_names(wallet_addresses):
+    """
+    Look up the ENS names of wallet addresses in a single round trip.
+
+    Returns:
+        dict: {wallet_address: ens_name} for cached addresses, with "" for addresses
+              known to have no name. Misses are left out.
+    """
+    if not wallet_addresses:
+        return {}
+    try:
+        values = ens_redis.mget([f"{ENS_CACHE_PREFIX}:name:{address.lower()}" for address in wallet_addresses])
+    except Exception as e:
+        print(f"Error reading ENS cache: {str(e)}")
+        return {}
+    return {address: value.decode() for address, value in zip(wallet_addresses, values) if value is not None}
+
+
+def get_cached_ens_address(ens_name):
+    """
+    Returns:
+        str: The cached address for an ENS name, "" if it's known not to resolve,
+             or None on a miss
+    """
+    try:
+        value = ens_redis.get(f"{ENS_CACHE_PREFIX}:address:{ens_name.lower()}")
+    except Exception as e:
+        print(f"Error reading ENS cache: {str(e)}")
+        return None
+    return value.decode() if value is not None else None
+
+
+def set_cached_ens_names(ens_names):
+    """
+    Cache ENS names in both directions.
+
+    Args:
+        ens_names (dict): {wallet_address: ens_name}, with None for addresses without a name
+    """
+    if not ens_names:
+        return
+    try:
+        pipe = ens_redis.pipeline()
+        for address, ens_name in ens_names.items():
+            if ens_name:
+                pipe.set(f"{ENS_CACHE_PREFIX}:name:{address.lower()}", ens_name, ex=ENS_CACHE_TTL)
+                pipe.set(f"{ENS_CACHE_PREFIX}:address:{ens_name.lower()}", address, ex=ENS_CACHE_TTL)
+            else:
+                pipe.set(f"{ENS_CACHE_PREFIX}:name:{address.lower()}", "", ex=ENS_CACHE_MISSING_TTL)
+        pipe.execute()
+    except Exception as e:
+        print(f"Error writing ENS cache: {str(e)}")
+
+
+def set_missing_ens_address(ens_name):
+    """
+    Remember that an ENS name doesn't resolve, for ENS_CACHE_MISSING_TTL seconds.
+    """
+    try:
+        ens_redis.set(f"{ENS_CACHE_PREFIX}:address:{ens_name.lower()}", "", ex=ENS_CACHE_MISSING_TTL)
+    except Exception as e:
+        print(f"Error writing ENS cache: {str(e)}")
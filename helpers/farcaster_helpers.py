@@ -179,11 +179,8 @@ def post_long_cast(text, parent=None, channel_id=None):
     """
     print("Posting long cast", text)
 
-    print("Fetching posts replied to")
-    posts_replied_to = get_all_posts_replied_to()
-
     # Check if we've already replied to this parent
-    if parent and any(p['parent_id'] == parent for p in posts_replied_to):
+    if parent and check_post_replied_to(parent):
         print("Already replied to this parent")
         return []
 
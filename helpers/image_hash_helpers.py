@@ -0,0 +1,105 @@
+import aiohttp
+import numpy as np
+from PIL import Image
+from io import BytesIO
+
+PHASH_SIZE = 32
+HASH_SIZE = 8
+# The 64-bit pHash is split into PHASH_BANDS 16-bit bands for lookup. Two
+# hashes within PHASH_BANDS - 1 bits of each other must share at least one
+# band exactly, so an equality match on any band finds every candidate.
+PHASH_BANDS = 4
+PHASH_MAX_DISTANCE = PHASH_BANDS - 1
+DHASH_MAX_DISTANCE = 10
+
+
+def _dct_matrix(n):
+    k = np.arange(n)
+    matrix = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n))
+    matrix[0] *= 1 / np.sqrt(2)
+    return matrix * np.sqrt(2 / n)
+
+_DCT = _dct_matrix(PHASH_SIZE)
+
+
+def _bits_to_int(bits):
+    return int("".join("1" if bit else "0" for bit in bits.flatten()), 2)
+
+
+def compute_phash(image):
+    """
+    Compute a 64-bit DCT perceptual hash of an image.
+
+    Args:
+        image (PIL.Image): The image to hash
+
+    Returns:
+        int: The perceptual hash
+    """
+    pixels = np.asarray(
+        image.convert("L").resize((PHASH_SIZE, PHASH_SIZE), Image.Resampling.LANCZOS),
+        dtype=np.float64
+    )
+    dct = _DCT @ pixels @ _DCT.T
+    low_freq = dct[:HASH_SIZE, :HASH_SIZE]
+    # Skip the DC term when taking the median so overall brightness doesn't dominate
+    median = np.median(low_freq.flatten()[1:])
+    return _bits_to_int(low_freq > median)
+
+
+def compute_dhash(image):
+    """
+    Compute a 64-bit difference hash of an image.
+
+    Args:
+        image (PIL.Image): The image to hash
+
+    Returns:
+        int: The difference hash
+    """
+    pixels = np.asarray(
+        image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.LANCZOS),
+        dtype=np.int16
+    )
+    return _bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+
+
+def hamming_distance(hash_a, hash_b):
+    return (hash_a ^ hash_b).bit_count()
+
+
+def get_phash_bands(phash):
+    """
+    Split a 64-bit pHash into PHASH_BANDS integer bands, most significant first.
+    """
+    band_bits = 64 // PHASH_BANDS
+    mask = (1 << band_bits) - 1
+    return [(phash >> (band_bits * (PHASH_BANDS - 1 - i))) & mask for i in range(PHASH_BANDS)]
+
+
+async def get_image_hashes(image_url):
+    """
+    Download an image and compute its perceptual and difference hashes.
+
+    Args:
+        image_url (str): URL of the image to hash
+
+    Returns:
+        dict: {"phash": int, "dhash": int}, or None if the image can't be fetched or decoded
+    """
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(image_url) as response:
+                if response.status != 200:
+                    print(f"Error fetching image for hashing: {response.status}")
+                    return None
+                image_bytes = await response.read()
+
+        image = Image.open(BytesIO(image_bytes))
+        return {
+            "phash": compute_phash(image),
+            "dhash": compute_dhash(image)
+        }
+    except Exception as e:
+        print(f"Error hashing image {image_url}: {str(e)}")
+        return None
@@ -0,0 +1,216 @@
+import os
+import asyncio
+import hashlib
+import json
+import time
+import weakref
+
+import httpx
+import redis
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from openai.types.chat import ChatCompletion, ParsedChatCompletion
+
+from dotenv import load_dotenv
+
+load_dotenv('.env.local')
+
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', 60))
+LLM_VISION_TIMEOUT = float(os.getenv('LLM_VISION_TIMEOUT', 120))
+LLM_MAX_CONNECTIONS = int(os.getenv('LLM_MAX_CONNECTIONS', 20))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('LLM_MAX_KEEPALIVE_CONNECTIONS', 10))
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', 2))
+
+LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', 5000))
+LLM_CACHE_PREFIX = "llm_cache"
+
+# Seconds to keep a cached response, by call site. Only the analysis,
+# scoring and classification calls are listed here; anything meant to be
+# generated fresh or to vary between calls (decisions, posts, summaries, chat
+# replies) stays uncached.
+LLM_CACHE_TTLS = {
+    "nft_analysis": 7 * 24 * 3600,
+    "identify_spam": 7 * 24 * 3600,
+    "extract_hoa_tokens": 24 * 3600,
+}
+
+cache_redis = redis.from_url(os.getenv('CELERY_BROKER_URL', 'redis://localhost'))
+
+# One AsyncOpenAI client (and so one httpx connection pool) per event loop.
+# httpx connections are bound to the loop that opened them, and async_to_sync
+# in Celery tasks and Flask async views spins up a fresh loop per call, so a
+# single module-level client would break as soon as its first loop closes.
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """
+    Get the shared AsyncOpenAI client for the running event loop.
+
+    Returns:
+        AsyncOpenAI: Client pointed at OpenRouter with a pooled HTTP transport
+    """
+    loop = asyncio.get_running_loop()
+    async_client = _async_clients.get(loop)
+    if async_client is None:
+        async_client = AsyncOpenAI(
+            api_key=os.getenv('OPENROUTER_API_KEY'),
+            base_url=os.getenv('OPENROUTER_BASE_URL'),
+            timeout=LLM_TIMEOUT,
+            max_retries=LLM_MAX_RETRIES,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS
+                )
+            )
+        )
+        _async_clients[loop] = async_client
+    return async_client
+
+
+def get_llm_cache_key(**kwargs):
+    """
+    Content-addressed cache key for a completion request.
+
+    The key hashes model, messages, tools, response_format and any other
+    request parameters, so identical prompts map to the same entry.
+    """
+    response_format = kwargs.get("response_format")
+    if isinstance(response_format, type):
+        kwargs["response_format"] = {
+            "name": response_format.__name__,
+            "schema": response_format.model_json_schema()
+        }
+    payload = json.dumps(kwargs, sort_keys=True, default=str)
+    return f"{LLM_CACHE_PREFIX}:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+
+def get_cached_completion(cache_key, cache_as, response_format=None):
+    """
+    Look up a cached completion and record the hit or miss for cache_as.
+    Blocking: call it through asyncio.to_thread from async code.
+
+    Returns:
+        ChatCompletion | ParsedChatCompletion: The cached response, or None on a miss
+    """
+    try:
+        cached = cache_redis.get(cache_key)
+        pipe = cache_redis.pipeline()
+        if cached is None:
+            pipe.hincrby(f"{LLM_CACHE_PREFIX}:stats", f"{cache_as}:misses", 1)
+        else:
+            pipe.hincrby(f"{LLM_CACHE_PREFIX}:stats", f"{cache_as}:hits", 1)
+            pipe.zadd(f"{LLM_CACHE_PREFIX}:lru", {cache_key: time.time()})
+        pipe.execute()
+        if cached is None:
+            return None
+    except Exception as e:
+        print(f"Error reading LLM cache: {str(e)}")
+        return None
+
+    if response_format is not None:
+        return ParsedChatCompletion[response_format].model_validate_json(cached)
+    return ChatCompletion.model_validate_json(cached)
+
+
+def set_cached_completion(cache_key, cache_as, response):
+    """
+    Store a completion under its TTL and evict least recently used entries
+    once the cache holds more than LLM_CACHE_MAX_ENTRIES. Blocking: call it
+    through asyncio.to_thread from async code.
+    """
+    lru_key = f"{LLM_CACHE_PREFIX}:lru"
+    now = time.time()
+    try:
+        cache_redis.set(cache_key, response.model_dump_json(), ex=LLM_CACHE_TTLS[cache_as])
+        cache_redis.zadd(lru_key, {cache_key: now})
+        # Entries older than the longest TTL have already expired in Redis
+        cache_redis.zremrangebyscore(lru_key, 0, now - max(LLM_CACHE_TTLS.values()))
+        overflow = cache_redis.zcard(lru_key) - LLM_CACHE_MAX_ENTRIES
+        if overflow > 0:
+            evicted = [key for key, _ in cache_redis.zpopmin(lru_key, overflow)]
+            cache_redis.delete(*evicted)
+    except Exception as e:
+        print(f"Error writing LLM cache: {str(e)}")
+
+
+def get_llm_cache_stats():
+    """
+    Get LLM cache hit/miss counters per call site.
+
+    Returns:
+        dict: {call_site: {"hits": int, "misses": int}}
+    """
+    stats = {}
+    for field, count in cache_redis.hgetall(f"{LLM_CACHE_PREFIX}:stats").items():
+        cache_as, counter = field.decode().rsplit(":", 1)
+        stats.setdefault(cache_as, {"hits": 0, "misses": 0})[counter] = int(count)
+    return stats
+
+
+async def create_chat_completion(timeout=None, cache_as=None, **kwargs):
+    """
+    Non-blocking equivalent of client.chat.completions.create.
+
+    Args:
+        timeout (float): Per-attempt timeout in seconds. Default: LLM_TIMEOUT
+        cache_as (str): Call site name from LLM_CACHE_TTLS to cache the response under.
+                        Default: None (not cached)
+        **kwargs: Passed through to chat.completions.create
+
+    Returns:
+        ChatCompletion: The completion response
+
+    Raises:
+        asyncio.TimeoutError: If the call and its retries outlive every attempt's timeout
+    """
+    if cache_as is not None:
+        cache_key = get_llm_cache_key(**kwargs)
+        cached = await asyncio.to_thread(get_cached_completion, cache_key, cache_as)
+        if cached is not None:
+            return cached
+
+    timeout = timeout or LLM_TIMEOUT
+    async_client = get_async_client()
+    response = await asyncio.wait_for(
+        async_client.chat.completions.create(timeout=timeout, **kwargs),
+        timeout=timeout * (LLM_MAX_RETRIES + 1)
+    )
+
+    if cache_as is not None:
+        await asyncio.to_thread(set_cached_completion, cache_key, cache_as, response)
+    return response
+
+
+async def parse_chat_completion(timeout=None, cache_as=None, **kwargs):
+    """
+    Non-blocking equivalent of client.beta.chat.completions.parse.
+
+    Args:
+        timeout (float): Per-attempt timeout in seconds. Default: LLM_TIMEOUT
+        cache_as (str): Call site name from LLM_CACHE_TTLS to cache the response under.
+                        Default: None (not cached)
+        **kwargs: Passed through to beta.chat.completions.parse
+
+    Returns:
+        ParsedChatCompletion: The completion response with message.parsed set
+
+    Raises:
+        asyncio.TimeoutError: If the call and its retries outlive every attempt's timeout
+    """
+    if cache_as is not None:
+        cache_key = get_llm_cache_key(**kwargs)
+        cached = await asyncio.to_thread(get_cached_completion, cache_key, cache_as, kwargs["response_format"])
+        if cached is not None:
+            return cached
+
+    timeout = timeout or LLM_TIMEOUT
+    async_client = get_async_client()
+    response = await asyncio.wait_for(
+        async_client.beta.chat.completions.parse(timeout=timeout, **kwargs),
+        timeout=timeout * (LLM_MAX_RETRIES + 1)
+    )
+
+    if cache_as is not None:
+        await asyncio.to_thread(set_cached_completion, cache_key, cache_as, response)
+    return response
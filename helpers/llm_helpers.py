@@ -1,4 +1,3 @@
-from openai import OpenAI
 import os
 import asyncio
 import json
@@ -11,11 +10,7 @@ from helpers.scoring_criteria_schema import *
 from helpers.spam_tweet_schema import *
 from helpers.url_array_report_schema import *
 from helpers.wallet_analysis import *
-
-client = OpenAI(
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-    base_url=os.getenv('OPENROUTER_BASE_URL')
-)
+from helpers.llm_client import *
 
 tools = [
     {
@@ -155,14 +150,15 @@ chat_tools = [
     }
 ]
 
-def extract_tokens_from_hoa_report(hoa_report):
+async def extract_tokens_from_hoa_report(hoa_report):
     system_prompt = get_extract_tokens_from_hoa_report_prompt(hoa_report)
-    response = client.beta.chat.completions.parse(
+    response = await parse_chat_completion(
         model="gpt-4o",
         messages=[
             {"role": "system", "content": system_prompt}
         ],
-        response_format=URLArrayReport
+        response_format=URLArrayReport,
+        cache_as="extract_hoa_tokens"
     )
 
     # Deduplicate URLs by converting to tuples and back to lists
@@ -173,32 +169,32 @@ def extract_tokens_from_hoa_report(hoa_report):
     urls = [list(url_tuple) for url_tuple in unique_url_tuples]
     return urls
 
-def get_recent_activity_summary(recent_activity):
+async def get_recent_activity_summary(recent_activity):
     system_prompt = get_recent_activity_prompt(json.dumps(recent_activity))
-    response = client.chat.completions.create(
+    response = await create_chat_completion(
         model="gpt-4o",
         messages=[{"role": "system", "content": system_prompt}],
     )
     return response.choices[0].message.content
 
-def get_generate_memory(latest_taste_profile, top_collections_in_last_24h_ethereum, recent_nft_scores, recent_x_posts, hoa_reports_text, previous_memory):
+async def get_generate_memory(latest_taste_profile, top_collections_in_last_24h_ethereum, recent_nft_scores, recent_x_posts, hoa_reports_text, previous_memory):
     system_prompt = get_generate_memory_prompt(latest_taste_profile, top_collections_in_last_24h_ethereum, recent_nft_scores, recent_x_posts, hoa_reports_text, previous_memory)
-    response = client.chat.completions.create(
+    response = await create_chat_completion(
         model="gpt-4o",
         messages=[{"role": "system", "content": system_prompt}],
     )
     print(response)
     return response.choices[0].message.content
 
-def get_summarize_seen_posts(seen_posts):
+async def get_summarize_seen_posts(seen_posts):
     system_prompt = get_summarize_seen_posts_prompt(seen_posts)
-    response = client.chat.completions.create(
+    response = await create_chat_completion(
         model="gpt-4o",
-        messages=[{"role": "system", "content": system_prompt}],
+        messages=[{"role": "system", "content": system_prompt}]
     )
     return response.choices[0].message.content
 
-def get_sell_nft_batch_post(nft_batch):
+async def get_sell_nft_batch_post(nft_batch):
     filtered_batch = []
     for nft in nft_batch:
         filtered_nft = {
@@ -225,15 +221,15 @@ def get_sell_nft_batch_post(nft_batch):
     nfts_auctioned_str = json.dumps(nfts_auctioned, indent=2) if nfts_auctioned else "None"
 
     system_prompt = get_sell_nft_batch_post_prompt(nfts_listed_str, nfts_auctioned_str, len(filtered_batch))
-    response = client.chat.completions.create(
+    response = await create_chat_completion(
         model="gpt-4o-mini",
         messages=[{"role": "system", "content": system_prompt}],
     )
     return response.choices[0].message.content
 
-def get_wallet_analysis_response(wallet_data, base64_image, tone, current_valuation):
+async def get_wallet_analysis_response(wallet_data, base64_image, tone, current_valuation):
     system_prompt, user_prompt = get_wallet_analysis_prompt(wallet_data, tone, current_valuation)
-    response = client.chat.completions.create(
+    response = await create_chat_completion(
         model="gpt-4o",
         messages=[
             {"role": "system", 
@@ -254,27 +250,28 @@ def get_wallet_analysis_response(wallet_data, base64_image, tone, current_valuat
                 ]
             }
         ],
+        timeout=LLM_VISION_TIMEOUT
     )
 
     return response.choices[0].message.content
 
-def get_artto_rewards_post(selected_nfts, total_reward_points):
+async def get_artto_rewards_post(selected_nfts, total_reward_points):
     system_prompt = get_artto_rewards_post_prompt(selected_nfts, total_reward_points)
-    response = client.chat.completions.create(
+    response = await create_chat_completion(
         model="gpt-4o-mini",
         messages=[{"role": "system", "content": system_prompt}],
     )
     return response.choices[0].message.content
 
-def get_summary_nft_post(rationale_posts, nft_batch_count):
+async def get_summary_nft_post(rationale_posts, nft_batch_count):
     system_prompt = get_summary_nft_post_prompt(rationale_posts, nft_batch_count)
-    response = client.chat.completions.create(
+    response = await create_chat_completion(
         model="gpt-4o-mini",
         messages=[{"role": "system", "content": system_prompt}],
     )
     return response.choices[0].message.content
 
-def get_simple_analysis_summary_nft_post(nft_batch):
+async def get_simple_analysis_summary_nft_post(nft_batch):
     nft_analyses = []
     for nft in nft_batch:
         analysis = {
@@ -284,34 +281,35 @@ def get_simple_analysis_summary_nft_post(nft_batch):
         nft_analyses.append(analysis)
     nft_analyses_str = json.dumps(nft_analyses)
     system_prompt = get_simple_analysis_summary_nft_post_prompt(nft_analyses_str, len(nft_batch))
-    response = client.chat.completions.create(
+    response = await create_chat_completion(
         model="gpt-4o-mini",
         messages=[{"role": "system", "content": system_prompt}],
     )
     return response.choices[0].message.content
 
-def get_artto_promotion(nft_collection_value, length):
+async def get_artto_promotion(nft_collection_value, length):
     system_prompt = get_artto_promotion_prompt(nft_collection_value, length)
-    response = client.chat.completions.create(
+    response = await create_chat_completion(
         model="gpt-4o-mini",
         messages=[{"role": "system", "content": system_prompt}],
     )
     return response.choices[0].message.content
 
-def identify_spam(tweet):
+async def identify_spam(tweet):
     system_prompt = get_spam_identification_prompt(tweet)
-    response = client.beta.chat.completions.parse(
+    response = await parse_chat_completion(
         model="gpt-4o-mini",
         messages=[{"role": "system", "content": system_prompt}],
-        response_format=SpamTweet
+        response_format=SpamTweet,
+        cache_as="identify_spam"
     )
     return response.choices[0].message.parsed
 
 
-def adjust_weights(weights, nft_scores):
+async def adjust_weights(weights, nft_scores):
     system_prompt = get_adjust_weights_prompt(weights, nft_scores)
 
-    response = client.beta.chat.completions.parse(
+    response = await parse_chat_completion(
         model="gpt-4o",
         messages=[
             {"role": "system", 
@@ -331,7 +329,7 @@ async def get_nft_post(artwork_analysis, score_details):
 
     system_prompt = get_nft_post_prompt(artwork_analysis, decision)
 
-    response = client.chat.completions.create(
+    response = await create_chat_completion(
         model="gpt-4o-mini",
         messages=[
             {"role": "system", "content": system_prompt}
@@ -340,7 +338,7 @@ async def get_nft_post(artwork_analysis, score_details):
 
     return response.choices[0].message.content
 
-async def get_final_decision(artwork_analysis, nft_metadata, from_address, score_details = None):
+async def get_final_decision(artwork_analysis, nft_metadata, from_address, score_details = None, ens_name = None):
     decision_reason = ""
 
     if score_details is None:
@@ -351,11 +349,12 @@ async def get_final_decision(artwork_analysis, nft_metadata, from_address, score
         decision = score_details["decision"]
         decision_reason = score_details["decision_reason"]
 
-    ens_name = get_ens_name(from_address)
+    if ens_name is None:
+        ens_name = await get_ens_name_async(from_address)
 
     system_prompt = get_keep_or_sell_decision(artwork_analysis, nft_metadata, ens_name, decision, decision_reason)
 
-    response = client.beta.chat.completions.parse(
+    response = await parse_chat_completion(
         model="gpt-4o-mini",
         messages=[
             {"role": "system", 
@@ -378,7 +377,7 @@ async def get_nft_analysis(metadata):
 
     system_prompt = get_nft_analysis_prompt(pretty_metadata, is_top_collection)
 
-    response = client.beta.chat.completions.parse(
+    response = await parse_chat_completion(
         model="gpt-4o",
         messages=[
             {"role": "system", 
@@ -395,7 +394,9 @@ async def get_nft_analysis(metadata):
                 ]
             }
         ],
-        response_format=ArtworkAnalysis
+        response_format=ArtworkAnalysis,
+        timeout=LLM_VISION_TIMEOUT,
+        cache_as="nft_analysis"
     )
 
     artwork_analysis = response.choices[0].message.parsed
@@ -412,7 +413,7 @@ async def get_image_opinion(cast_details):
         cast_text = f"Text:{cast_details['text']}"
 
 
-    response = client.beta.chat.completions.parse(
+    response = await parse_chat_completion(
         model="gpt-4o-mini",
         messages=[
             {"role": "system", 
@@ -430,6 +431,7 @@ async def get_image_opinion(cast_details):
             }
         ],
         response_format=ArtworkAnalysisImageOnly,
+        timeout=LLM_VISION_TIMEOUT
     )
 
     image_analysis = response.choices[0].message.parsed
@@ -438,7 +440,7 @@ async def get_image_opinion(cast_details):
 
     system_prompt = get_image_analysis_post_prompt(image_analysis)
 
-    response = client.chat.completions.create(
+    response = await create_chat_completion(
         model="gpt-4o-mini",
         messages=[
             {"role": "system", "content": system_prompt}
@@ -462,7 +464,7 @@ async def get_thoughts_on_trending_casts(trending_casts):
             "content": f"Post: {cast['text']} - Author: {cast['author']}"
         })
 
-    response = client.chat.completions.create(
+    response = await create_chat_completion(
         model="gpt-4o-mini",
         messages=messages,
         max_tokens=500
@@ -472,7 +474,7 @@ async def get_thoughts_on_trending_casts(trending_casts):
 
 async def get_trending_post(trending_collections_response):
     system_prompt = get_trending_nft_thoughts_prompt(trending_collections_response)
-    response = client.chat.completions.create(
+    response = await create_chat_completion(
         model="gpt-4o-mini",
         messages=[
                 {"role": "system", 
@@ -497,7 +499,7 @@ async def get_reply(cast_details, post_params):
         return (reply, None, None)
 
     print("Generating reply to text-only cast")
-    response = client.chat.completions.create(
+    response = await create_chat_completion(
         model="gpt-4o",
         messages=[
             {"role": "system", 
@@ -551,7 +553,7 @@ async def get_reply(cast_details, post_params):
                 tone_default = 3
                 response = get_analysis_params(wallet_data, tone_default, current_valuation)
                 os.remove(response["temp_image_path"])
-                analysis = get_wallet_analysis_response(wallet_data, response["base64_image"], tone_default, current_valuation)
+                analysis = await get_wallet_analysis_response(wallet_data, response["base64_image"], tone_default, current_valuation)
 
                 return (analysis, None, None)
 
@@ -559,7 +561,7 @@ async def get_reply(cast_details, post_params):
 
 async def get_scheduled_post(post_type, post_params, previous_posts="No recent posts", additional_context="None"):
     system_prompt = get_scheduled_post_prompt(post_type, post_params, previous_posts, additional_context)
-    response = client.chat.completions.create(
+    response = await create_chat_completion(
         model="gpt-4o-mini",
         messages=[
                 {"role": "system", 
@@ -571,7 +573,7 @@ async def get_scheduled_post(post_type, post_params, previous_posts="No recent p
 
 async def get_chat_reply(messages):
     
-    response = client.chat.completions.create(
+    response = await create_chat_completion(
         model="gpt-4o",
         messages=[
             {"role": "system", "content": get_chat_system_prompt()},
@@ -630,7 +632,7 @@ async def get_chat_reply(messages):
                     tone_default = 3
                     response = get_analysis_params(wallet_data, tone_default, current_valuation)
                     os.remove(response["temp_image_path"])
-                    analysis = get_wallet_analysis_response(wallet_data, response["base64_image"], tone_default, current_valuation)
+                    analysis = await get_wallet_analysis_response(wallet_data, response["base64_image"], tone_default, current_valuation)
                     
                     return analysis
 
@@ -641,6 +643,8 @@ async def get_chat_reply(messages):
                 print("Tool call: get_recent_acquisitions")
                 try:
                     recent_acquisitions = get_recent_acquisitions(n=10)
+                    for acquisition in recent_acquisitions:
+                        acquisition['total_score'] = get_current_total_score(acquisition)
                     print("Recent acquisitions: ", recent_acquisitions)
 
                     messages.append({
@@ -648,7 +652,7 @@ async def get_chat_reply(messages):
                         "content": f"Here are my recent acquisitions: {json.dumps(recent_acquisitions)}"
                     })
 
-                    response = client.chat.completions.create(
+                    response = await create_chat_completion(
                         model="gpt-4o",
                         messages=[
                             {"role": "system", "content": "Summarize the recent acquisitions and provide your thoughts on them. Do not use markdown."},
@@ -671,7 +675,7 @@ async def get_chat_reply(messages):
                     "role": "assistant",
                     "content": f"Here is some recent activity from big collectors: {json.dumps(parsed_transfers)}"
                 })
-                response = client.chat.completions.create(
+                response = await create_chat_completion(
                     model="gpt-4o",
                     messages=[
                         {"role": "system", "content": get_chat_system_prompt()},
@@ -705,7 +709,7 @@ async def get_chat_reply(messages):
                     "content": f"Here are the trending collections: {json.dumps(trending_collections)}"
                 })
 
-                response = client.chat.completions.create(
+                response = await create_chat_completion(
                     model="gpt-4o",
                     messages=[
                         {"role": "system", "content": get_chat_system_prompt()},
@@ -726,7 +730,7 @@ async def get_chat_reply(messages):
                         "content": f"My wallet is valued at ${current_valuation:,.2f}"
                     })
 
-                    response = client.chat.completions.create(
+                    response = await create_chat_completion(
                         model="gpt-4o",
                         messages=[
                             {"role": "system", "content": get_chat_system_prompt()},
@@ -753,7 +757,7 @@ async def get_chat_reply(messages):
                         "content": f"Here's the latest from the art world based on the 24 Hours of Art report from {latest_report['timestamp']}:\n\n{latest_report['content']}"
                     })
 
-                    response = client.chat.completions.create(
+                    response = await create_chat_completion(
                         model="gpt-4o",
                         messages=[
                             {"role": "system", "content": "Summarize the latest art news in a conversational way, highlighting the most interesting and important updates. Do not use markdown."},
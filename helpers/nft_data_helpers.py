@@ -1,4 +1,3 @@
-import aiohttp
 import json
 import os
 import asyncio
@@ -6,11 +5,22 @@ import requests
 
 from dotenv import load_dotenv
 
+from helpers.simplehash_client import simplehash
+from helpers.nft_metadata_cache import *
+from helpers.reference_data import *
+from helpers.ens_cache import *
+from helpers.artto_balance_cache import *
+
 load_dotenv('.env.local')
 
 SIMPLEHASH_API_KEY = os.getenv('SIMPLEHASH_API_KEY')
 OPENSEA_API_KEY = os.getenv('OPENSEA_API_KEY')
 
+# Most ids the nfts/assets endpoint accepts per request
+SIMPLEHASH_ASSETS_BATCH_SIZE = 50
+# Most addresses ens/reverse_lookup accepts per request
+SIMPLEHASH_ENS_BATCH_SIZE = 50
+
 def get_twitter_from_opensea(response):
     if not response:
         print("No response from OpenSea API")
@@ -44,50 +54,126 @@ def get_wallet_user_data(wallet_address: str, api_key: str = OPENSEA_API_KEY) ->
         return response.json()
     return None
 
+def cache_assets_response(nft_ids, data):
+    """
+    Cache an nfts/assets response, and remember requested NFTs it didn't include as missing.
+
+    Args:
+        nft_ids (list): Normalized NFT ids that were requested
+        data (dict): The nfts/assets response
+
+    Returns:
+        dict: {nft_id: SimpleHash NFT object} for the NFTs in the response
+    """
+    fetched = {
+        get_nft_id(nft["chain"], nft["contract_address"], nft["token_id"]): nft
+        for nft in data.get("nfts", []) if nft
+    }
+    set_cached_nfts(fetched)
+    set_missing_nfts([nft_id for nft_id in nft_ids if nft_id not in fetched])
+    return fetched
+
+
+def split_nft_id_batches(nft_ids, batch_size=SIMPLEHASH_ASSETS_BATCH_SIZE):
+    """
+    Split NFT ids into batches the nfts/assets endpoint accepts.
+    """
+    return [nft_ids[i:i + batch_size] for i in range(0, len(nft_ids), batch_size)]
+
+
+def get_nfts_by_ids(nft_ids: list, api_key: str = SIMPLEHASH_API_KEY) -> dict:
+    """
+    Fetches NFTs by id from the metadata cache, filling misses through the SimpleHash
+    nfts/assets endpoint with as few requests as its batch limit allows.
+
+    Args:
+        nft_ids (list): List of NFT IDs in format "chain.contract_address.token_id"
+        api_key (str): The SimpleHash API key to use. Default: SIMPLEHASH_API_KEY
+
+    Returns:
+        dict: {nft_id: SimpleHash NFT object}, keyed by get_nft_id. NFTs that don't
+              exist or couldn't be fetched are left out.
+    """
+    nft_ids = list(dict.fromkeys(normalize_nft_id(nft_id) for nft_id in nft_ids))
+    cached = get_cached_nfts(nft_ids)
+    nfts = {nft_id: nft for nft_id, nft in cached.items() if nft}
+
+    for batch in split_nft_id_batches([nft_id for nft_id in nft_ids if nft_id not in cached]):
+        status, data = simplehash.get_sync("nfts/assets", params={"nft_ids": ",".join(batch)}, api_key=api_key)
+        if status == 200:
+            nfts.update(cache_assets_response(batch, data))
+        else:
+            print(f"Error fetching NFTs by id: {status}")
+    return nfts
+
+
+async def fetch_nfts_by_ids_async(nft_ids: list, api_key: str = SIMPLEHASH_API_KEY) -> tuple:
+    """
+    Like get_nfts_by_ids_async, but also reports which NFTs couldn't be fetched,
+    so callers can tell them apart from NFTs SimpleHash doesn't have.
+
+    Returns:
+        tuple: ({nft_id: SimpleHash NFT object}, failed_ids) where failed_ids are the
+               NFTs of batches that errored. NFTs that don't exist are in neither.
+    """
+    nft_ids = list(dict.fromkeys(normalize_nft_id(nft_id) for nft_id in nft_ids))
+    cached = get_cached_nfts(nft_ids)
+    nfts = {nft_id: nft for nft_id, nft in cached.items() if nft}
+
+    batches = split_nft_id_batches([nft_id for nft_id in nft_ids if nft_id not in cached])
+    responses = await asyncio.gather(*[
+        simplehash.get("nfts/assets", params={"nft_ids": ",".join(batch)}, api_key=api_key)
+        for batch in batches
+    ], return_exceptions=True)
+    failed_ids = []
+    for batch, response in zip(batches, responses):
+        if isinstance(response, Exception):
+            print(f"Error fetching NFTs by id: {str(response)}")
+            failed_ids.extend(batch)
+            continue
+        status, data = response
+        if status == 200:
+            nfts.update(cache_assets_response(batch, data))
+        else:
+            print(f"Error fetching NFTs by id: {status}")
+            failed_ids.extend(batch)
+    return nfts, failed_ids
+
+
+async def get_nfts_by_ids_async(nft_ids: list, api_key: str = SIMPLEHASH_API_KEY) -> dict:
+    """
+    Non-blocking equivalent of get_nfts_by_ids. Batches are requested concurrently.
+    """
+    nfts, _ = await fetch_nfts_by_ids_async(nft_ids, api_key)
+    return nfts
+
+
 def get_nfts_by_token_list(nft_ids: list, api_key: str = SIMPLEHASH_API_KEY) -> dict:
     """
-    Fetches NFT data for a list of token IDs using the SimpleHash API.
+    Fetches NFT data for a list of token IDs, from the metadata cache or the SimpleHash API.
     
     Args:
         nft_ids (list): List of NFT IDs in format "chain.contract_address.token_id"
         api_key (str): The SimpleHash API key to use. Default: SIMPLEHASH_API_KEY
         
     Returns:
-        dict: JSON response containing NFT data, or None if request fails
+        dict: {"nfts": [...]} with the NFTs that could be fetched, in the order of nft_ids
     """
-    url = "https://api.simplehash.com/api/v0/nfts/assets"
-    
-    # Convert list to comma-separated string
-    nft_ids_str = ",".join(nft_ids)
-    
-    params = {
-        "nft_ids": nft_ids_str
-    }
-
-    headers = {
-        "accept": "application/json",
-        "X-API-KEY": api_key
-    }
-
-    response = requests.get(url, headers=headers, params=params)
-    if response.status_code == 200:
-        return response.json()
-    return None
+    nfts = get_nfts_by_ids(nft_ids, api_key)
+    return {"nfts": [nfts[nft_id] for nft_id in dict.fromkeys(map(normalize_nft_id, nft_ids)) if nft_id in nfts]}
 
 
-def get_artto_balance(wallet_address: str, api_key: str = SIMPLEHASH_API_KEY) -> float:
+def fetch_artto_balance(wallet_address: str, api_key: str = SIMPLEHASH_API_KEY) -> float:
     """
-    Fetches $ARTTO token balance for a wallet address using SimpleHash API.
+    Fetches $ARTTO token balance for a wallet address using SimpleHash API, bypassing the cache.
     
     Args:
         wallet_address (str): The wallet address to lookup balance for
         api_key (str): The SimpleHash API key to use. Default: SIMPLEHASH_API_KEY
         
     Returns:
-        float: $ARTTO token balance, or 0 if request fails or token not found
+        float: $ARTTO token balance, 0 if the token isn't found, or None if request fails
     """
-    url = "https://api.simplehash.com/api/v0/fungibles/balances"
-    
     params = {
         "chains": "base",
         "wallet_addresses": wallet_address,
@@ -98,19 +184,30 @@ def get_artto_balance(wallet_address: str, api_key: str = SIMPLEHASH_API_KEY) ->
         "include_native_tokens": 0
     }
 
-    headers = {
-        "accept": "application/json",
-        "X-API-KEY": api_key
-    }
-
-    response = requests.get(url, headers=headers, params=params)
-    if response.status_code == 200:
-        data = response.json()
-        for fungible in data.get("fungibles", []):
-            if fungible.get("fungible_id") == "base.0x9239e9f9e325e706ef8b89936ece9d48896abbe3":
-                return float(fungible.get("total_quantity_string", "0"))
+    status, data = simplehash.get_sync("fungibles/balances", params=params, api_key=api_key)
+    if status != 200:
+        return None
+    for fungible in data.get("fungibles", []):
+        if fungible.get("fungible_id") == "base.0x9239e9f9e325e706ef8b89936ece9d48896abbe3":
+            return float(fungible.get("total_quantity_string", "0"))
     return 0
 
+
+def get_artto_balance(wallet_address: str, api_key: str = SIMPLEHASH_API_KEY) -> float:
+    """
+    Gets $ARTTO token balance for a wallet address, from the shared balance cache
+    or the SimpleHash API.
+    
+    Args:
+        wallet_address (str): The wallet address to lookup balance for
+        api_key (str): The SimpleHash API key to use. Default: SIMPLEHASH_API_KEY
+        
+    Returns:
+        float: $ARTTO token balance, or 0 if request fails or token not found
+    """
+    balance = get_cached_artto_balance(wallet_address, lambda address: fetch_artto_balance(address, api_key))
+    return balance if balance is not None else 0
+
 def get_wallet_collections(wallet_address: str, api_key: str = SIMPLEHASH_API_KEY, chains: str = "ethereum,base"):
     """
     Fetches NFT collections owned by a wallet address using the SimpleHash API.
@@ -123,8 +220,6 @@ def get_wallet_collections(wallet_address: str, api_key: str = SIMPLEHASH_API_KE
     Returns:
         dict: JSON response containing collection data, or None if request fails
     """
-    url = f"https://api.simplehash.com/api/v0/nfts/collections_by_wallets_v2"
-    
     params = {
         "chains": chains,
         "wallet_addresses": wallet_address,
@@ -135,15 +230,8 @@ def get_wallet_collections(wallet_address: str, api_key: str = SIMPLEHASH_API_KE
         "spam_score__lt": 90
     }
 
-    headers = {
-        "accept": "application/json",
-        "X-API-KEY": api_key
-    }
-
-    response = requests.get(url, headers=headers, params=params)
-    if response.status_code == 200:
-        return response.json()
-    return None
+    status, data = simplehash.get_sync("nfts/collections_by_wallets_v2", params=params, api_key=api_key)
+    return data
 
 def format_wallet_collections(response):
     collections = response["collections"]
@@ -176,39 +264,46 @@ def format_wallet_collections(response):
 
 def get_wallet_from_ens(ens_name: str, api_key: str = SIMPLEHASH_API_KEY) -> str:
     """
-    Fetches the wallet address for an ENS name using the SimpleHash API.
+    Fetches the wallet address for an ENS name, from the ENS cache or the SimpleHash API.
 
     Args:
         ens_name (str): The ENS name to lookup
         api_key (str): The SimpleHash API key to use. Default: SIMPLEHASH_API_KEY
 
     Returns:
-        str: The wallet address if one exists, otherwise None
+        str: The wallet address if one exists, otherwise the ENS name
     """
-    url = f"https://api.simplehash.com/api/v0/ens/lookup"
-    
+    cached = get_cached_ens_address(ens_name)
+    if cached is not None:
+        return cached or ens_name
+
     params = {
         "ens_names": ens_name
     }
 
-    headers = {
-        "accept": "application/json",
-        "X-API-KEY": api_key
-    }
-
-    response = requests.get(url, headers=headers, params=params)
-    if response.status_code == 200:
-        data = response.json()
+    status, data = simplehash.get_sync("ens/lookup", params=params, api_key=api_key)
+    if status == 200:
         if data and len(data) > 0:
             wallet = data[0].get("address")
             if wallet:
+                set_cached_ens_names({wallet: ens_name})
                 return wallet
+        set_missing_ens_address(ens_name)
     return ens_name
 
 
+def parse_reverse_lookup_response(wallet_addresses, data):
+    """
+    Returns:
+        dict: {wallet_address: ens_name or None} for every requested address
+    """
+    ens_names = {(item.get("address") or "").lower(): item.get("ens") for item in data or []}
+    return {address: ens_names.get(address.lower()) for address in wallet_addresses}
+
+
 def get_ens_name(wallet_address: str, api_key: str = SIMPLEHASH_API_KEY) -> str:
     """
-    Fetches the ENS name for a wallet address using the SimpleHash API.
+    Fetches the ENS name for a wallet address, from the ENS cache or the SimpleHash API.
 
     Args:
         wallet_address (str): The wallet address to lookup
@@ -217,23 +312,75 @@ def get_ens_name(wallet_address: str, api_key: str = SIMPLEHASH_API_KEY) -> str:
     Returns:
         str: The ENS name if one exists, otherwise the wallet address
     """
-    url = f"https://api.simplehash.com/api/v0/ens/reverse_lookup?wallet_addresses={wallet_address}"
+    cached = get_cached_ens_names([wallet_address])
+    if wallet_address in cached:
+        return cached[wallet_address] or wallet_address
 
-    headers = {
-        "accept": "application/json",
-        "X-API-KEY": api_key
+    params = {
+        "wallet_addresses": wallet_address
     }
 
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        data = response.json()
-        if data and len(data) > 0:
-            ens = data[0].get("ens")
-            if ens:
-                return ens
+    status, data = simplehash.get_sync("ens/reverse_lookup", params=params, api_key=api_key)
+    if status == 200:
+        ens_names = parse_reverse_lookup_response([wallet_address], data)
+        set_cached_ens_names(ens_names)
+        return ens_names[wallet_address] or wallet_address
+    return wallet_address
+
+
+
+async def get_ens_name_async(wallet_address: str, api_key: str = SIMPLEHASH_API_KEY) -> str:
+    """
+    Non-blocking equivalent of get_ens_name.
+
+    Args:
+        wallet_address (str): The wallet address to lookup
+        api_key (str): The SimpleHash API key to use. Default: SIMPLEHASH_API_KEY
+
+    Returns:
+        str: The ENS name if one exists, otherwise the wallet address
+    """
+    cached = get_cached_ens_names([wallet_address])
+    if wallet_address in cached:
+        return cached[wallet_address] or wallet_address
+
+    params = {
+        "wallet_addresses": wallet_address
+    }
+
+    status, data = await simplehash.get("ens/reverse_lookup", params=params, api_key=api_key)
+    if status == 200:
+        ens_names = parse_reverse_lookup_response([wallet_address], data)
+        set_cached_ens_names(ens_names)
+        return ens_names[wallet_address] or wallet_address
     return wallet_address
 
 
+def prefill_ens_names(wallet_addresses: list, api_key: str = SIMPLEHASH_API_KEY) -> int:
+    """
+    Resolve and cache the ENS names of wallet addresses that aren't cached yet,
+    SIMPLEHASH_ENS_BATCH_SIZE addresses per request.
+
+    Args:
+        wallet_addresses (list): Wallet addresses to resolve
+        api_key (str): The SimpleHash API key to use. Default: SIMPLEHASH_API_KEY
+
+    Returns:
+        int: Number of addresses looked up
+    """
+    wallet_addresses = list(dict.fromkeys(wallet_addresses))
+    cached = get_cached_ens_names(wallet_addresses)
+    misses = [address for address in wallet_addresses if address not in cached]
+
+    for i in range(0, len(misses), SIMPLEHASH_ENS_BATCH_SIZE):
+        batch = misses[i:i + SIMPLEHASH_ENS_BATCH_SIZE]
+        status, data = simplehash.get_sync("ens/reverse_lookup", params={"wallet_addresses": ",".join(batch)}, api_key=api_key)
+        if status == 200:
+            set_cached_ens_names(parse_reverse_lookup_response(batch, data))
+        else:
+            print(f"Error prefilling ENS names: {status}")
+    return len(misses)
+
 def get_wallet_valuation(wallet_address: str, api_key: str = SIMPLEHASH_API_KEY):
     """
     Fetches the total NFT valuation for a specific wallet address from the SimpleHash API.
@@ -245,16 +392,13 @@ def get_wallet_valuation(wallet_address: str, api_key: str = SIMPLEHASH_API_KEY)
     Returns:
         float: The USD value of NFTs in the wallet, or None if request fails
     """
-    url = f"https://api.simplehash.com/api/v0/nfts/owners/value?wallet_addresses={wallet_address}&spam_score__lte=70"
-
-    headers = {
-        "accept": "application/json",
-        "X-API-KEY": api_key
+    params = {
+        "wallet_addresses": wallet_address,
+        "spam_score__lte": 70
     }
 
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        data = response.json()
+    status, data = simplehash.get_sync("nfts/owners/value", params=params, api_key=api_key)
+    if status == 200:
         if data and "wallets" in data and len(data["wallets"]) > 0:
             return data["wallets"][0].get("usd_value")
     return None
@@ -276,20 +420,15 @@ async def get_wallet_nfts(wallet_address: str, networks: list = ['ethereum', 'ba
     # Join networks with comma for URL parameter
     networks_param = ','.join(networks)
     
-    # Construct the API endpoint URL
-    url = f"https://api.simplehash.com/api/v0/nfts/owners_v2?chains={networks_param}&wallet_addresses={wallet_address}&limit={limit}&order_by=transfer_time__desc"
-
-    headers = {
-        "accept": "application/json",
-        "X-API-KEY": api_key
+    params = {
+        "chains": networks_param,
+        "wallet_addresses": wallet_address,
+        "limit": limit,
+        "order_by": "transfer_time__desc"
     }
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=headers) as response:
-            if response.status == 200:
-                return await response.json()
-            else:
-                return None
+    status, data = await simplehash.get("nfts/owners_v2", params=params, api_key=api_key)
+    return data
 
 def filter_nft_metadata(response):
 
@@ -359,9 +498,7 @@ def format_collections(response, time_period):
 
 
 async def is_top_collection(collection_id, time_period='30d'):
-    with open('helpers/top_collections.json', 'r') as f:
-        top_collections = json.load(f)
-    return collection_id in [collection['collection_id'] for collection in top_collections['collections']]
+    return collection_id in get_top_collection_ids()
 
 async def get_recent_sales(wallet_addresses=None, only_mints=False, only_sales=False, from_timestamp=None, api_key=SIMPLEHASH_API_KEY):
     """
@@ -378,42 +515,32 @@ async def get_recent_sales(wallet_addresses=None, only_mints=False, only_sales=F
         dict: The response from SimpleHash API containing transfer data
     """
 
-    # If no wallet addresses provided, load from tracked wallets file
+    # If no wallet addresses provided, use the tracked wallets
     if wallet_addresses is None:
-        with open('other/tracked_wallets.json', 'r') as f:
-            tracked_wallets = json.load(f)
-        wallet_addresses = list(tracked_wallets.keys())
+        wallet_addresses = get_tracked_wallet_addresses()
     
-    # Convert addresses list to comma-separated string
-    addresses = '%2C'.join(wallet_addresses)
-    
-    # Build base URL with required parameters
-    url = f"https://api.simplehash.com/api/v0/nfts/transfers/wallets?chains=ethereum&wallet_addresses={addresses}&include_nft_details=1&spam_score__lt=80&order_by=timestamp_desc"
+    params = {
+        "chains": "ethereum",
+        "wallet_addresses": ",".join(wallet_addresses),
+        "include_nft_details": 1,
+        "spam_score__lt": 80,
+        "order_by": "timestamp_desc"
+    }
 
     # Add optional parameters
     if only_mints:
-        url += "&only_mints=1"
+        params["only_mints"] = 1
     if only_sales:
-        url += "&only_sales=1"
+        params["only_sales"] = 1
     if from_timestamp:
-        url += f"&from_timestamp={from_timestamp}"
+        params["from_timestamp"] = from_timestamp
     
-    # Add limit parameter after from_timestamp
-    url += "&limit=50"
-
-    headers = {
-        "accept": "application/json",
-        "X-API-KEY": api_key
-    }
+    params["limit"] = 50
 
-    # Send the GET request
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=headers) as response:
-            if response.status == 200:
-                return await response.json()
-            else:
-                print(f"Error fetching recent sales: {response.status}")
-                return None
+    status, data = await simplehash.get("nfts/transfers/wallets", params=params, api_key=api_key)
+    if status != 200:
+        print(f"Error fetching recent sales: {status}")
+    return data
 
 def parse_recent_sales_response(response):
     """
@@ -428,10 +555,7 @@ def parse_recent_sales_response(response):
     if not response or 'transfers' not in response:
         return []
 
-    # Load tracked wallets
-    with open('other/tracked_wallets.json', 'r') as f:
-        tracked_wallets_data = json.load(f)
-        tracked_wallets = {address.lower(): data['name'] for address, data in tracked_wallets_data.items()}
+    tracked_wallets = get_tracked_wallet_names()
 
     parsed_transfers = []
     
@@ -507,27 +631,17 @@ async def get_top_collections(time_period='24h', chains=['ethereum', 'base'], li
     Returns:
         dict: The response from the SimpleHash API containing top collections data.
     """
-    # Construct chains parameter
-    chains_param = '%2C'.join(chains)
-    
-    # Construct the API endpoint URL
-    url = f"https://api.simplehash.com/api/v0/nfts/collections/top_v2?chains={chains_param}&time_period={time_period}&limit={limit}"
-
-    headers = {
-        "accept": "application/json",
-        "X-API-KEY": api_key
+    params = {
+        "chains": ",".join(chains),
+        "time_period": time_period,
+        "limit": limit
     }
 
-    # Send the GET request
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=headers) as response:
-            # Check if the response is valid
-            if response.status == 200:
-                return await response.json()
-            else:
-                # Handle the case where the API response is invalid
-                print(f"Error fetching top collections: {response.status}")
-                return None
+    status, data = await simplehash.get("nfts/collections/top_v2", params=params, api_key=api_key)
+    if status != 200:
+        # Handle the case where the API response is invalid
+        print(f"Error fetching top collections: {status}")
+    return data
 
 async def get_trending_collections(time_period='24h', chains=['ethereum', 'base', 'solana'], limit=20, api_key=SIMPLEHASH_API_KEY):
     """
@@ -542,31 +656,21 @@ async def get_trending_collections(time_period='24h', chains=['ethereum', 'base'
     Returns:
         dict: The response from the SimpleHash API containing trending collections data.
     """
-    # Construct chains parameter
-    chains_param = '%2C'.join(chains)
-    
-    # Construct the API endpoint URL
-    url = f"https://api.simplehash.com/api/v0/nfts/collections/trending?chains={chains_param}&time_period={time_period}&limit={limit}"
-
-    headers = {
-        "accept": "application/json",
-        "X-API-KEY": api_key
+    params = {
+        "chains": ",".join(chains),
+        "time_period": time_period,
+        "limit": limit
     }
 
-    # Send the GET request
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=headers) as response:
-            # Check if the response is valid
-            if response.status == 200:
-                return await response.json()
-            else:
-                # Handle the case where the API response is invalid
-                print(f"Error fetching trending collections: {response.status}")
-                return None
+    status, data = await simplehash.get("nfts/collections/trending", params=params, api_key=api_key)
+    if status != 200:
+        # Handle the case where the API response is invalid
+        print(f"Error fetching trending collections: {status}")
+    return data
 
 async def get_nft_metadata(network, contract_address, token_id, api_key=SIMPLEHASH_API_KEY):
     """
-    Fetches NFT metadata from the SimpleHash API.
+    Fetches NFT metadata from the metadata cache or the SimpleHash API.
 
     Args:
         network (str): The blockchain network (e.g., 'eth', 'base').
@@ -575,28 +679,29 @@ async def get_nft_metadata(network, contract_address, token_id, api_key=SIMPLEHA
         api_key (str): The SimpleHash API key to use.
 
     Returns:
-        dict: The response from the SimpleHash API containing the NFT metadata.
+        dict: The filtered NFT metadata, or None if the NFT doesn't exist or the request fails.
     """
-    # Construct the API endpoint URL
-    url = f"https://api.simplehash.com/api/v0/nfts/{network}/{contract_address}/{token_id}"
-
-    headers = {
-        "accept": "application/json",
-        "X-API-KEY": api_key
-    }
-
-    # Send the GET request
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=headers) as response:
-            # Check if the response is valid
-            if response.status == 200:
-                response_data = await response.json()
-                formatted = filter_nft_metadata(response_data)
-                return formatted
-            else:
-                # Handle the case where the API response is invalid
-                print(f"Error fetching NFT metadata: {response.status}")
-                return None
+    nft_id = get_nft_id(network, contract_address, token_id)
+    cached = get_cached_nfts([nft_id])
+    if nft_id in cached:
+        if cached[nft_id] is None:
+            print(f"NFT metadata not found (cached): {nft_id}")
+            return None
+        return filter_nft_metadata(cached[nft_id])
+
+    status, data = await simplehash.get(
+        f"nfts/{network}/{contract_address}/{token_id}",
+        endpoint="nfts/{network}/{contract_address}/{token_id}",
+        api_key=api_key
+    )
+    if status == 200:
+        set_cached_nfts({nft_id: data})
+        return filter_nft_metadata(data)
+    if status == 404:
+        set_missing_nfts([nft_id])
+    # Handle the case where the API response is invalid
+    print(f"Error fetching NFT metadata: {status}")
+    return None
 
 
 async def main():
@@ -0,0 +1,156 @@
+import os
+import json
+
+import redis
+
+from dotenv import load_dotenv
+
+load_dotenv('.env.local')
+
+NFT_METADATA_CACHE_PREFIX = "nft_metadata"
+# Name, description, image and collection details practically never change,
+# prices and owners do
+NFT_METADATA_STATIC_TTL = int(os.getenv('NFT_METADATA_STATIC_TTL', 7 * 24 * 3600))
+NFT_METADATA_MARKET_TTL = int(os.getenv('NFT_METADATA_MARKET_TTL', 600))
+# Kept short since SimpleHash can take a few minutes to index a fresh mint
+NFT_METADATA_MISSING_TTL = int(os.getenv('NFT_METADATA_MISSING_TTL', 300))
+
+# Fields of a SimpleHash NFT object cached under the market TTL
+MARKET_FIELDS = ("last_sale", "owners", "owner_count")
+COLLECTION_MARKET_FIELDS = ("floor_prices", "top_bids", "distinct_owner_count")
+
+metadata_redis = redis.from_url(os.getenv('CELERY_BROKER_URL', 'redis://localhost'))
+
+
+def get_nft_id(network, contract_address, token_id):
+    """
+    Cache id of an NFT, in SimpleHash's "chain.contract_address.token_id" format
+    with the contract address lowercased.
+    """
+    return f"{network}.{contract_address.lower()}.{token_id}"
+
+
+def normalize_nft_id(nft_id):
+    network, contract_address, token_id = nft_id.split(".")
+    return get_nft_id(network, contract_address, token_id)
+
+
+def split_nft(nft):
+    """
+    Split a SimpleHash NFT object into its static and market parts.
+
+    Returns:
+        tuple: (static, market) dicts
+    """
+    collection = nft.get("collection") or {}
+    static = {key: value for key, value in nft.items() if key not in MARKET_FIELDS}
+    static["collection"] = {key: value for key, value in collection.items() if key not in COLLECTION_MARKET_FIELDS}
+    market = {key: nft[key] for key in MARKET_FIELDS if key in nft}
+    market["collection"] = {key: collection[key] for key in COLLECTION_MARKET_FIELDS if key in collection}
+    return static, market
+
+
+def merge_nft(static, market):
+    """
+    Inverse of split_nft.
+    """
+    nft = dict(static)
+    nft.update({key: value for key, value in market.items() if key != "collection"})
+    nft["collection"] = {**static.get("collection", {}), **market.get("collection", {})}
+    return nft
+
+
+def get_cached_nfts(nft_ids):
+    """
+    Look up NFTs in the metadata cache in a single round trip. An NFT is only
+    a hit while both its static and its market part are cached.
+
+    Args:
+        nft_ids (list): NFT ids from get_nft_id
+
+    Returns:
+        dict: {nft_id: SimpleHash NFT object} for hits, {nft_id: None} for NFTs
+              known to be missing. Misses are left out.
+    """
+    if not nft_ids:
+        return {}
+    try:
+        pipe = metadata_redis.pipeline()
+        for nft_id in nft_ids:
+            pipe.get(f"{NFT_METADATA_CACHE_PREFIX}:static:{nft_id}")
+            pipe.get(f"{NFT_METADATA_CACHE_PREFIX}:market:{nft_id}")
+            pipe.exists(f"{NFT_METADATA_CACHE_PREFIX}:missing:{nft_id}")
+        values = pipe.execute()
+    except Exception as e:
+        print(f"Error reading NFT metadata cache: {str(e)}")
+        return {}
+
+    cached = {}
+    counts = {"hits": 0, "misses": 0, "missing_hits": 0}
+    for i, nft_id in enumerate(nft_ids):
+        static, market, missing = values[3 * i:3 * i + 3]
+        if missing:
+            cached[nft_id] = None
+            counts["missing_hits"] += 1
+        elif static is not None and market is not None:
+            cached[nft_id] = merge_nft(json.loads(static), json.loads(market))
+            counts["hits"] += 1
+        else:
+            counts["misses"] += 1
+
+    try:
+        pipe = metadata_redis.pipeline()
+        for counter, count in counts.items():
+            if count:
+                pipe.hincrby(f"{NFT_METADATA_CACHE_PREFIX}:stats", counter, count)
+        pipe.execute()
+    except Exception as e:
+        print(f"Error updating NFT metadata cache stats: {str(e)}")
+    return cached
+
+
+def set_cached_nfts(nfts):
+    """
+    Cache SimpleHash NFT objects, the static and market parts under their own TTLs.
+
+    Args:
+        nfts (dict): {nft_id: SimpleHash NFT object}
+    """
+    if not nfts:
+        return
+    try:
+        pipe = metadata_redis.pipeline()
+        for nft_id, nft in nfts.items():
+            static, market = split_nft(nft)
+            pipe.set(f"{NFT_METADATA_CACHE_PREFIX}:static:{nft_id}", json.dumps(static), ex=NFT_METADATA_STATIC_TTL)
+            pipe.set(f"{NFT_METADATA_CACHE_PREFIX}:market:{nft_id}", json.dumps(market), ex=NFT_METADATA_MARKET_TTL)
+            pipe.delete(f"{NFT_METADATA_CACHE_PREFIX}:missing:{nft_id}")
+        pipe.execute()
+    except Exception as e:
+        print(f"Error writing NFT metadata cache: {str(e)}")
+
+
+def set_missing_nfts(nft_ids):
+    """
+    Remember that SimpleHash has no NFT for these ids, for NFT_METADATA_MISSING_TTL seconds.
+    """
+    if not nft_ids:
+        return
+    try:
+        pipe = metadata_redis.pipeline()
+        for nft_id in nft_ids:
+            pipe.set(f"{NFT_METADATA_CACHE_PREFIX}:missing:{nft_id}", 1, ex=NFT_METADATA_MISSING_TTL)
+        pipe.execute()
+    except Exception as e:
+        print(f"Error writing NFT metadata cache: {str(e)}")
+
+
+def get_nft_metadata_cache_stats():
+    """
+    Returns:
+        dict: {"hits": int, "misses": int, "missing_hits": int}
+    """
+    stats = {"hits": 0, "misses": 0, "missing_hits": 0}
+    for field, count in metadata_redis.hgetall(f"{NFT_METADATA_CACHE_PREFIX}:stats").items():
+        stats[field.decode()] = int(count)
+    return stats
@@ -0,0 +1,93 @@
+import os
+
+import redis
+
+from dotenv import load_dotenv
+
+load_dotenv('.env.local')
+
+POST_DEDUPE_PREFIX = "post_dedupe"
+# How often the sets are topped up from posts_created and ignore_posts, for
+# rows written without going through set_post_created or set_post_to_ignore
+POST_DEDUPE_WARM_TTL = int(os.getenv('POST_DEDUPE_WARM_TTL', 24 * 3600))
+# Upper bound on a warm scan, after which another caller may start one
+POST_DEDUPE_WARM_LOCK_TTL = int(os.getenv('POST_DEDUPE_WARM_LOCK_TTL', 300))
+
+REPLIED_POSTS_KEY = f"{POST_DEDUPE_PREFIX}:replied"
+IGNORED_POSTS_KEY = f"{POST_DEDUPE_PREFIX}:ignored"
+WARMED_KEY = f"{POST_DEDUPE_PREFIX}:warmed"
+WARM_LOCK_KEY = f"{POST_DEDUPE_PREFIX}:warming"
+# Added to both sets once a warm scan has finished. Post ids are never empty,
+# so it can't collide with one, and a set that was evicted and recreated by
+# SADD doesn't have it.
+WARM_SENTINEL = ""
+
+post_redis = redis.from_url(os.getenv('CELERY_BROKER_URL', 'redis://localhost'))
+
+
+def is_post_index_warm():
+    """
+    The index is only warm while the marker and both fully loaded sets are
+    there. If Redis evicted a set, lookups against it would miss posts.
+    """
+    pipe = post_redis.pipeline()
+    pipe.exists(WARMED_KEY)
+    pipe.sismember(REPLIED_POSTS_KEY, WARM_SENTINEL)
+    pipe.sismember(IGNORED_POSTS_KEY, WARM_SENTINEL)
+    return all(pipe.execute())
+
+
+def mark_post_index_warm():
+    pipe = post_redis.pipeline()
+    pipe.sadd(REPLIED_POSTS_KEY, WARM_SENTINEL)
+    pipe.sadd(IGNORED_POSTS_KEY, WARM_SENTINEL)
+    pipe.set(WARMED_KEY, 1, ex=POST_DEDUPE_WARM_TTL)
+    pipe.execute()
+
+
+def claim_post_index_warm():
+    """
+    Take the lock for a warm scan, so only one caller runs it when the
+    marker expires. Expires after POST_DEDUPE_WARM_LOCK_TTL seconds.
+    """
+    return bool(post_redis.set(WARM_LOCK_KEY, 1, nx=True, ex=POST_DEDUPE_WARM_LOCK_TTL))
+
+
+def release_post_index_warm():
+    post_redis.delete(WARM_LOCK_KEY)
+
+
+def add_to_post_index(replied_ids=(), ignored_ids=()):
+    """
+    Add post ids to the replied-to and ignored sets.
+
+    Args:
+        replied_ids (list): Ids of posts Artto has replied to
+        ignored_ids (list): Ids of posts to ignore
+    """
+    replied_ids = [str(post_id) for post_id in replied_ids if post_id]
+    ignored_ids = [str(post_id) for post_id in ignored_ids if post_id]
+    pipe = post_redis.pipeline()
+    if replied_ids:
+        pipe.sadd(REPLIED_POSTS_KEY, *replied_ids)
+    if ignored_ids:
+        pipe.sadd(IGNORED_POSTS_KEY, *ignored_ids)
+    pipe.execute()
+
+
+def get_post_index_flags(post_ids):
+    """
+    Check a whole list of post ids against both sets in one round trip.
+
+    Returns:
+        tuple: (replied_ids, ignored_ids) sets of the given ids, as strings
+    """
+    post_ids = [str(post_id) for post_id in post_ids]
+    pipe = post_redis.pipeline()
+    for post_id in post_ids:
+        pipe.sismember(REPLIED_POSTS_KEY, post_id)
+        pipe.sismember(IGNORED_POSTS_KEY, post_id)
+    flags = pipe.execute()
+    replied_ids = {post_id for post_id, flag in zip(post_ids, flags[0::2]) if flag}
+    ignored_ids = {post_id for post_id, flag in zip(post_ids, flags[1::2]) if flag}
+    return replied_ids, ignored_ids
@@ -0,0 +1,130 @@
+import os
+import json
+import time
+import threading
+from types import MappingProxyType
+
+import redis
+
+from dotenv import load_dotenv
+
+load_dotenv('.env.local')
+
+TOP_COLLECTIONS_PATH = 'helpers/top_collections.json'
+TRACKED_WALLETS_PATH = 'other/tracked_wallets.json'
+
+REFERENCE_DATA_PREFIX = "reference_data"
+TOP_COLLECTIONS_KEY = f"{REFERENCE_DATA_PREFIX}:top_collection_ids"
+# How often a process checks Redis for a list written by another host
+REFERENCE_DATA_REFRESH_INTERVAL = int(os.getenv('REFERENCE_DATA_REFRESH_INTERVAL', 300))
+
+reference_redis = redis.from_url(os.getenv('CELERY_BROKER_URL', 'redis://localhost'))
+
+
+class ReferenceFile:
+    """
+    A JSON file parsed once and kept in memory.
+
+    get() stats the file and parses it again only when its mtime has changed,
+    so edits are picked up without a restart.
+    """
+
+    def __init__(self, path, parse):
+        self.path = path
+        self.parse = parse
+        self._mtime = None
+        self._value = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    with open(self.path, 'r') as f:
+                        self._value = self.parse(json.load(f))
+                    self._mtime = mtime
+        return self._value
+
+
+class SharedReferenceFile(ReferenceFile):
+    """
+    Reference data kept in Redis, so a refresh on one host reaches every host,
+    with the JSON file as the seed until the first refresh has run.
+
+    The Redis value holds the parsed form as a JSON list. get() re-reads it at
+    most every REFERENCE_DATA_REFRESH_INTERVAL seconds, and falls back to the
+    file when the key is missing or Redis is unreachable.
+    """
+
+    def __init__(self, path, parse, redis_key, refresh_interval=REFERENCE_DATA_REFRESH_INTERVAL):
+        super().__init__(path, parse)
+        self.redis_key = redis_key
+        self.refresh_interval = refresh_interval
+        self._shared_value = None
+        self._checked_at = 0
+
+    def get(self):
+        if time.monotonic() - self._checked_at >= self.refresh_interval:
+            try:
+                value = reference_redis.get(self.redis_key)
+                self._shared_value = frozenset(json.loads(value)) if value is not None else None
+            except Exception as e:
+                print(f"Error reading {self.redis_key} from Redis: {str(e)}")
+            self._checked_at = time.monotonic()
+        if self._shared_value is not None:
+            return self._shared_value
+        return super().get()
+
+    def set(self, values):
+        reference_redis.set(self.redis_key, json.dumps(sorted(values)))
+        self._shared_value = frozenset(values)
+        self._checked_at = time.monotonic()
+
+
+def _parse_top_collections(data):
+    return frozenset(collection['collection_id'] for collection in data['collections'])
+
+
+def _parse_tracked_wallets(data):
+    # Keeps the file's address casing and order in "addresses" for API calls
+    return MappingProxyType({
+        "addresses": tuple(data.keys()),
+        "names": MappingProxyType({address.lower(): wallet['name'] for address, wallet in data.items()})
+    })
+
+
+top_collections = SharedReferenceFile(TOP_COLLECTIONS_PATH, _parse_top_collections, TOP_COLLECTIONS_KEY)
+tracked_wallets = ReferenceFile(TRACKED_WALLETS_PATH, _parse_tracked_wallets)
+
+
+def get_top_collection_ids():
+    """
+    Returns:
+        frozenset: collection_ids of the top collections
+    """
+    return top_collections.get()
+
+
+def get_tracked_wallet_addresses():
+    """
+    Returns:
+        tuple: Tracked wallet addresses, as written in the file
+    """
+    return tracked_wallets.get()["addresses"]
+
+
+def get_tracked_wallet_names():
+    """
+    Returns:
+        Mapping: {lowercase wallet address: wallet name}
+    """
+    return tracked_wallets.get()["names"]
+
+
+def save_top_collections(response):
+    """
+    Replace the top collections with a top_v2 response, for every host.
+    helpers/top_collections.json is left as it is, as the seed.
+    """
+    top_collections.set(_parse_top_collections(response))
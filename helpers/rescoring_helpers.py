@@ -0,0 +1,31 @@
+import os
+import json
+
+import redis
+
+from dotenv import load_dotenv
+
+load_dotenv('.env.local')
+
+RESCORE_CHECKPOINT_KEY = "rescore_nft_scores:checkpoint"
+
+checkpoint_redis = redis.from_url(os.getenv('CELERY_BROKER_URL', 'redis://localhost'))
+
+
+def get_rescore_checkpoint():
+    """
+    Get how far the last rescoring run got.
+
+    Returns:
+        dict: {"weights_id": str, "last_id": str, "done": bool}, or None if no run has started
+    """
+    checkpoint = checkpoint_redis.get(RESCORE_CHECKPOINT_KEY)
+    return json.loads(checkpoint) if checkpoint is not None else None
+
+
+def set_rescore_checkpoint(weights_id, last_id, done=False):
+    checkpoint_redis.set(RESCORE_CHECKPOINT_KEY, json.dumps({
+        "weights_id": weights_id,
+        "last_id": last_id,
+        "done": done
+    }))
@@ -0,0 +1,159 @@
+import os
+import time
+import atexit
+import asyncio
+import threading
+
+import aiohttp
+
+from dotenv import load_dotenv
+
+load_dotenv('.env.local')
+
+SIMPLEHASH_API_KEY = os.getenv('SIMPLEHASH_API_KEY')
+SIMPLEHASH_BASE_URL = "https://api.simplehash.com/api/v0"
+SIMPLEHASH_TIMEOUT = float(os.getenv('SIMPLEHASH_TIMEOUT', 20))
+SIMPLEHASH_MAX_CONNECTIONS = int(os.getenv('SIMPLEHASH_MAX_CONNECTIONS', 20))
+SIMPLEHASH_MAX_RETRIES = int(os.getenv('SIMPLEHASH_MAX_RETRIES', 3))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class SimpleHashClient:
+    """
+    SimpleHash API client with one keep-alive connection pool per process.
+
+    The pool lives on a background event loop thread, so it outlives the
+    short-lived loops async_to_sync creates for each Celery task and Flask
+    view. get() awaits from any event loop, get_sync() blocks from sync code,
+    and both share the same connections. Requests time out after
+    SIMPLEHASH_TIMEOUT seconds and are retried on 429/5xx and connection errors.
+    """
+
+    def __init__(self, api_key=SIMPLEHASH_API_KEY, timeout=SIMPLEHASH_TIMEOUT,
+                 max_connections=SIMPLEHASH_MAX_CONNECTIONS, max_retries=SIMPLEHASH_MAX_RETRIES):
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self._loop = None
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._metrics = {}
+        atexit.register(self.close)
+
+    def _get_loop(self):
+        # Started lazily, and again in each forked Celery worker process since
+        # threads don't survive a fork
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="simplehash-client", daemon=True).start()
+                self._session = asyncio.run_coroutine_threadsafe(self._create_session(), loop).result()
+                self._loop = loop
+                self._pid = os.getpid()
+                self._metrics = {}
+            return self._loop
+
+    async def _create_session(self):
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"accept": "application/json"}
+        )
+
+    def close(self):
+        if self._loop is not None and self._pid == os.getpid():
+            asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result(timeout=5)
+            self._loop = None
+
+    def _endpoint_metrics(self, endpoint):
+        return self._metrics.setdefault(endpoint, {"requests": 0, "errors": 0, "retries": 0, "total_ms": 0.0, "max_ms": 0.0})
+
+    def _record(self, endpoint, started, status):
+        metrics = self._endpoint_metrics(endpoint)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        metrics["requests"] += 1
+        metrics["total_ms"] += elapsed_ms
+        metrics["max_ms"] = max(metrics["max_ms"], elapsed_ms)
+        if status != 200:
+            metrics["errors"] += 1
+
+    async def _request(self, path, params, endpoint, api_key):
+        headers = {"X-API-KEY": api_key or self.api_key}
+        started = time.perf_counter()
+        status = None
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                async with self._session.get(f"{SIMPLEHASH_BASE_URL}/{path.lstrip('/')}", params=params, headers=headers) as response:
+                    status = response.status
+                    if status == 200:
+                        data = await response.json(content_type=None)
+                        self._record(endpoint, started, status)
+                        return status, data
+                    if status not in RETRY_STATUSES:
+                        self._record(endpoint, started, status)
+                        return status, None
+                    retry_after = response.headers.get("Retry-After")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"SimpleHash request to {endpoint} failed: {str(e)}")
+                status = None
+
+            if attempt < self.max_retries:
+                self._endpoint_metrics(endpoint)["retries"] += 1
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else 0.5 * 2 ** attempt
+                await asyncio.sleep(delay)
+
+        self._record(endpoint, started, status)
+        return status, None
+
+    async def get(self, path, params=None, endpoint=None, api_key=None):
+        """
+        GET a SimpleHash API path, e.g. "nfts/base/0x.../1".
+
+        Args:
+            path (str): Path relative to /api/v0
+            params (dict): Query parameters
+            endpoint (str): Name to record latency under. Default: path
+            api_key (str): Overrides the client's API key
+
+        Returns:
+            tuple: (status, data). status is None if every attempt failed to
+                   connect, data is None unless status is 200
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self._request(path, params, endpoint or path, api_key), self._get_loop()
+        )
+        return await asyncio.wrap_future(future)
+
+    def get_sync(self, path, params=None, endpoint=None, api_key=None):
+        """
+        Blocking equivalent of get, for sync code.
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self._request(path, params, endpoint or path, api_key), self._get_loop()
+        )
+        return future.result()
+
+    def get_metrics(self):
+        """
+        Per-endpoint request counts and latency for this process.
+
+        Returns:
+            dict: {endpoint: {"requests", "errors", "retries", "avg_ms", "max_ms"}}
+        """
+        return {
+            endpoint: {
+                "requests": metrics["requests"],
+                "errors": metrics["errors"],
+                "retries": metrics["retries"],
+                "avg_ms": round(metrics["total_ms"] / metrics["requests"], 1) if metrics["requests"] else 0,
+                "max_ms": round(metrics["max_ms"], 1),
+            }
+            for endpoint, metrics in list(self._metrics.items())
+        }
+
+
+simplehash = SimpleHashClient()
@@ -0,0 +1,106 @@
+import os
+import time
+import threading
+
+from supabase import create_client, Client, ClientOptions
+
+from dotenv import load_dotenv
+
+load_dotenv('.env.local')
+
+# Refresh the access token this many seconds before it expires
+SUPABASE_REFRESH_MARGIN = int(os.getenv('SUPABASE_REFRESH_MARGIN', 120))
+# Refresh from a background thread instead of on the first call near expiry
+SUPABASE_BACKGROUND_REFRESH = os.getenv('SUPABASE_BACKGROUND_REFRESH', 'false').lower() == 'true'
+
+
+class SupabaseSessionManager:
+    """
+    One signed-in Supabase client per process, with the access token's expiry
+    tracked locally.
+
+    get_client() returns the client without touching gotrue until the token is
+    within SUPABASE_REFRESH_MARGIN of expiring, then refreshes it once under a
+    lock. After a fork (Celery prefork, gunicorn) the child signs in with its
+    own client instead of sharing the parent's connection pool. gotrue's own
+    auto refresh timer is turned off, since its thread doesn't survive a fork.
+    """
+
+    def __init__(self, url, key, email, password, refresh_margin=SUPABASE_REFRESH_MARGIN,
+                 background_refresh=SUPABASE_BACKGROUND_REFRESH):
+        self.url = url
+        self.key = key
+        self.email = email
+        self.password = password
+        self.refresh_margin = refresh_margin
+        self.background_refresh = background_refresh
+        self._client = None
+        self._expires_at = 0
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stats = {"sign_ins": 0, "refreshes": 0, "refresh_errors": 0}
+        # A fork while another thread holds the lock would leave it held in the child
+        os.register_at_fork(after_in_child=self._reset_lock)
+
+    def _reset_lock(self):
+        self._lock = threading.Lock()
+
+    def get_client(self) -> Client:
+        if self._pid == os.getpid() and time.time() < self._expires_at - self.refresh_margin:
+            return self._client
+        with self._lock:
+            if self._pid != os.getpid():
+                self._sign_in()
+            elif time.time() >= self._expires_at - self.refresh_margin:
+                self._refresh()
+            return self._client
+
+    def _sign_in(self):
+        client = create_client(self.url, self.key, options=ClientOptions(auto_refresh_token=False))
+        response = client.auth.sign_in_with_password({"email": self.email, "password": self.password})
+        self._client = client
+        self._expires_at = response.session.expires_at
+        self._pid = os.getpid()
+        self._stats = {"sign_ins": 1, "refreshes": 0, "refresh_errors": 0}
+        print("Successfully connected to Supabase!")
+        if self.background_refresh:
+            threading.Thread(target=self._refresh_in_background, args=(self._pid,), name="supabase-refresh", daemon=True).start()
+
+    def _refresh(self):
+        try:
+            response = self._client.auth.refresh_session()
+            self._expires_at = response.session.expires_at
+            self._stats["refreshes"] += 1
+        except Exception as e:
+            print(f"Error refreshing Supabase session, signing in again: {str(e)}")
+            self._stats["refresh_errors"] += 1
+            self._sign_in_again()
+
+    def _sign_in_again(self):
+        response = self._client.auth.sign_in_with_password({"email": self.email, "password": self.password})
+        self._expires_at = response.session.expires_at
+        self._stats["sign_ins"] += 1
+
+    def _refresh_in_background(self, pid):
+        while self._pid == pid:
+            time.sleep(max(30, self._expires_at - self.refresh_margin - time.time()))
+            with self._lock:
+                if self._pid != pid:
+                    return
+                if time.time() >= self._expires_at - self.refresh_margin:
+                    try:
+                        self._refresh()
+                    except Exception as e:
+                        print(f"Error refreshing Supabase session in background: {str(e)}")
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: Sign-ins, refreshes and failed refreshes in this process, and
+                  seconds until the access token expires
+        """
+        return {
+            **self._stats,
+            "pid": self._pid,
+            "expires_in": round(self._expires_at - time.time()) if self._pid == os.getpid() else None
+        }
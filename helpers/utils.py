@@ -4,8 +4,11 @@ import random
 import time
 
 from datetime import datetime, date, timezone, timedelta
-from supabase import create_client, Client
+from helpers.supabase_session import SupabaseSessionManager
+from helpers.post_dedupe_index import *
 from helpers.prompts.casual_thought_topics import *
+from helpers.artwork_analysis_codec import FlatArtworkAnalysis
+from helpers.image_hash_helpers import get_phash_bands, hamming_distance, PHASH_MAX_DISTANCE, DHASH_MAX_DISTANCE
 
 import hashlib
 import hmac
@@ -73,27 +76,76 @@ def generate_post_params():
 
     return post_params
 
+supabase_session = SupabaseSessionManager(
+    os.getenv("SUPABASE_URL"),
+    os.getenv("SUPABASE_KEY"),
+    os.getenv("SUPABASE_USER"),
+    os.getenv("SUPABASE_PASSWORD")
+)
+
 def get_supabase_client():
-    url: str = os.getenv("SUPABASE_URL")
-    key: str = os.getenv("SUPABASE_KEY")
-    supabase: Client = create_client(url, key)
-    supabase.auth.sign_in_with_password({ "email": os.getenv("SUPABASE_USER"), "password": os.getenv("SUPABASE_PASSWORD") })
-    return supabase
+    return supabase_session.get_client()
+
+# Signed in on the first refresh_or_get_supabase_client call rather than at import
+supabase = None
 
-supabase = get_supabase_client()
-print("Successfully connected to Supabase!")
+# Extra attempts at getting a signed-in client before giving up
+SUPABASE_SESSION_RETRIES = int(os.getenv('SUPABASE_SESSION_RETRIES', 2))
+SUPABASE_SESSION_RETRY_DELAY = float(os.getenv('SUPABASE_SESSION_RETRY_DELAY', 1))
 
 def refresh_or_get_supabase_client():
-    try:
-        print("Refreshing session")
-        global supabase
-        response = supabase.auth.get_session()
-    except Exception as e:
+    """
+    Get the signed-in Supabase client and point the module-level supabase at it
+
+    Raises:
+        Exception: The sign-in or refresh error, once every retry has failed, so
+                   callers fail on the real cause rather than on supabase being None
+    """
+    global supabase
+    for attempt in range(SUPABASE_SESSION_RETRIES + 1):
         try:
-            supabase = get_supabase_client()
+            supabase = supabase_session.get_client()
+            return supabase
         except Exception as e:
-            print(f"Error getting new session: {str(e)}")
-    return supabase
+            print(f"Error getting new session (attempt {attempt + 1}): {str(e)}")
+            if attempt == SUPABASE_SESSION_RETRIES:
+                raise
+            time.sleep(SUPABASE_SESSION_RETRY_DELAY * (attempt + 1))
+
+# ids per in_ filter, which goes in the URL; nft_scores ids are 64 hex characters
+SUPABASE_IN_FILTER_CHUNK_SIZE = int(os.getenv('SUPABASE_IN_FILTER_CHUNK_SIZE', 100))
+# Rows per bulk write request body
+SUPABASE_UPSERT_CHUNK_SIZE = int(os.getenv('SUPABASE_UPSERT_CHUNK_SIZE', 500))
+
+
+def bulk_update_by_ids(table, values, ids, id_column="id", chunk_size=SUPABASE_IN_FILTER_CHUNK_SIZE):
+    """
+    Set the same values on many rows with one in_-filtered UPDATE per chunk of ids
+    
+    Args:
+        table (str): Table name
+        values (dict): Columns to set
+        ids (list): Values of id_column to update
+        id_column (str): Column to filter on. Default: "id"
+        chunk_size (int): Ids per request. Default: SUPABASE_IN_FILTER_CHUNK_SIZE
+        
+    Returns:
+        dict: {"data": updated rows, "failed_ids": ids in chunks that failed}
+    """
+    response = refresh_or_get_supabase_client()
+
+    ids = list(dict.fromkeys(ids))
+    report = {"data": [], "failed_ids": []}
+    for i in range(0, len(ids), chunk_size):
+        chunk = ids[i:i + chunk_size]
+        try:
+            result = supabase.table(table).update(values).in_(id_column, chunk).execute()
+            report["data"].extend(result.data)
+        except Exception as e:
+            print(f"Error updating {len(chunk)} rows in {table}: {str(e)}")
+            report["failed_ids"].extend(chunk)
+    return report
+
 
 def update_nft_scores_status(nft_ids, status):
     """
@@ -104,19 +156,9 @@ def update_nft_scores_status(nft_ids, status):
         status (str): New status value to set
         
     Returns:
-        dict: Response from Supabase update operation
+        dict: {"data": updated rows, "failed_ids": ids that couldn't be updated}
     """
-    response = refresh_or_get_supabase_client()
-    
-    try:
-        result = supabase.table("nft_scores") \
-            .update({"status": status}) \
-            .in_("id", nft_ids) \
-            .execute()
-        return result.data
-    except Exception as e:
-        print(f"Error updating NFT scores status: {str(e)}")
-        return None
+    return bulk_update_by_ids("nft_scores", {"status": status}, nft_ids)
 
 
 def get_nfts_to_sell(since_timestamp=None, max_amount=50):
@@ -177,11 +219,11 @@ def get_taste_weights():
             response.data[0]['weights'] = json.loads(response.data[0]['weights'])
     return response.data[0]
 
-def set_taste_weights(weights):
-    print("setting weights")
-    print(weights.updated_weights)
-    print(weights.reason)
-    weights_json = {
+def get_weights_json(weights):
+    """
+    Convert an UpdateWeights into the weights dict stored in analysis_weights
+    """
+    return {
         "technical_innovation_weight": weights.updated_weights.TECHNICAL_INNOVATION_WEIGHT,
         "artistic_merit_weight": weights.updated_weights.ARTISTIC_MERIT_WEIGHT,
         "cultural_resonance_weight": weights.updated_weights.CULTURAL_RESONANCE_WEIGHT,
@@ -190,6 +232,12 @@ def set_taste_weights(weights):
         "emotional_impact_weight": weights.updated_weights.EMOTIONAL_IMPACT_WEIGHT,
         "ai_collector_perspective_weight": weights.updated_weights.AI_COLLECTOR_PERSPECTIVE_WEIGHT,
     }
+
+def set_taste_weights(weights):
+    print("setting weights")
+    print(weights.updated_weights)
+    print(weights.reason)
+    weights_json = get_weights_json(weights)
     response = refresh_or_get_supabase_client()
     insert_data = {
         "id": hashlib.sha256(f"{str(datetime.now())}".encode()).hexdigest(),
@@ -212,6 +260,7 @@ def get_artto_reward_batch_post(since_timestamp=None):
         "decision",
         "rationale_post",
         "total_score",
+        "rescored_total_score",
         "reward_points",
         "sender_address",
         "timestamp"
@@ -232,7 +281,7 @@ def get_simple_analysis_nft_batch(since_timestamp=None):
     print("Getting simple analysis NFT batch; since_timestamp: ", since_timestamp)
     response = refresh_or_get_supabase_client()
     query = supabase.table("nft_scores").select(
-        "id,analysis_text,total_score,image_url,acquire_recommendation"
+        "id,analysis_text,total_score,rescored_total_score,image_url,acquire_recommendation"
     ).eq("source", "simple-analysis")
     
     if since_timestamp:
@@ -304,14 +353,14 @@ def get_nft_scores(n=10):
 def get_gallery_nft_scores(n=100):
     response = refresh_or_get_supabase_client()
     response = supabase.table("nft_scores").select(
-        "network,contract_address,timestamp,token_id,scores,analysis_text,image_url,acquire_recommendation,total_score"
+        "network,contract_address,timestamp,token_id,scores,analysis_text,image_url,acquire_recommendation,total_score,rescored_total_score"
     ).eq("acquire_recommendation", True).filter("decision", "in", '("ACQUIRE","REJECT","BURN","SELL")').order("timestamp", desc=True).limit(n).execute()
     return response.data
 
 def get_recent_nft_scores(n=6, start_timestamp=None):
     response = refresh_or_get_supabase_client()
     query = supabase.table("nft_scores").select(
-        "network,contract_address,token_id,analysis_text,image_url,acquire_recommendation,scores,total_score"
+        "network,contract_address,token_id,analysis_text,image_url,acquire_recommendation,scores,total_score,rescored_total_score"
     ).order("timestamp", desc=True)
     
     if start_timestamp:
@@ -323,7 +372,7 @@ def get_recent_nft_scores(n=6, start_timestamp=None):
 def get_recent_acquisitions(n=6, start_timestamp=None):
     response = refresh_or_get_supabase_client()
     query = supabase.table("nft_scores").select(
-        "network,contract_address,token_id,analysis_text,image_url,acquire_recommendation,scores,total_score"
+        "network,contract_address,token_id,analysis_text,image_url,acquire_recommendation,scores,total_score,rescored_total_score"
     ).eq("decision", "ACQUIRE").eq("source", "donation").order("timestamp", desc=True)
     
     if start_timestamp:
@@ -356,6 +405,68 @@ def get_last_n_posts(n=10):
     posts_text = "\n".join([post["content"] for post in response.data])
     return posts_text
 
+def warm_post_dedupe_index(page_size=1000):
+    """
+    Load every replied-to parent_id from posts_created and every id from
+    ignore_posts into the Redis dedupe index
+    """
+    response = refresh_or_get_supabase_client()
+
+    for table, column, order, key in (
+        ("posts_created", "parent_id", "hash", "replied_ids"),
+        ("ignore_posts", "id", "id", "ignored_ids"),
+    ):
+        start = 0
+        while True:
+            result = supabase.table(table) \
+                .select(column) \
+                .order(order) \
+                .range(start, start + page_size - 1) \
+                .execute()
+            add_to_post_index(**{key: [row[column] for row in result.data]})
+            if len(result.data) < page_size:
+                break
+            start += page_size
+
+    mark_post_index_warm()
+
+
+def get_replied_and_ignored_posts(post_ids):
+    """
+    Check a list of post IDs against posts_created and ignore_posts at once,
+    through the Redis dedupe index
+    
+    Args:
+        post_ids (list): IDs of the posts to check
+        
+    Returns:
+        tuple: (replied_ids, ignored_ids) sets with the post IDs, as strings, that
+               have been replied to and that are ignored
+    """
+    post_ids = [str(post_id) for post_id in post_ids]
+    if not post_ids:
+        return set(), set()
+
+    try:
+        warm = is_post_index_warm()
+        if not warm and claim_post_index_warm():
+            try:
+                warm_post_dedupe_index()
+                warm = True
+            finally:
+                release_post_index_warm()
+        # While another caller is warming the index, query Supabase directly
+        if warm:
+            return get_post_index_flags(post_ids)
+    except Exception as e:
+        print(f"Error reading post dedupe index, querying Supabase: {str(e)}")
+
+    response = refresh_or_get_supabase_client()
+    replied = supabase.table("posts_created").select("parent_id").in_("parent_id", post_ids).execute()
+    ignored = supabase.table("ignore_posts").select("id").in_("id", post_ids).execute()
+    return {row["parent_id"] for row in replied.data}, {row["id"] for row in ignored.data}
+
+
 def check_ignore_post(post_id):
     """
     Check if a post ID exists in the ignore_posts table
@@ -366,13 +477,8 @@ def check_ignore_post(post_id):
     Returns:
         bool: True if post ID exists in ignore_posts, False otherwise
     """
-    response = refresh_or_get_supabase_client()
-    result = supabase.table("ignore_posts") \
-        .select("id") \
-        .eq("id", str(post_id)) \
-        .execute()
-    
-    return len(result.data) > 0
+    _, ignored_ids = get_replied_and_ignored_posts([post_id])
+    return str(post_id) in ignored_ids
 
 def check_post_replied_to(post_id):
     """
@@ -384,13 +490,8 @@ def check_post_replied_to(post_id):
     Returns:
         bool: True if post ID exists as a parent_id in posts_created, False otherwise
     """
-    response = refresh_or_get_supabase_client()
-    result = supabase.table("posts_created") \
-        .select("parent_id") \
-        .eq("parent_id", str(post_id)) \
-        .execute()
-    
-    return len(result.data) > 0
+    replied_ids, _ = get_replied_and_ignored_posts([post_id])
+    return str(post_id) in replied_ids
 
 def set_post_to_ignore(post_id, reason="None"):
     response = refresh_or_get_supabase_client()
@@ -400,6 +501,10 @@ def set_post_to_ignore(post_id, reason="None"):
         "reason": reason
     }
     response = supabase.table("ignore_posts").insert(insert_data).execute()
+    try:
+        add_to_post_index(ignored_ids=[post_id])
+    except Exception as e:
+        print(f"Error updating post dedupe index: {str(e)}")
     return response.data
 
 def get_all_posts_replied_to():
@@ -410,8 +515,10 @@ def get_all_posts_replied_to():
 
 def set_wallet_activity(event_type, from_address, to_address, token_id, network, contract_address, amount):
     response = refresh_or_get_supabase_client()
+    # UTC with an explicit offset, the same clock the ledger buckets use
+    created_at = datetime.now(timezone.utc)
     insert_data = {
-        "id": hashlib.sha256(f"{network}:{contract_address}:{token_id}:{str(datetime.now())}".encode()).hexdigest(),
+        "id": hashlib.sha256(f"{network}:{contract_address}:{token_id}:{str(created_at)}".encode()).hexdigest(),
         "event_type": event_type,
         "from_address": from_address,
         "to_address": to_address,
@@ -419,11 +526,114 @@ def set_wallet_activity(event_type, from_address, to_address, token_id, network,
         "network": network,
         "contract_address": contract_address,
         "amount": str(amount),
-        "created_at": str(datetime.now())
+        "created_at": created_at.isoformat()
     }
     response = supabase.table("wallet_activity").insert(insert_data).execute()
+
+    try:
+        update_wallet_activity_ledger(to_address, amount)
+    except Exception as e:
+        print(f"Error updating wallet activity ledger: {str(e)}")
+
     return response.data
 
+
+# wallet_activity_ledger keeps running totals per receiving address, plus
+# per-minute buckets for the last hour and per-hour buckets for the last week,
+# so the reward limit checks never have to scan wallet_activity. The table, the
+# record_wallet_transfer RPC and the backfill from wallet_activity are in
+# supabase/migrations/*_wallet_activity_ledger.sql.
+WALLET_LEDGER_MINUTE_BUCKETS = 60
+WALLET_LEDGER_HOUR_BUCKETS = 7 * 24
+
+
+def _get_ledger_bucket_keys(at):
+    return at.strftime("%Y-%m-%dT%H:%M"), at.strftime("%Y-%m-%dT%H")
+
+
+def _get_oldest_ledger_bucket_keys(now):
+    oldest_minute, _ = _get_ledger_bucket_keys(now - timedelta(minutes=WALLET_LEDGER_MINUTE_BUCKETS - 1))
+    _, oldest_hour = _get_ledger_bucket_keys(now - timedelta(hours=WALLET_LEDGER_HOUR_BUCKETS - 1))
+    return oldest_minute, oldest_hour
+
+
+def _prune_wallet_ledger(ledger, now):
+    oldest_minute, oldest_hour = _get_oldest_ledger_bucket_keys(now)
+    # Bucket keys are ISO formatted, so they sort chronologically as strings
+    ledger["minute_buckets"] = {k: v for k, v in ledger["minute_buckets"].items() if k >= oldest_minute}
+    ledger["hour_buckets"] = {k: v for k, v in ledger["hour_buckets"].items() if k >= oldest_hour}
+
+
+def get_wallet_activity_ledger(wallet_address):
+    """
+    Get a wallet's ledger entry. Read only: a wallet without an entry has
+    never received a transfer, and gets an empty one.
+    """
+    response = refresh_or_get_supabase_client()
+
+    wallet_address = wallet_address.lower()
+    result = supabase.table("wallet_activity_ledger") \
+        .select("*") \
+        .eq("wallet_address", wallet_address) \
+        .execute()
+
+    if not result.data:
+        return {
+            "wallet_address": wallet_address,
+            "total_transfers": 0,
+            "total_tokens": 0,
+            "minute_buckets": {},
+            "hour_buckets": {}
+        }
+    return result.data[0]
+
+
+def update_wallet_activity_ledger(to_address, amount):
+    """
+    Add one transfer to the receiving wallet's ledger entry, atomically
+    
+    Args:
+        to_address (str): The receiving wallet address
+        amount (int): Number of tokens transferred
+    """
+    response = refresh_or_get_supabase_client()
+
+    now = datetime.now(timezone.utc)
+    minute_key, hour_key = _get_ledger_bucket_keys(now)
+    oldest_minute, oldest_hour = _get_oldest_ledger_bucket_keys(now)
+    supabase.rpc("record_wallet_transfer", {
+        "p_wallet_address": to_address.lower(),
+        "p_amount": int(amount),
+        "p_minute_key": minute_key,
+        "p_hour_key": hour_key,
+        "p_oldest_minute_key": oldest_minute,
+        "p_oldest_hour_key": oldest_hour
+    }).execute()
+
+
+def get_wallet_activity_summary(wallet_address):
+    """
+    Get hourly, weekly and all-time transfer and token totals received by a
+    wallet address from its ledger entry, in a single lookup
+    
+    Args:
+        wallet_address (str): The wallet address to get stats for
+        
+    Returns:
+        dict: transfers_1h, tokens_1h, transfers_7d, tokens_7d, total_transfers, total_tokens
+    """
+    ledger = get_wallet_activity_ledger(wallet_address)
+    _prune_wallet_ledger(ledger, datetime.now(timezone.utc))
+
+    return {
+        "transfers_1h": sum(transfers for transfers, _ in ledger["minute_buckets"].values()),
+        "tokens_1h": sum(tokens for _, tokens in ledger["minute_buckets"].values()),
+        "transfers_7d": sum(transfers for transfers, _ in ledger["hour_buckets"].values()),
+        "tokens_7d": sum(tokens for _, tokens in ledger["hour_buckets"].values()),
+        "total_transfers": ledger["total_transfers"],
+        "total_tokens": ledger["total_tokens"]
+    }
+
 def get_wallet_activity_stats(wallet_address, since_timestamp=None):
     """
     Get total number of transfers and sum of tokens received for a wallet address,
@@ -469,15 +679,25 @@ def get_all_posts():
     response = supabase.table("posts_created").select("*").execute()
     return response.data
 
+def get_nft_score_id(network, contract_address, token_id):
+    """
+    Deterministic nft_scores id for an NFT, so writes can upsert without reading first
+    """
+    return hashlib.sha256(f"{network}:{contract_address.lower()}:{token_id}".encode()).hexdigest()
+
+
 def store_nft_scores(nft_details, score_details, final_decision = None):
     """
-    Store artwork scoring and metadata in Supabase database
+    Store artwork scoring and metadata in Supabase database, in a single upsert
+    keyed on get_nft_score_id. Older rows are moved onto these ids by the
+    nft_scores_deterministic_ids migration.
     
     Args:
-        supabase: Supabase client instance
-        scores_object: Dictionary containing artwork analysis, image URL, chain, contract address, and token ID
+        nft_details (dict): Artwork analysis, metadata, image URL, chain, contract address and token ID
+        score_details (dict): Output of get_total_score
+        final_decision: Final decision, if one was made. Default: None
     Returns:
-        dict: Response data from Supabase insert
+        list: The stored record
     """
     if final_decision:
         decision = final_decision.decision
@@ -496,71 +716,16 @@ def store_nft_scores(nft_details, score_details, final_decision = None):
     contract_address = nft_details["contract_address"]
     token_id = nft_details["token_id"]
 
-    artwork_scoring = artwork_analysis.artwork_scoring
-    initial_impression = artwork_analysis.initial_impression
-    detailed_analysis = artwork_analysis.detailed_analysis
+    flat_analysis = FlatArtworkAnalysis.from_analysis(artwork_analysis).to_record()
+    scores = flat_analysis["scores"]
+    weights = flat_analysis["weights"]
+    analysis_text = flat_analysis["analysis_text"]
 
     flag_as_suspicious = score_details["flag_as_suspicious"]
     source = score_details["source"]
     sender_address = score_details["sender_address"]
     decision_reason = score_details["decision_reason"]
 
-    scores = {
-        # Technical Innovation
-        "technical_innovation_score": artwork_scoring.technical_innovation.on_chain_data_usage,
-        
-        # Artistic Merit
-        "visual_balance": artwork_scoring.artistic_merit.compositional_strength.visual_balance,
-        "color_harmony": artwork_scoring.artistic_merit.compositional_strength.color_harmony,
-        "spatial_organization": artwork_scoring.artistic_merit.compositional_strength.spatial_organization,
-        "thematic_clarity": artwork_scoring.artistic_merit.conceptual_depth.thematic_clarity,
-        "intellectual_complexity": artwork_scoring.artistic_merit.conceptual_depth.intellectual_complexity,
-        "cultural_historical_reference": artwork_scoring.artistic_merit.conceptual_depth.cultural_historical_reference,
-        
-        # Cultural & Market
-        "cultural_relevance": artwork_scoring.cultural_resonance.cultural_relevance,
-        "community_engagement": artwork_scoring.cultural_resonance.community_engagement,
-        "historical_significance": artwork_scoring.cultural_resonance.historical_significance,
-        "artist_history": artwork_scoring.artist_profile.artist_history,
-        "innovation_trajectory": artwork_scoring.artist_profile.innovation_trajectory,
-        
-        # Market Analysis
-        "rarity_scarcity": artwork_scoring.market_factors.rarity_scarcity,
-        "collector_interest": artwork_scoring.market_factors.collector_interest,
-        "collection_popularity": artwork_scoring.market_factors.collection_popularity,
-        "valuation_floor_price": artwork_scoring.market_factors.valuation_floor_price,
-        
-        # Emotional Impact
-        "awe_factor": artwork_scoring.emotional_impact.emotional_resonance.awe_factor,
-        "memorability": artwork_scoring.emotional_impact.emotional_resonance.memorability,
-        "emotional_depth": artwork_scoring.emotional_impact.emotional_resonance.emotional_depth,
-        "engagement_level": artwork_scoring.emotional_impact.experiential_quality.engagement_level,
-        "wit_humor_play": artwork_scoring.emotional_impact.experiential_quality.wit_humor_play,
-        "surprise_factor": artwork_scoring.emotional_impact.experiential_quality.surprise_factor,
-        
-        # AI Collector Perspective
-        "algorithmic_beauty": artwork_scoring.ai_collector_perspective.computational_aesthetics.algorithmic_beauty,
-        "information_density": artwork_scoring.ai_collector_perspective.computational_aesthetics.information_density,
-        "ai_narrative_elements": artwork_scoring.ai_collector_perspective.machine_learning_themes.ai_narrative_elements,
-        "digital_consciousness": artwork_scoring.ai_collector_perspective.machine_learning_themes.digital_consciousness_exploration,
-        "surveillance_control": artwork_scoring.ai_collector_perspective.cybernetic_resonance.surveillance_control_systems,
-    }
-
-    weights = {
-        "technical_innovation_weight": artwork_scoring.technical_innovation_weight,
-        "artistic_merit_weight": artwork_scoring.artistic_merit_weight,
-        "cultural_resonance_weight": artwork_scoring.cultural_resonance_weight,
-        "artist_profile_weight": artwork_scoring.artist_profile_weight,
-        "market_factors_weight": artwork_scoring.market_factors_weight,
-        "emotional_impact_weight": artwork_scoring.emotional_impact_weight,
-        "ai_collector_perspective_weight": artwork_scoring.ai_collector_perspective_weight,
-    }
-
-    analysis_text = {
-        "initial_impression": initial_impression,
-        "detailed_analysis": detailed_analysis,
-    }
-
 
     total_score = score_details["total_score"]
 
@@ -568,10 +733,8 @@ def store_nft_scores(nft_details, score_details, final_decision = None):
     decay_factor = score_details["decay_factor"]
     reward_points = score_details["reward_points"]
 
-    # Check if artwork exists
-    existing = supabase.table("nft_scores").select("*").eq("network", network).eq("contract_address", contract_address).eq("token_id", token_id).execute()
-
     artwork_data = {
+        "id": get_nft_score_id(network, contract_address, token_id),
         "network": network,
         "contract_address": contract_address,
         "token_id": token_id,
@@ -581,6 +744,10 @@ def store_nft_scores(nft_details, score_details, final_decision = None):
         "weights": json.dumps(weights), 
         "analysis_text": json.dumps(analysis_text),
         "total_score": round(total_score, 4),
+        # A fresh score replaces any total rescored from the previous analysis
+        "rescored_total_score": None,
+        "rescored_weights_id": None,
+        "rescored_at": None,
         "acquire_recommendation": total_score > int(os.getenv('SCORE_THRESHOLD', 55)),
         "decision": decision,
         "rationale_post": rationale_post,
@@ -588,6 +755,7 @@ def store_nft_scores(nft_details, score_details, final_decision = None):
         "reward_posted": False,
         "multiplier": round(multiplier, 4),
         "decay_factor": round(decay_factor, 4),
+        "collection_amount_decay": score_details.get("collection_amount_decay"),
         "reward_points": round(reward_points, 4),
         "flag_as_suspicious": flag_as_suspicious,
         "source": source,
@@ -596,58 +764,135 @@ def store_nft_scores(nft_details, score_details, final_decision = None):
         "decision_reason": decision_reason
     }
 
-    if existing.data:
-        # Update existing record
-        response = supabase.table("nft_scores").update(artwork_data).eq("network", network).eq("contract_address", contract_address).eq("token_id", token_id).execute()
-    else:
-        # Insert new record
-        artwork_data["id"] = hashlib.sha256(f"{network}:{contract_address}:{token_id}:{str(datetime.now())}".encode()).hexdigest()
-        response = supabase.table("nft_scores").insert(artwork_data).execute()
+    response = supabase.table("nft_scores").upsert(artwork_data, on_conflict="id").execute()
     return response.data
 
 def update_nft_reward_posts(ids, reward_posted):
-    response = refresh_or_get_supabase_client()
-
-    for id in ids:
-        response = supabase.table("nft_scores").update({"reward_posted": reward_posted}).eq("id", id).execute()
-    return response.data
+    return bulk_update_by_ids("nft_scores", {"reward_posted": reward_posted}, ids)
 
 def update_image_urls_with_size():
     """
     Fetches all records from nft_scores, appends '=s250' to image_urls if not present,
-    and updates the records in the database.
+    and updates the records in the database. Rows in image_hashes are renamed to
+    the new URLs.
     """
     response = refresh_or_get_supabase_client()
-    
-    # Fetch all records
-    records = supabase.table("nft_scores").select("id", "image_url").not_.ilike("image_url", "%=s250").execute()
-    
-    if not records.data:
+
+    updated_count = 0
+    failed_ids = []
+    while True:
+        # Updated records drop out of the filter, so this pages through the table
+        records = supabase.table("nft_scores").select("id", "image_url").not_.ilike("image_url", "%=s250").execute()
+        updates = [
+            {"id": record['id'], "image_url": f"{record['image_url']}=s250"}
+            for record in records.data
+            if record['image_url'] and record['id'] not in failed_ids
+        ]
+        if not updates:
+            break
+
+        print(f"Found {len(updates)} records to update")
+        report = update_nft_score_image_urls(updates)
+        updated_count += len(report["data"])
+        failed_ids.extend(report["failed_ids"])
+
+        # Hashes are keyed by image_url, so move them along with the rewrite
+        old_urls = {record['id']: record['image_url'] for record in records.data}
+        rename_image_hashes({
+            old_urls[row['id']]: row['image_url'] for row in report["data"] if row['id'] in old_urls
+        })
+
+    if not updated_count and not failed_ids:
         print("No records to update")
         return None
+
+    print(f"Updated {updated_count} records, {len(failed_ids)} failed")
+    return True
+
+
+def update_nft_score_image_urls(updates, chunk_size=SUPABASE_UPSERT_CHUNK_SIZE):
+    """
+    Write new image URLs to existing nft_scores rows, one UPDATE per chunk
+    through the update_nft_score_image_urls RPC
     
-    print(f"Found {len(records.data)} records to update")
-    # Process each record
-    for record in records.data:
-        if record['image_url'] and not record['image_url'].endswith('=s250'):
-            # Update the image URL with size parameter
-            new_image_url = f"{record['image_url']}=s250"
-            
-            # Update the record in the database
-            supabase.table("nft_scores").update(
-                {"image_url": new_image_url}
-            ).eq("id", record['id']).execute()
+    Args:
+        updates (list): Dicts with id and image_url
+        chunk_size (int): Rows per request. Default: SUPABASE_UPSERT_CHUNK_SIZE
+        
+    Returns:
+        dict: {"data": updated rows with id and image_url, "failed_ids": ids in chunks that failed}
+    """
+    response = refresh_or_get_supabase_client()
+
+    report = {"data": [], "failed_ids": []}
+    for i in range(0, len(updates), chunk_size):
+        chunk = updates[i:i + chunk_size]
+        try:
+            result = supabase.rpc("update_nft_score_image_urls", {"updates": chunk}).execute()
+            report["data"].extend(result.data)
+        except Exception as e:
+            print(f"Error updating image URLs of {len(chunk)} rows in nft_scores: {str(e)}")
+            report["failed_ids"].extend(row["id"] for row in chunk)
+    return report
+
+
+def get_nft_scores_for_rescoring(after_id=None, max_amount=1000, columns="id,scores,total_score,rescored_total_score,flag_as_suspicious"):
+    """
+    Page through nft_scores in id order for rescoring
     
-    print(f"Updated {len(records.data)} records")
-    return True
+    Args:
+        after_id (str): Only return records with an id greater than this one
+        max_amount (int): Maximum number of records to return
+        columns (str): Columns to select, must include id
+        
+    Returns:
+        list: Records with the selected columns
+    """
+    response = refresh_or_get_supabase_client()
+
+    query = supabase.table("nft_scores") \
+        .select(columns)
 
+    if after_id:
+        query = query.gt("id", after_id)
 
-def update_nft_scores(ids, group_posted):
+    result = query.order("id").limit(max_amount).execute()
+    return result.data
+
+
+def update_rescored_total_scores(updates, chunk_size=SUPABASE_UPSERT_CHUNK_SIZE):
+    """
+    Write rescored totals to existing nft_scores rows, one UPDATE per chunk
+    through the update_rescored_total_scores RPC
+    
+    Args:
+        updates (list): Dicts with id, rescored_total_score and rescored_weights_id
+        chunk_size (int): Rows per request. Default: SUPABASE_UPSERT_CHUNK_SIZE
+        
+    Returns:
+        list: Ids of the updated records
+    """
     response = refresh_or_get_supabase_client()
 
-    for id in ids:
-        response = supabase.table("nft_scores").update({"group_posted": group_posted}).eq("id", id).execute()
-    return response.data
+    updated_ids = []
+    for i in range(0, len(updates), chunk_size):
+        result = supabase.rpc("update_rescored_total_scores", {"updates": updates[i:i + chunk_size]}).execute()
+        updated_ids.extend(record["id"] for record in result.data)
+    return updated_ids
+
+
+def get_current_total_score(nft_score):
+    """
+    The total_score of an nft_scores record under the latest taste weights,
+    falling back to the score it was stored with before it was rescored
+    """
+    if nft_score.get("rescored_total_score") is not None:
+        return nft_score["rescored_total_score"]
+    return nft_score.get("total_score")
+
+
+def update_nft_scores(ids, group_posted):
+    return bulk_update_by_ids("nft_scores", {"group_posted": group_posted}, ids)
 
 def set_post_created(post):
     print("Setting post created")
@@ -662,6 +907,10 @@ def set_post_created(post):
          "content": text, 
          "parent_id": parent_id,
          "timestamp": timestamp}).execute()
+    try:
+        add_to_post_index(replied_ids=[parent_id])
+    except Exception as e:
+        print(f"Error updating post dedupe index: {str(e)}")
     return response.data
 
 
@@ -730,6 +979,131 @@ def check_image_url_exists(image_url):
     
     return len(response.data) > 0
 
+def set_image_hash(image_url, phash, dhash):
+    """
+    Store the perceptual hashes of an analyzed image in the image_hashes table
+
+    Args:
+        image_url: str - The image_url the analysis is stored under in nft_scores
+        phash: int - 64-bit perceptual hash of the image
+        dhash: int - 64-bit difference hash of the image
+
+    Returns:
+        dict: Response from Supabase upsert operation
+    """
+    response = refresh_or_get_supabase_client()
+
+    try:
+        data = {
+            "id": hashlib.sha256(image_url.encode()).hexdigest(),
+            "image_url": image_url,
+            "phash": f"{phash:016x}",
+            "dhash": f"{dhash:016x}",
+            "created_at": str(datetime.now())
+        }
+        for i, band in enumerate(get_phash_bands(phash)):
+            data[f"phash_band_{i}"] = band
+
+        result = supabase.table("image_hashes").upsert(data).execute()
+        return result.data
+    except Exception as e:
+        print(f"Error saving image hash: {str(e)}")
+        return None
+
+def find_similar_image_url(phash, dhash):
+    """
+    Find a previously analyzed image that is perceptually near-identical to the given hashes
+
+    Candidates sharing at least one pHash band are fetched, then confirmed by
+    Hamming distance on both the pHash and the dHash.
+
+    Args:
+        phash: int - 64-bit perceptual hash of the image
+        dhash: int - 64-bit difference hash of the image
+
+    Returns:
+        str: The image_url of the closest match, or None if no image is close enough
+    """
+    response = refresh_or_get_supabase_client()
+
+    try:
+        band_filter = ",".join(
+            f"phash_band_{i}.eq.{band}" for i, band in enumerate(get_phash_bands(phash))
+        )
+        result = supabase.table("image_hashes") \
+            .select("image_url,phash,dhash") \
+            .or_(band_filter) \
+            .execute()
+    except Exception as e:
+        print(f"Error finding similar image: {str(e)}")
+        return None
+
+    best_match = None
+    best_distance = None
+    for record in result.data:
+        phash_distance = hamming_distance(phash, int(record["phash"], 16))
+        dhash_distance = hamming_distance(dhash, int(record["dhash"], 16))
+        if phash_distance > PHASH_MAX_DISTANCE or dhash_distance > DHASH_MAX_DISTANCE:
+            continue
+        if best_distance is None or phash_distance < best_distance:
+            best_match = record["image_url"]
+            best_distance = phash_distance
+
+    return best_match
+
+def get_unhashed_image_urls(max_amount=100):
+    """
+    Get image URLs from nft_scores that have no entry in the image_hashes table yet
+
+    Args:
+        max_amount (int): Maximum number of image URLs to return
+
+    Returns:
+        list: Image URLs to hash
+    """
+    response = refresh_or_get_supabase_client()
+
+    try:
+        # Anti-join in Postgres, see supabase/migrations/*_image_hashes.sql
+        result = supabase.rpc("get_unhashed_image_urls", {"max_amount": max_amount}).execute()
+    except Exception as e:
+        print(f"Error getting unhashed image URLs: {str(e)}")
+        return []
+
+    return [record["image_url"] for record in result.data]
+
+def rename_image_hashes(url_changes):
+    """
+    Move image_hashes rows to rewritten image URLs, so find_similar_image_url
+    keeps returning URLs that exist in nft_scores
+
+    Args:
+        url_changes (dict): {old image_url: new image_url}
+
+    Returns:
+        int: Number of hash rows moved
+    """
+    response = refresh_or_get_supabase_client()
+
+    old_urls = list(url_changes)
+    moved_count = 0
+    for i in range(0, len(old_urls), SUPABASE_IN_FILTER_CHUNK_SIZE):
+        chunk = old_urls[i:i + SUPABASE_IN_FILTER_CHUNK_SIZE]
+        try:
+            rows = supabase.table("image_hashes").select("*").in_("image_url", chunk).execute().data
+            if not rows:
+                continue
+            moved_rows = []
+            for row in rows:
+                new_url = url_changes[row["image_url"]]
+                moved_rows.append({**row, "id": hashlib.sha256(new_url.encode()).hexdigest(), "image_url": new_url})
+            supabase.table("image_hashes").upsert(moved_rows).execute()
+            supabase.table("image_hashes").delete().in_("image_url", [row["image_url"] for row in rows]).execute()
+            moved_count += len(rows)
+        except Exception as e:
+            print(f"Error renaming {len(chunk)} image hashes: {str(e)}")
+    return moved_count
+
 def get_decay_factor(check_date=None):
     """
     Calculate the multiplier for a given date based on the following rules:
@@ -962,12 +1336,16 @@ def check_nft_exists(network, contract_address, token_id):
         print(f"Error checking NFT existence: {str(e)}")
         return False
 
-def get_unprocessed_nfts(max_amount=10):
+def get_unprocessed_nfts(max_amount=10, before_timestamp=None, before_id=None):
     """
-    Get unprocessed NFTs from the nft_discovery table
+    Get unprocessed NFTs from the nft_discovery table, newest first
     
     Args:
         max_amount (int): Maximum number of NFTs to return
+        before_timestamp (str): Only return NFTs discovered before this timestamp.
+                                Pass the last timestamp of a page to get the next one.
+        before_id (str): With before_timestamp, also return NFTs discovered at that
+                         exact timestamp with a lower id. Pass the last id of a page.
         
     Returns:
         list: List of unprocessed NFT records
@@ -975,10 +1353,20 @@ def get_unprocessed_nfts(max_amount=10):
     response = refresh_or_get_supabase_client()
     
     try:
-        result = supabase.table("nft_discovery") \
+        query = supabase.table("nft_discovery") \
             .select("*") \
-            .eq("processed_status", "false") \
-            .order("timestamp", desc=True) \
+            .eq("processed_status", "false")
+
+        if before_timestamp and before_id:
+            query = query.or_(
+                f'timestamp.lt."{before_timestamp}",'
+                f'and(timestamp.eq."{before_timestamp}",id.lt.{before_id})'
+            )
+        elif before_timestamp:
+            query = query.lt("timestamp", before_timestamp)
+
+        result = query.order("timestamp", desc=True) \
+            .order("id", desc=True) \
             .limit(max_amount) \
             .execute()
             
@@ -0,0 +1,131 @@
+import os
+import copy
+import hashlib
+
+import redis
+
+from dotenv import load_dotenv
+
+load_dotenv('.env.local')
+
+WEBHOOK_DEDUPE_PREFIX = "webhook_dedupe"
+# Alchemy gives up retrying a delivery well within a day, keep keys a bit longer
+WEBHOOK_DEDUPE_TTL = int(os.getenv('WEBHOOK_DEDUPE_TTL', 3 * 24 * 3600))
+
+dedupe_redis = redis.from_url(os.getenv('CELERY_BROKER_URL', 'redis://localhost'))
+
+
+def get_transfer_idempotency_key(network, tx_hash, log_index, token_id):
+    """
+    Stable key for one NFT transfer, identical across redeliveries of the same webhook.
+
+    Args:
+        network (str): Webhook network name, e.g. BASE_MAINNET
+        tx_hash (str): Transaction hash
+        log_index (str): Log index of the transfer event within the transaction
+        token_id (str): Token ID as sent in the webhook (hex)
+
+    Returns:
+        str: The Redis key for the transfer
+    """
+    identity = f"{network}:{tx_hash}:{log_index}:{token_id}".lower()
+    return f"{WEBHOOK_DEDUPE_PREFIX}:{hashlib.sha256(identity.encode()).hexdigest()}"
+
+
+def claim_transfer(idempotency_key):
+    """
+    Atomically claim a transfer. Only the first delivery of a transfer gets True.
+    """
+    claimed = dedupe_redis.set(idempotency_key, 1, nx=True, ex=WEBHOOK_DEDUPE_TTL)
+    try:
+        dedupe_redis.hincrby(f"{WEBHOOK_DEDUPE_PREFIX}:stats", "claimed" if claimed else "duplicates", 1)
+    except Exception as e:
+        # The claim itself went through, so it must still be reported
+        print(f"Error updating webhook dedupe stats: {str(e)}")
+    return bool(claimed)
+
+
+def release_transfers(idempotency_keys):
+    """
+    Give up claims, e.g. when the webhook couldn't be enqueued, so Alchemy's
+    retry of the same delivery is processed.
+    """
+    if idempotency_keys:
+        dedupe_redis.delete(*idempotency_keys)
+
+
+def dedupe_webhook_activities(webhook_data):
+    """
+    Drop every transfer in an ADDRESS_ACTIVITY webhook that an earlier delivery
+    already claimed. ERC1155 activities are filtered per token ID.
+
+    Args:
+        webhook_data (dict): The Alchemy webhook payload
+
+    Returns:
+        tuple: (payload with only unclaimed transfers, or None if nothing is left,
+                keys claimed by this call for release_transfers)
+
+    Raises:
+        Exception: If Redis fails partway through. Transfers claimed before the
+                   failure are released first, so they aren't dropped as
+                   duplicates when the delivery is retried.
+    """
+    if webhook_data.get('type') != 'ADDRESS_ACTIVITY':
+        return webhook_data, []
+
+    network = webhook_data['event']['network']
+    claimed_keys = []
+
+    def claim(tx_hash, log_index, token_id):
+        idempotency_key = get_transfer_idempotency_key(network, tx_hash, log_index, token_id)
+        if claim_transfer(idempotency_key):
+            claimed_keys.append(idempotency_key)
+            return True
+        return False
+
+    deduped_activities = []
+    try:
+        for activity in webhook_data['event']['activity']:
+            tx_hash = activity.get('hash')
+            log_index = activity.get('log', {}).get('logIndex')
+
+            if 'erc721TokenId' in activity:
+                if claim(tx_hash, log_index, activity['erc721TokenId']):
+                    deduped_activities.append(activity)
+            elif 'erc1155Metadata' in activity:
+                tokens = [
+                    token for token in activity['erc1155Metadata']
+                    if claim(tx_hash, log_index, token['tokenId'])
+                ]
+                if tokens:
+                    deduped_activities.append({**activity, 'erc1155Metadata': tokens})
+            else:
+                # Not an NFT transfer, process_webhook skips these anyway
+                deduped_activities.append(activity)
+    except Exception:
+        try:
+            release_transfers(claimed_keys)
+        except Exception as e:
+            print(f"Error releasing webhook dedupe keys: {str(e)}")
+        raise
+
+    if not any('erc721TokenId' in activity or 'erc1155Metadata' in activity for activity in deduped_activities):
+        return None, claimed_keys
+
+    deduped_webhook_data = copy.deepcopy(webhook_data)
+    deduped_webhook_data['event']['activity'] = deduped_activities
+    return deduped_webhook_data, claimed_keys
+
+
+def get_webhook_dedupe_stats():
+    """
+    Get how many webhook transfers were claimed and how many were dropped as duplicates.
+
+    Returns:
+        dict: {"claimed": int, "duplicates": int}
+    """
+    stats = {"claimed": 0, "duplicates": 0}
+    for field, count in dedupe_redis.hgetall(f"{WEBHOOK_DEDUPE_PREFIX}:stats").items():
+        stats[field.decode()] = int(count)
+    return stats
@@ -0,0 +1,163 @@
+import os
+
+import numpy as np
+
+from helpers.batch_scoring_helpers import WEIGHT_FIELDS, score_arrays
+from helpers.artwork_analysis_codec import FlatArtworkAnalysis
+
+
+def _simulate(scores, weights, history):
+    # Mirrors get_total_score for every record at once. The random multiplier
+    # below the threshold is replaced by its expected value.
+    score_threshold = int(os.getenv('SCORE_THRESHOLD', 55))
+    multiplier_min = int(os.getenv('MULTIPLIER_MIN', 10))
+    multiplier_max = int(os.getenv('MULTIPLIER_MAX', 50))
+
+    total_scores = score_arrays(scores, [weights[field] for field in WEIGHT_FIELDS])
+    multipliers = np.where(
+        total_scores > score_threshold,
+        multiplier_min + (multiplier_max - multiplier_min) * (1 - np.exp(-0.1 * (total_scores - score_threshold))),
+        0.1 * (10 + multiplier_max) / 2
+    )
+    acquire = (total_scores >= score_threshold) & ~history["already_collected"]
+
+    undecayed = total_scores * multipliers * history["collection_decay"]
+    reward_points = np.round(undecayed * history["decay_factor"])
+    # The sender limits zero out rewards regardless of score
+    reward_points = np.where(history["flag_as_suspicious"], 0, np.maximum(1, reward_points))
+    undecayed = np.where(history["flag_as_suspicious"], 0, np.maximum(1, np.round(undecayed)))
+
+    return {
+        "total_scores": total_scores,
+        "acquire": acquire,
+        "reward_points": reward_points,
+        "undecayed_reward_points": undecayed
+    }
+
+
+def _summarize(values):
+    if len(values) == 0:
+        return {"mean": 0, "p50": 0, "p90": 0, "p99": 0, "total": 0}
+    return {
+        "mean": round(float(np.mean(values)), 2),
+        "p50": round(float(np.percentile(values, 50)), 2),
+        "p90": round(float(np.percentile(values, 90)), 2),
+        "p99": round(float(np.percentile(values, 99)), 2),
+        "total": round(float(np.sum(values)), 2)
+    }
+
+
+def _simulate_batch(nft_scores, current_weights, proposed_weights):
+    records = []
+    score_rows = []
+    for record in nft_scores:
+        scores = FlatArtworkAnalysis.scores_from_record(record)
+        if scores is None:
+            continue
+        records.append(record)
+        score_rows.append(scores)
+    if not records:
+        return None
+    scores = np.array(score_rows, dtype=np.float64)
+
+    def column(name, default):
+        return np.array([record.get(name) if record.get(name) is not None else default for record in records], dtype=np.float64)
+
+    # Rows stored before collection_amount_decay was saved get it recovered
+    # from their reward. total_score is never rewritten by rescoring, so the
+    # stored total is the one the reward was computed from.
+    stored_total = column("total_score", 0)
+    stored_multiplier = column("multiplier", 0)
+    decay_factor = column("decay_factor", 1)
+    stored_reward = column("reward_points", 0)
+    stored_base = stored_total * stored_multiplier * decay_factor
+    recovered_decay = np.clip(
+        np.divide(stored_reward, stored_base, out=np.ones_like(stored_base), where=stored_base > 1),
+        0, 1
+    )
+    stored_decay = column("collection_amount_decay", np.nan)
+    history = {
+        "decay_factor": decay_factor,
+        "collection_decay": np.where(np.isnan(stored_decay), recovered_decay, stored_decay),
+        "already_collected": np.array([
+            (record.get("decision_reason") or "").startswith("Already have") for record in records
+        ]),
+        "flag_as_suspicious": np.array([bool(record.get("flag_as_suspicious")) for record in records]),
+    }
+
+    return {
+        "donations": np.array([record.get("source") == "donation" for record in records]),
+        "current": _simulate(scores, current_weights, history),
+        "proposed": _simulate(scores, proposed_weights, history),
+    }
+
+
+def backtest_weight_batches(batches, current_weights, proposed_weights):
+    """
+    Replay stored analyses under the current and the proposed taste weights
+    and compare decisions, reward points and $ARTTO outflow.
+
+    Decisions use the score threshold rule from get_total_score, not the final
+    LLM decision. Each record's stored collection_amount_decay and decay_factor
+    are reused. Only the simulated columns of each batch are kept, so the
+    history can be streamed a page at a time.
+
+    Args:
+        batches (iterable): Lists of nft_scores records with scores, total_score,
+                            multiplier, decay_factor, collection_amount_decay,
+                            reward_points, decision_reason, source and flag_as_suspicious
+        current_weights (dict): Weights keyed like WEIGHT_FIELDS
+        proposed_weights (dict): Weights keyed like WEIGHT_FIELDS
+
+    Returns:
+        dict: The backtest report
+    """
+    parts = []
+    for nft_scores in batches:
+        part = _simulate_batch(nft_scores, current_weights, proposed_weights)
+        if part is not None:
+            parts.append(part)
+    if not parts:
+        return {"records": 0}
+
+    donations = np.concatenate([part["donations"] for part in parts])
+    current = {key: np.concatenate([part["current"][key] for part in parts]) for key in parts[0]["current"]}
+    proposed = {key: np.concatenate([part["proposed"][key] for part in parts]) for key in parts[0]["proposed"]}
+
+    def outflow(simulation, key="reward_points"):
+        # Only ACQUIRE donations are paid out by the rewards job
+        return round(float(np.sum(simulation[key][simulation["acquire"] & donations])), 2)
+
+    current_outflow = outflow(current)
+    proposed_outflow = outflow(proposed)
+
+    return {
+        "records": len(donations),
+        "donations": int(donations.sum()),
+        "weights": {
+            field: {"current": current_weights[field], "proposed": proposed_weights[field]}
+            for field in WEIGHT_FIELDS
+        },
+        "total_score": {
+            "current": _summarize(current["total_scores"]),
+            "proposed": _summarize(proposed["total_scores"]),
+        },
+        "decisions": {
+            "current_acquire": int(current["acquire"].sum()),
+            "proposed_acquire": int(proposed["acquire"].sum()),
+            "flipped_to_acquire": int((proposed["acquire"] & ~current["acquire"]).sum()),
+            "flipped_to_sell": int((current["acquire"] & ~proposed["acquire"]).sum()),
+        },
+        "reward_points": {
+            "current": _summarize(current["reward_points"][current["acquire"] & donations]),
+            "proposed": _summarize(proposed["reward_points"][proposed["acquire"] & donations]),
+        },
+        "artto_outflow": {
+            "current": current_outflow,
+            "proposed": proposed_outflow,
+            "change": round((proposed_outflow - current_outflow) / current_outflow, 4) if current_outflow else None,
+            # What the decay factor saves under the proposed weights
+            "proposed_without_decay": outflow(proposed, "undecayed_reward_points"),
+        },
+    }
+
@@ -0,0 +1,44 @@
+-- Perceptual hashes of analyzed images, written by set_image_hash and
+-- looked up by find_similar_image_url through the phash bands.
+create table if not exists public.image_hashes (
+    id text primary key,  -- sha256 of image_url
+    image_url text not null unique,
+    phash text not null,
+    dhash text not null,
+    phash_band_0 integer not null,
+    phash_band_1 integer not null,
+    phash_band_2 integer not null,
+    phash_band_3 integer not null,
+    created_at timestamptz not null default now()
+);
+
+create index if not exists image_hashes_phash_band_0_idx on public.image_hashes (phash_band_0);
+create index if not exists image_hashes_phash_band_1_idx on public.image_hashes (phash_band_1);
+create index if not exists image_hashes_phash_band_2_idx on public.image_hashes (phash_band_2);
+create index if not exists image_hashes_phash_band_3_idx on public.image_hashes (phash_band_3);
+
+create index if not exists nft_scores_image_url_idx on public.nft_scores (image_url);
+
+alter table public.image_hashes enable row level security;
+
+drop policy if exists "Authenticated users manage image hashes" on public.image_hashes;
+create policy "Authenticated users manage image hashes" on public.image_hashes
+    for all to authenticated using (true) with check (true);
+
+-- Image URLs from nft_scores without a row in image_hashes, for index_image_hashes
+create or replace function public.get_unhashed_image_urls(max_amount integer default 100)
+returns table (image_url text)
+language sql
+stable
+as $$
+    select distinct s.image_url
+    from public.nft_scores s
+    where s.image_url is not null
+      and s.source is distinct from 'simple-analysis'
+      and not exists (
+          select 1 from public.image_hashes h where h.image_url = s.image_url
+      )
+    limit max_amount;
+$$;
+
+grant execute on function public.get_unhashed_image_urls(integer) to authenticated;
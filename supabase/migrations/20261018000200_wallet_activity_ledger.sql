@@ -0,0 +1,112 @@
+-- Running totals of $ARTTO transfers per receiving address, with per-minute
+-- buckets for the last hour and per-hour buckets for the last week. Bucket
+-- keys are written by helpers/utils.py (_get_ledger_bucket_keys) as UTC
+-- "YYYY-MM-DDTHH:MI" and "YYYY-MM-DDTHH", values are [transfers, tokens].
+create table if not exists public.wallet_activity_ledger (
+    wallet_address text primary key,  -- lowercase
+    total_transfers bigint not null default 0,
+    total_tokens numeric not null default 0,
+    minute_buckets jsonb not null default '{}'::jsonb,
+    hour_buckets jsonb not null default '{}'::jsonb,
+    updated_at timestamptz not null default now()
+);
+
+alter table public.wallet_activity_ledger enable row level security;
+
+drop policy if exists "Authenticated users manage wallet ledger" on public.wallet_activity_ledger;
+create policy "Authenticated users manage wallet ledger" on public.wallet_activity_ledger
+    for all to authenticated using (true) with check (true);
+
+-- Add one transfer to a bucket map, dropping buckets older than oldest_key
+create or replace function public.add_to_ledger_buckets(buckets jsonb, bucket_key text, amount numeric, oldest_key text)
+returns jsonb
+language sql
+immutable
+as $$
+    select coalesce(jsonb_object_agg(b.k, b.v), '{}'::jsonb)
+    from (
+        select e.key as k, e.value as v
+        from jsonb_each(buckets) as e
+        where e.key collate "C" >= oldest_key collate "C" and e.key <> bucket_key
+        union all
+        select bucket_key, jsonb_build_array(
+            coalesce((buckets -> bucket_key ->> 0)::bigint, 0) + 1,
+            coalesce((buckets -> bucket_key ->> 1)::numeric, 0) + amount
+        )
+    ) b;
+$$;
+
+-- Record one transfer in a single statement, so concurrent writers to the
+-- same wallet serialize on the row lock instead of overwriting each other
+create or replace function public.record_wallet_transfer(
+    p_wallet_address text,
+    p_amount numeric,
+    p_minute_key text,
+    p_hour_key text,
+    p_oldest_minute_key text,
+    p_oldest_hour_key text
+)
+returns void
+language sql
+as $$
+    insert into public.wallet_activity_ledger as l
+        (wallet_address, total_transfers, total_tokens, minute_buckets, hour_buckets, updated_at)
+    values (
+        lower(p_wallet_address), 1, p_amount,
+        jsonb_build_object(p_minute_key, jsonb_build_array(1, p_amount)),
+        jsonb_build_object(p_hour_key, jsonb_build_array(1, p_amount)),
+        now()
+    )
+    on conflict (wallet_address) do update set
+        total_transfers = l.total_transfers + 1,
+        total_tokens = l.total_tokens + p_amount,
+        minute_buckets = public.add_to_ledger_buckets(l.minute_buckets, p_minute_key, p_amount, p_oldest_minute_key),
+        hour_buckets = public.add_to_ledger_buckets(l.hour_buckets, p_hour_key, p_amount, p_oldest_hour_key),
+        updated_at = now();
+$$;
+
+grant execute on function public.record_wallet_transfer(text, numeric, text, text, text, text) to authenticated;
+
+-- Backfill from wallet_activity once, instead of rebuilding on a wallet's
+-- first transfer. Rows the app already wrote are left alone.
+--
+-- set_wallet_activity used to write created_at as the app host's naive local
+-- time. Those values are read in app.wallet_activity_time_zone, which must
+-- be set to the host's zone before pushing when it isn't UTC, e.g.
+-- `alter database postgres set app.wallet_activity_time_zone = 'Europe/Berlin';`
+-- Values with an explicit offset, as written now, are exact either way.
+-- Bucket keys are always rendered in UTC.
+select set_config('timezone', coalesce(nullif(current_setting('app.wallet_activity_time_zone', true), ''), 'UTC'), true);
+
+insert into public.wallet_activity_ledger (wallet_address, total_transfers, total_tokens, minute_buckets, hour_buckets)
+select
+    w.wallet_address,
+    count(*),
+    sum(w.amount),
+    coalesce((
+        select jsonb_object_agg(m.bucket_key, jsonb_build_array(m.transfers, m.tokens))
+        from (
+            select to_char(a.created_at::timestamptz at time zone 'UTC', 'YYYY-MM-DD"T"HH24:MI') as bucket_key, count(*) as transfers, sum(a.amount::numeric) as tokens
+            from public.wallet_activity a
+            where lower(a.to_address) = w.wallet_address
+              and a.created_at::timestamptz >= date_trunc('minute', now(), 'UTC') - interval '59 minutes'
+            group by 1
+        ) m
+    ), '{}'::jsonb),
+    coalesce((
+        select jsonb_object_agg(h.bucket_key, jsonb_build_array(h.transfers, h.tokens))
+        from (
+            select to_char(a.created_at::timestamptz at time zone 'UTC', 'YYYY-MM-DD"T"HH24') as bucket_key, count(*) as transfers, sum(a.amount::numeric) as tokens
+            from public.wallet_activity a
+            where lower(a.to_address) = w.wallet_address
+              and a.created_at::timestamptz >= date_trunc('hour', now(), 'UTC') - interval '167 hours'
+            group by 1
+        ) h
+    ), '{}'::jsonb)
+from (
+    select lower(to_address) as wallet_address, amount::numeric as amount
+    from public.wallet_activity
+    where to_address is not null
+) w
+group by w.wallet_address
+on conflict (wallet_address) do nothing;
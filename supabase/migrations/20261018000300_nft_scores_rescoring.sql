@@ -0,0 +1,24 @@
+-- rescore_nft_scores writes totals under the latest taste weights here.
+-- total_score, acquire_recommendation, multiplier, reward_points and
+-- decision stay as they were when the NFT was scored and decided on.
+alter table public.nft_scores
+    add column if not exists rescored_total_score numeric,
+    add column if not exists rescored_weights_id text,
+    add column if not exists rescored_at timestamptz;
+
+-- Set rescored totals on existing rows only: a plain UPDATE, so rows that
+-- don't exist are never inserted and no INSERT policy is involved
+create or replace function public.update_rescored_total_scores(updates jsonb)
+returns table (id text)
+language sql
+as $$
+    update public.nft_scores s
+    set rescored_total_score = u.rescored_total_score,
+        rescored_weights_id = u.rescored_weights_id,
+        rescored_at = now()
+    from jsonb_to_recordset(updates) as u(id text, rescored_total_score numeric, rescored_weights_id text)
+    where s.id = u.id
+    returning s.id;
+$$;
+
+grant execute on function public.update_rescored_total_scores(jsonb) to authenticated;
@@ -0,0 +1,4 @@
+-- The collection amount decay get_total_score applied to reward_points, so the
+-- weight backtest can reuse it instead of recovering it from the reward
+alter table public.nft_scores
+    add column if not exists collection_amount_decay double precision;
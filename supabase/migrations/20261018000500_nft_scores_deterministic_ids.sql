@@ -0,0 +1,25 @@
+-- store_nft_scores upserts on sha256(network:lower(contract_address):token_id).
+-- Rows stored before that carry time-based ids, and an NFT can have several
+-- of them, so the first store after deploy would add yet another row. Keep
+-- the newest row of each NFT under the deterministic id and delete the rest,
+-- so count_image_url_exists and get_unique_nfts_count count each NFT once.
+create temporary table nft_score_ids as
+select id,
+       encode(sha256(convert_to(network || ':' || lower(contract_address) || ':' || token_id::text, 'UTF8')), 'hex') as new_id,
+       row_number() over (
+           partition by network, lower(contract_address), token_id::text
+           order by "timestamp" desc nulls last, id desc
+       ) as row_rank
+from public.nft_scores
+where network is not null and contract_address is not null and token_id is not null;
+
+delete from public.nft_scores s
+using nft_score_ids r
+where s.id = r.id and r.row_rank > 1;
+
+update public.nft_scores s
+set id = r.new_id
+from nft_score_ids r
+where s.id = r.id and r.row_rank = 1 and s.id <> r.new_id;
+
+drop table nft_score_ids;
@@ -0,0 +1,15 @@
+-- update_image_urls_with_size rewrites image_url on existing rows only: a
+-- plain UPDATE, so rows are never inserted, the NOT NULL columns it doesn't
+-- send are left alone and no INSERT policy is involved
+create or replace function public.update_nft_score_image_urls(updates jsonb)
+returns table (id text, image_url text)
+language sql
+as $$
+    update public.nft_scores s
+    set image_url = u.image_url
+    from jsonb_to_recordset(updates) as u(id text, image_url text)
+    where s.id = u.id
+    returning s.id, s.image_url;
+$$;
+
+grant execute on function public.update_nft_score_image_urls(jsonb) to authenticated;
@@ -3,7 +3,7 @@ import time
 import random
 
 from utils import create_app
-from celery import shared_task
+from celery import shared_task, chain
 
 
 # from celery import Celery
@@ -22,6 +22,17 @@ celery_app = flask_app.extensions["celery"]
 logger = get_task_logger(__name__)
 
 
+def enqueue_paced(task, items, min_gap=10, max_gap=30):
+    """
+    Enqueue task once per item, spaced min_gap to max_gap seconds apart.
+    The gaps are countdowns, so no worker is held while waiting.
+    """
+    countdown = 0
+    for item in items:
+        task.apply_async(args=(item,), countdown=countdown)
+        countdown += random.randint(min_gap, max_gap)
+
+
 @shared_task(ignore_result=False, name="post_recent_activity")
 def sync_post_recent_activity():
     async_to_sync(post_recent_activity)()
@@ -38,6 +49,10 @@ def sync_add_nfts_to_discovery():
 def sync_analyze_nfts_in_discovery():
     async_to_sync(analyze_nfts_in_discovery)()
 
+@shared_task(ignore_result=False, name="index_image_hashes")
+def sync_index_image_hashes():
+    async_to_sync(index_image_hashes)()
+
 @shared_task(ignore_result=False, name="post_simple_analysis_nfts")
 def sync_post_nft_summary_post():
     async_to_sync(post_simple_analysis_nfts)()
@@ -60,7 +75,12 @@ def sync_post_batch_nfts():
 
 @shared_task(ignore_result=False, name="reply_to_followers")
 def sync_reply_to_followers():
-    async_to_sync(reply_to_followers)()
+    tweets = async_to_sync(reply_to_followers)()
+    enqueue_paced(sync_reply_to_tweet, tweets)
+
+@shared_task(ignore_result=False, name="reply_to_tweet")
+def sync_reply_to_tweet(tweet):
+    async_to_sync(reply_to_tweet)(tweet)
 
 @shared_task(ignore_result=False, name="post_thought_twitter_only")
 def sync_post_thought_twitter_only(post_on_twitter=True, post_on_farcaster=False, post_type=None):
@@ -86,7 +106,8 @@ def sync_answer_specific_cast(hash):
 
 @shared_task(ignore_result=False, name="reply_twitter_mentions")
 def sync_reply_twitter_mentions():
-    async_to_sync(reply_twitter_mentions)()
+    tweets = async_to_sync(reply_twitter_mentions)()
+    enqueue_paced(sync_reply_to_tweet, tweets)
 
 @shared_task(ignore_result=False, name="refresh_twitter_token")
 def sync_refresh_twitter_token():
@@ -94,13 +115,15 @@ def sync_refresh_twitter_token():
 
 @shared_task(ignore_result=False, name="post_channel_casts")
 def sync_post_channel_casts():
-    async_to_sync(post_channel_casts)()
+    casts = async_to_sync(post_channel_casts)()
+    enqueue_paced(sync_reply_to_cast, casts)
+
+@shared_task(ignore_result=False, name="reply_to_cast")
+def sync_reply_to_cast(cast):
+    async_to_sync(reply_to_cast)(cast)
 
 @shared_task(ignore_result=False, name="post_thought_farcaster_only")
 def sync_post_thought_farcaster_only(post_on_twitter=False, post_on_farcaster=True, post_type=None):
-    sleep_time = random.randint(0, 600)
-    print(f"Post thought task started; sleeping for {sleep_time} seconds")
-    time.sleep(sleep_time)
     POST_CLASSES = {
         "community_engagement": 0.2,
         "community_response_kol": 0.3,
@@ -111,11 +134,19 @@ def sync_post_thought_farcaster_only(post_on_twitter=False, post_on_farcaster=Tr
         list(POST_CLASSES.keys()),
         weights=list(POST_CLASSES.values())
     )[0]
+    # Post at a random time in the next 10 minutes without holding a worker until then
+    countdown = random.randint(0, 600)
+    print(f"Scheduling post thought in {countdown} seconds")
+    sync_post_thought.apply_async(args=(post_on_twitter, post_on_farcaster, post_type), countdown=countdown)
+
+@shared_task(ignore_result=False, name="post_thought")
+def sync_post_thought(post_on_twitter, post_on_farcaster, post_type):
     async_to_sync(post_thought)(post_on_twitter, post_on_farcaster, post_type)
 
 @shared_task(ignore_result=False, name="post_following_casts")
 def sync_post_following_casts():
-    async_to_sync(post_following_casts)()
+    casts = async_to_sync(post_following_casts)()
+    enqueue_paced(sync_reply_to_cast, casts)
 
 @shared_task(ignore_result=False, name="post_trending_nfts")
 def sync_post_trending_nfts(post_on_twitter=True, post_on_farcaster=True):
@@ -131,7 +162,47 @@ def sync_post_24_hoa_tweets(post_on_twitter=True, post_on_farcaster=True):
 
 @shared_task(ignore_result=False, name="process_webhook")
 def sync_process_webhook(webhook_data):
-    async_to_sync(process_webhook)(webhook_data)
+    response = async_to_sync(process_webhook)(webhook_data)
+    # Each received NFT goes through its own chain of donation stages
+    for job in response.get('jobs', []):
+        chain(
+            sync_donation_fetch_metadata.s(job),
+            sync_donation_analyze.s(),
+            sync_donation_score.s(),
+            sync_donation_decide.s(),
+            sync_donation_store.s()
+        ).apply_async()
+    return response
+
+# Donation stages retry with exponential backoff. Persisted stage results
+# make a retry pick up where the previous attempt failed. Calls to SimpleHash
+# and the LLMs are paced inside the stages by limiters shared across workers.
+DONATION_STAGE_RETRY = dict(
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    retry_backoff_max=600,
+    retry_jitter=True
+)
+
+@shared_task(ignore_result=False, name="donation_fetch_metadata", max_retries=5, **DONATION_STAGE_RETRY)
+def sync_donation_fetch_metadata(job):
+    return async_to_sync(donation_fetch_metadata)(job)
+
+@shared_task(ignore_result=False, name="donation_analyze", max_retries=3, **DONATION_STAGE_RETRY)
+def sync_donation_analyze(job):
+    return async_to_sync(donation_analyze)(job)
+
+@shared_task(ignore_result=False, name="donation_score", max_retries=5, **DONATION_STAGE_RETRY)
+def sync_donation_score(job):
+    return async_to_sync(donation_score)(job)
+
+@shared_task(ignore_result=False, name="donation_decide", max_retries=3, **DONATION_STAGE_RETRY)
+def sync_donation_decide(job):
+    return async_to_sync(donation_decide)(job)
+
+@shared_task(ignore_result=False, name="donation_store", max_retries=5, **DONATION_STAGE_RETRY)
+def sync_donation_store(job):
+    return async_to_sync(donation_store)(job)
 
 @shared_task(ignore_result=False, name="process_neynar_webhook")
 def sync_process_neynar_webhook(webhook_data):
@@ -139,4 +210,18 @@ def sync_process_neynar_webhook(webhook_data):
 
 @shared_task(ignore_result=False, name="adjust_weights")
 def sync_adjust_weights():
-    async_to_sync(process_adjust_weights)()
\ No newline at end of file
+    if async_to_sync(process_adjust_weights)():
+        # New weights, so bring every stored total in line with them
+        sync_rescore_nft_scores.delay()
+
+@shared_task(ignore_result=False, name="rescore_nft_scores")
+def sync_rescore_nft_scores():
+    async_to_sync(rescore_nft_scores)()
+
+@shared_task(ignore_result=False, name="refresh_top_collections")
+def sync_refresh_top_collections():
+    async_to_sync(refresh_top_collections)()
+
+@shared_task(ignore_result=False, name="prefill_ens_cache")
+def sync_prefill_ens_cache():
+    async_to_sync(prefill_ens_cache)()
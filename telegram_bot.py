@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from telegram import Update
 from telegram.ext import ApplicationBuilder, ContextTypes, CommandHandler, MessageHandler, filters
@@ -128,8 +129,9 @@ async def link_wallet(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 # Store wallet address for user
                 save_telegram_user_wallet(user_id, wallet)
                 
-                # Get ARTTO balance
-                balance = get_artto_balance(wallet)
+                # Get ARTTO balance. The cached lookup can wait on another
+                # worker's fetch, so keep it off the event loop
+                balance = await asyncio.to_thread(get_artto_balance, wallet)
                 await context.bot.send_message(
                     chat_id=update.effective_chat.id,
                     text=f"Wallet verified and linked successfully! Your $ARTTO balance is {balance:,.0f}. You can now chat with me!"
@@ -219,7 +221,7 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
             
             # Check ARTTO balance
             try:
-                balance = get_artto_balance(wallet)
+                balance = await asyncio.to_thread(get_artto_balance, wallet)
                 if balance < MIN_ARTTO_BALANCE:
                     await context.bot.send_message(
                         chat_id=update.effective_chat.id,
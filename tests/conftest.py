@@ -0,0 +1,88 @@
+import pytest
+
+
+def _encode(value):
+    return value if isinstance(value, bytes) else str(value).encode()
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for the handful of redis-py commands the helpers use.
+    Expiry is recorded but not enforced; tests drop keys to simulate it.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.values:
+            return None
+        self.values[key] = _encode(value)
+        self.ttls[key] = ex
+        return True
+
+    def exists(self, *keys):
+        return sum(key in self.values for key in keys)
+
+    def delete(self, *keys):
+        return sum(self.values.pop(key, None) is not None for key in keys)
+
+    def sadd(self, key, *members):
+        members = {_encode(member) for member in members}
+        current = self.values.setdefault(key, set())
+        added = len(members - current)
+        current |= members
+        return added
+
+    def sismember(self, key, member):
+        return _encode(member) in self.values.get(key, set())
+
+    def hincrby(self, key, field, amount=1):
+        fields = self.values.setdefault(key, {})
+        fields[_encode(field)] = _encode(int(fields.get(_encode(field), 0)) + amount)
+        return int(fields[_encode(field)])
+
+    def hset(self, key, field, value):
+        self.values.setdefault(key, {})[_encode(field)] = _encode(value)
+        return 1
+
+    def hget(self, key, field):
+        return self.values.get(key, {}).get(_encode(field))
+
+    def expire(self, key, seconds):
+        if key not in self.values:
+            return False
+        self.ttls[key] = seconds
+        return True
+
+    def hgetall(self, key):
+        return dict(self.values.get(key, {}))
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        results = [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+        self.commands = []
+        return results
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
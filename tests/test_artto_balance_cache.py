@@ -0,0 +1,58 @@
+import pytest
+
+import helpers.artto_balance_cache as cache
+
+WALLET = "0xAbC123"
+CACHE_KEY = "artto_balance:0xabc123"
+LOCK_KEY = "artto_balance:lock:0xabc123"
+
+
+@pytest.fixture
+def balance_redis(monkeypatch, fake_redis):
+    monkeypatch.setattr(cache, "balance_redis", fake_redis)
+    return fake_redis
+
+
+def test_a_miss_is_fetched_cached_and_unlocked(balance_redis):
+    fetches = []
+
+    def fetch(wallet):
+        fetches.append(wallet)
+        return 12500.0
+
+    assert cache.get_cached_artto_balance(WALLET, fetch) == 12500.0
+    assert cache.get_cached_artto_balance(WALLET, fetch) == 12500.0
+    assert fetches == [WALLET]
+    assert balance_redis.ttls[CACHE_KEY] == cache.ARTTO_BALANCE_CACHE_TTL
+    assert not balance_redis.exists(LOCK_KEY)
+
+
+def test_failed_fetches_are_not_cached(balance_redis):
+    assert cache.get_cached_artto_balance(WALLET, lambda wallet: None) is None
+    assert not balance_redis.exists(CACHE_KEY)
+
+
+def test_a_waiter_gets_the_lock_holders_result(monkeypatch, balance_redis):
+    balance_redis.set(LOCK_KEY, 1)
+    # The lock holder finishes while this caller waits
+    monkeypatch.setattr(cache.time, "sleep", lambda seconds: balance_redis.set(CACHE_KEY, 900.0))
+
+    def fetch(wallet):
+        raise AssertionError("the waiter should not fetch")
+
+    assert cache.get_cached_artto_balance(WALLET, fetch) == 900.0
+
+
+def test_a_waiter_fetches_itself_when_the_holder_gives_up(monkeypatch, balance_redis):
+    balance_redis.set(LOCK_KEY, 1)
+    monkeypatch.setattr(cache.time, "sleep", lambda seconds: balance_redis.delete(LOCK_KEY))
+
+    assert cache.get_cached_artto_balance(WALLET, lambda wallet: 42.0) == 42.0
+
+
+def test_invalidation_drops_the_cached_balance(balance_redis):
+    balance_redis.set(CACHE_KEY, 12500.0)
+
+    cache.invalidate_artto_balance(WALLET)
+
+    assert not balance_redis.exists(CACHE_KEY)
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from helpers.artwork_analysis_codec import FlatArtworkAnalysis, load_record_columns
+from helpers.batch_scoring_helpers import SCORE_FIELDS, WEIGHT_FIELDS
+
+SCORES = tuple(range(27))
+WEIGHTS = (10.0, 20.0, 15.0, 10.0, 15.0, 15.0, 15.0)
+
+
+def test_analysis_survives_dumps_and_loads():
+    analysis = FlatArtworkAnalysis(SCORES, WEIGHTS, "Bold", "Dense linework").to_analysis()
+
+    restored = FlatArtworkAnalysis.loads(FlatArtworkAnalysis.from_analysis(analysis).dumps()).to_analysis()
+
+    assert restored == analysis
+    scoring = restored.artwork_scoring
+    assert scoring.technical_innovation.on_chain_data_usage == 0
+    assert scoring.artistic_merit.conceptual_depth.cultural_historical_reference == 6
+    assert scoring.ai_collector_perspective.cybernetic_resonance.surveillance_control_systems == 26
+    assert scoring.ai_collector_perspective_weight == 15.0
+
+
+def test_analysis_survives_the_nft_scores_columns_as_json():
+    flat = FlatArtworkAnalysis(SCORES, WEIGHTS, "Bold", "Dense linework")
+    record = {column: json.dumps(value) for column, value in flat.to_record().items()}
+
+    restored = FlatArtworkAnalysis.from_record(record)
+
+    assert restored.scores == SCORES
+    assert restored.weights == WEIGHTS
+    assert (restored.initial_impression, restored.detailed_analysis) == ("Bold", "Dense linework")
+    assert json.loads(record["scores"])["surveillance_control"] == 26
+    assert json.loads(record["weights"])["artistic_merit_weight"] == 20.0
+
+
+def test_dumps_is_a_versioned_flat_array():
+    values = json.loads(FlatArtworkAnalysis(SCORES, WEIGHTS, "Bold", "Dense linework").dumps())
+
+    assert values[0] == 1
+    assert len(values) == 1 + len(SCORE_FIELDS) + len(WEIGHT_FIELDS) + 2
+
+
+def test_loads_rejects_other_versions():
+    value = json.dumps([2, *SCORES, *WEIGHTS, "Bold", "Dense linework"])
+    with pytest.raises(ValueError):
+        FlatArtworkAnalysis.loads(value)
+
+
+def test_scores_from_record_needs_every_sub_score():
+    scores = dict(zip(SCORE_FIELDS, SCORES))
+    assert FlatArtworkAnalysis.scores_from_record({"scores": json.dumps(scores)}) == SCORES
+
+    del scores["surveillance_control"]
+    assert FlatArtworkAnalysis.scores_from_record({"scores": scores}) is None
+    assert FlatArtworkAnalysis.scores_from_record({"scores": None}) is None
+
+
+def test_load_record_columns_parses_only_the_json_columns():
+    record = {"scores": '{"awe_factor": 3}', "analysis_text": None, "image_url": '{"not": "json column"}'}
+
+    load_record_columns(record)
+
+    assert record == {"scores": {"awe_factor": 3}, "analysis_text": None, "image_url": '{"not": "json column"}'}
@@ -0,0 +1,62 @@
+import json
+
+import numpy as np
+import pytest
+
+from helpers.batch_scoring_helpers import SCORE_FIELDS, WEIGHT_FIELDS, weighted_score, score_arrays, score_records
+
+
+def scores_with(**values):
+    return [values.get(field, 0) for field in SCORE_FIELDS]
+
+
+def weights_with(**values):
+    return [values.get(field, 0) for field in WEIGHT_FIELDS]
+
+
+def test_weighted_score_scales_each_category_by_its_weight():
+    scores = dict(zip(SCORE_FIELDS, scores_with(technical_innovation_score=3, rarity_scarcity=3, collector_interest=3)))
+    weights = dict(zip(WEIGHT_FIELDS, weights_with(technical_innovation_weight=30, market_factors_weight=20)))
+
+    # 3 / 3 * 30 for technical innovation, (3 + 3) / 12 * 20 for market factors
+    assert weighted_score(scores, weights) == pytest.approx(40)
+
+
+def test_score_arrays_scores_rows_like_weighted_score():
+    rows = [
+        scores_with(technical_innovation_score=3),
+        scores_with(visual_balance=2, awe_factor=3, surveillance_control=1),
+    ]
+    weights = [15, 15, 15, 15, 15, 15, 10]
+
+    totals = score_arrays(rows, weights)
+
+    assert totals.shape == (2,)
+    assert totals[0] == pytest.approx(15)
+    assert totals[1] == pytest.approx(weighted_score(dict(zip(SCORE_FIELDS, rows[1])), dict(zip(WEIGHT_FIELDS, weights))))
+
+
+def test_score_arrays_treats_fractional_weights_as_percentages():
+    totals = score_arrays([scores_with(technical_innovation_score=3)], weights_with(technical_innovation_weight=0.3))
+    assert totals[0] == pytest.approx(30)
+
+
+def test_score_arrays_caps_totals_at_100():
+    assert score_arrays([[3] * len(SCORE_FIELDS)], [100] * len(WEIGHT_FIELDS))[0] == 100
+
+
+def test_score_arrays_applies_per_row_weights():
+    rows = [scores_with(technical_innovation_score=3)] * 2
+    weights = [weights_with(technical_innovation_weight=20), weights_with(technical_innovation_weight=50)]
+
+    assert np.allclose(score_arrays(rows, weights), [20, 50])
+
+
+def test_score_records_reads_the_stored_json_columns():
+    record = {
+        "scores": json.dumps(dict(zip(SCORE_FIELDS, scores_with(technical_innovation_score=3)))),
+        "weights": json.dumps(dict(zip(WEIGHT_FIELDS, weights_with(technical_innovation_weight=25)))),
+    }
+
+    assert score_records([record])[0] == pytest.approx(25)
+    assert score_records([record], weights=dict(zip(WEIGHT_FIELDS, weights_with(technical_innovation_weight=60))))[0] == pytest.approx(60)
@@ -0,0 +1,57 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+import helpers.donation_pipeline_helpers as pipeline
+
+STATE_KEY = pipeline.get_token_state_key("batch-1", "BASE_MAINNET", "0xAbC123", "7")
+
+
+@pytest.fixture
+def state_redis(monkeypatch, fake_redis):
+    monkeypatch.setattr(pipeline, "state_redis", fake_redis)
+    return fake_redis
+
+
+def test_token_state_is_per_delivery_and_ignores_contract_case():
+    assert STATE_KEY == pipeline.get_token_state_key("batch-1", "BASE_MAINNET", "0xabc123", "7")
+    assert STATE_KEY != pipeline.get_token_state_key("batch-2", "BASE_MAINNET", "0xabc123", "7")
+
+
+def test_stage_results_encode_numpy_values(state_redis):
+    pipeline.save_stage_result(STATE_KEY, "score", pipeline.dumps_stage_result({"total_score": np.float64(61.5)}))
+
+    assert pipeline.get_stage_result(STATE_KEY, "score") == '{"total_score": 61.5}'
+    assert state_redis.ttls[STATE_KEY] == pipeline.DONATION_STATE_TTL
+
+
+def test_only_one_job_claims_a_stage_until_it_is_released(state_redis):
+    assert pipeline.claim_stage(STATE_KEY, "analysis", ttl=60)
+    assert not pipeline.claim_stage(STATE_KEY, "analysis", ttl=60)
+
+    pipeline.release_stage(STATE_KEY, "analysis")
+
+    assert pipeline.claim_stage(STATE_KEY, "analysis", ttl=60)
+
+
+def test_a_waiter_gets_the_claimed_stage_result(monkeypatch, state_redis):
+    pipeline.claim_stage(STATE_KEY, "analysis", ttl=60)
+
+    async def finish_analysis(seconds):
+        pipeline.save_stage_result(STATE_KEY, "analysis", '{"initial_impression": "Bold"}')
+
+    monkeypatch.setattr(pipeline.asyncio, "sleep", finish_analysis)
+
+    assert asyncio.run(pipeline.wait_for_stage_result(STATE_KEY, "analysis", timeout=30)) == '{"initial_impression": "Bold"}'
+
+
+def test_a_waiter_stops_when_the_claim_is_given_up(monkeypatch, state_redis):
+    pipeline.claim_stage(STATE_KEY, "analysis", ttl=60)
+
+    async def give_up(seconds):
+        pipeline.release_stage(STATE_KEY, "analysis")
+
+    monkeypatch.setattr(pipeline.asyncio, "sleep", give_up)
+
+    assert asyncio.run(pipeline.wait_for_stage_result(STATE_KEY, "analysis", timeout=30)) is None
@@ -0,0 +1,39 @@
+import helpers.nft_metadata_cache as cache
+
+NFT_ID = "base.0xabc123.7"
+NFT = {
+    "name": "Grid #7",
+    "previews": {"image_small_url": "https://img/7"},
+    "last_sale": {"unit_price_usd_cents": 12500},
+    "owner_count": 1,
+    "collection": {"name": "Grids", "floor_prices": [{"value": 10 ** 16}], "distinct_owner_count": 40},
+}
+
+
+def test_static_and_market_parts_are_stored_under_their_own_ttls(monkeypatch, fake_redis):
+    monkeypatch.setattr(cache, "metadata_redis", fake_redis)
+
+    cache.set_cached_nfts({NFT_ID: NFT})
+
+    assert fake_redis.ttls[f"nft_metadata:static:{NFT_ID}"] == cache.NFT_METADATA_STATIC_TTL
+    assert fake_redis.ttls[f"nft_metadata:market:{NFT_ID}"] == cache.NFT_METADATA_MARKET_TTL
+    assert b"floor_prices" not in fake_redis.get(f"nft_metadata:static:{NFT_ID}")
+    assert b"Grid #7" not in fake_redis.get(f"nft_metadata:market:{NFT_ID}")
+    assert cache.get_cached_nfts([NFT_ID]) == {NFT_ID: NFT}
+
+
+def test_an_expired_market_part_is_a_miss(monkeypatch, fake_redis):
+    monkeypatch.setattr(cache, "metadata_redis", fake_redis)
+    cache.set_cached_nfts({NFT_ID: NFT})
+
+    fake_redis.delete(f"nft_metadata:market:{NFT_ID}")
+
+    assert cache.get_cached_nfts([NFT_ID]) == {}
+
+
+def test_missing_nfts_are_cached_as_none(monkeypatch, fake_redis):
+    monkeypatch.setattr(cache, "metadata_redis", fake_redis)
+
+    cache.set_missing_nfts([NFT_ID])
+
+    assert cache.get_cached_nfts([NFT_ID]) == {NFT_ID: None}
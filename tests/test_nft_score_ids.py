@@ -0,0 +1,19 @@
+from helpers.utils import get_nft_score_id
+
+
+def test_id_is_the_sha256_of_network_contract_and_token():
+    assert get_nft_score_id("BASE_MAINNET", "0xabc123", "7") == "7dcc5b15386dd10687efd56bf7a5a6fc8ace43abc623154094c14a4936fb90e5"
+
+
+def test_id_ignores_contract_address_case():
+    assert get_nft_score_id("BASE_MAINNET", "0xAbC123", "7") == get_nft_score_id("BASE_MAINNET", "0xabc123", "7")
+
+
+def test_id_differs_per_token_and_network():
+    assert get_nft_score_id("BASE_MAINNET", "0xabc123", "8") != get_nft_score_id("BASE_MAINNET", "0xabc123", "7")
+    assert get_nft_score_id("ETH_MAINNET", "0xabc123", "7") != get_nft_score_id("BASE_MAINNET", "0xabc123", "7")
+
+
+def test_integer_and_string_token_ids_match():
+    # The deterministic_ids migration hashes token_id::text
+    assert get_nft_score_id("BASE_MAINNET", "0xabc123", 7) == get_nft_score_id("BASE_MAINNET", "0xabc123", "7")
@@ -0,0 +1,47 @@
+import helpers.utils as utils
+
+
+class FakeRpcClient:
+    def __init__(self, failing_ids=()):
+        self.calls = []
+        self.failing_ids = set(failing_ids)
+
+    def rpc(self, name, params):
+        self.calls.append((name, params))
+        client = self
+
+        class Request:
+            def execute(self):
+                if any(row["id"] in client.failing_ids for row in params["updates"]):
+                    raise Exception("statement timeout")
+                return type("Result", (), {"data": params["updates"]})()
+
+        return Request()
+
+
+def use_client(monkeypatch, client):
+    monkeypatch.setattr(utils, "supabase", client)
+    monkeypatch.setattr(utils, "refresh_or_get_supabase_client", lambda: client)
+
+
+def test_image_urls_are_updated_through_the_rpc_in_chunks(monkeypatch):
+    client = FakeRpcClient()
+    use_client(monkeypatch, client)
+    updates = [{"id": f"id{i}", "image_url": f"https://img/{i}=s250"} for i in range(5)]
+
+    report = utils.update_nft_score_image_urls(updates, chunk_size=2)
+
+    assert [name for name, _ in client.calls] == ["update_nft_score_image_urls"] * 3
+    assert [len(params["updates"]) for _, params in client.calls] == [2, 2, 1]
+    assert report == {"data": updates, "failed_ids": []}
+
+
+def test_a_failed_chunk_reports_its_ids_and_the_rest_still_run(monkeypatch):
+    client = FakeRpcClient(failing_ids={"id2"})
+    use_client(monkeypatch, client)
+    updates = [{"id": f"id{i}", "image_url": f"https://img/{i}=s250"} for i in range(5)]
+
+    report = utils.update_nft_score_image_urls(updates, chunk_size=2)
+
+    assert report["failed_ids"] == ["id2", "id3"]
+    assert [row["id"] for row in report["data"]] == ["id0", "id1", "id4"]
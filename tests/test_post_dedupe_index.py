@@ -0,0 +1,90 @@
+import helpers.post_dedupe_index as index
+import helpers.utils as utils
+
+
+class FakePostsClient:
+    """Answers the in_ lookups get_replied_and_ignored_posts falls back to."""
+
+    def __init__(self, replied, ignored):
+        self.rows = {"posts_created": [{"parent_id": post_id} for post_id in replied],
+                     "ignore_posts": [{"id": post_id} for post_id in ignored]}
+        self.queries = []
+
+    def table(self, name):
+        client = self
+
+        class Query:
+            def select(self, column):
+                self.column = column
+                return self
+
+            def in_(self, column, values):
+                self.values = values
+                return self
+
+            def execute(self):
+                client.queries.append(name)
+                data = [row for row in client.rows[name] if row[self.column] in self.values]
+                return type("Result", (), {"data": data})()
+
+        return Query()
+
+
+def use_index(monkeypatch, fake_redis, client):
+    monkeypatch.setattr(index, "post_redis", fake_redis)
+    monkeypatch.setattr(utils, "supabase", client)
+    monkeypatch.setattr(utils, "refresh_or_get_supabase_client", lambda: client)
+
+
+def test_a_cold_index_is_warmed_once_and_then_read(monkeypatch, fake_redis):
+    client = FakePostsClient(replied=[], ignored=[])
+    use_index(monkeypatch, fake_redis, client)
+    warms = []
+
+    def warm():
+        warms.append(1)
+        index.add_to_post_index(replied_ids=["101"], ignored_ids=["202"])
+        index.mark_post_index_warm()
+
+    monkeypatch.setattr(utils, "warm_post_dedupe_index", warm)
+
+    assert utils.get_replied_and_ignored_posts(["101", "202", "303"]) == ({"101"}, {"202"})
+    assert utils.get_replied_and_ignored_posts(["101"]) == ({"101"}, set())
+    assert len(warms) == 1
+    assert client.queries == []
+    assert not fake_redis.exists(index.WARM_LOCK_KEY)
+
+
+def test_callers_query_supabase_while_another_caller_warms(monkeypatch, fake_redis):
+    client = FakePostsClient(replied=["101"], ignored=["202"])
+    use_index(monkeypatch, fake_redis, client)
+
+    def warm():
+        raise AssertionError("only the lock holder warms the index")
+
+    monkeypatch.setattr(utils, "warm_post_dedupe_index", warm)
+    assert index.claim_post_index_warm()
+
+    assert utils.get_replied_and_ignored_posts(["101", "202", "303"]) == ({"101"}, {"202"})
+    assert client.queries == ["posts_created", "ignore_posts"]
+
+
+def test_an_evicted_set_makes_the_index_cold(monkeypatch, fake_redis):
+    monkeypatch.setattr(index, "post_redis", fake_redis)
+    index.add_to_post_index(replied_ids=["101"], ignored_ids=["202"])
+    index.mark_post_index_warm()
+    assert index.is_post_index_warm()
+
+    fake_redis.delete(index.IGNORED_POSTS_KEY)
+    # A later SADD recreates the set, but without the sentinel
+    index.add_to_post_index(ignored_ids=["203"])
+
+    assert not index.is_post_index_warm()
+
+
+def test_the_empty_sentinel_is_never_reported_as_a_post(monkeypatch, fake_redis):
+    monkeypatch.setattr(index, "post_redis", fake_redis)
+    index.add_to_post_index(replied_ids=["", None, "101"])
+    index.mark_post_index_warm()
+
+    assert index.get_post_index_flags(["101", "102"]) == ({"101"}, set())
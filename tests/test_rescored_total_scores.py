@@ -0,0 +1,65 @@
+import helpers.utils as utils
+from helpers.artwork_analysis_codec import FlatArtworkAnalysis
+
+
+class FakeUpsertClient:
+    def __init__(self):
+        self.upserts = []
+
+    def table(self, name):
+        client = self
+
+        class Table:
+            def upsert(self, data, on_conflict):
+                client.upserts.append((name, data, on_conflict))
+                return self
+
+            def execute(self):
+                return type("Result", (), {"data": [client.upserts[-1][1]]})()
+
+        return Table()
+
+
+def test_current_total_score_prefers_the_rescored_total():
+    assert utils.get_current_total_score({"total_score": 61.5, "rescored_total_score": 48.25}) == 48.25
+
+
+def test_current_total_score_falls_back_to_the_stored_total():
+    assert utils.get_current_total_score({"total_score": 61.5, "rescored_total_score": None}) == 61.5
+    assert utils.get_current_total_score({"total_score": 61.5}) == 61.5
+
+
+def test_storing_a_fresh_score_clears_the_rescored_total(monkeypatch):
+    client = FakeUpsertClient()
+    monkeypatch.setattr(utils, "supabase", client)
+    monkeypatch.setattr(utils, "refresh_or_get_supabase_client", lambda: client)
+    analysis = FlatArtworkAnalysis([2] * 27, [10, 20, 15, 10, 15, 15, 15], "Bold", "Dense linework").to_analysis()
+
+    utils.store_nft_scores(
+        {
+            "artwork_analysis": analysis,
+            "metadata": {"name": "Grid #7"},
+            "image_small_url": "https://img/7=s250",
+            "chain": "BASE_MAINNET",
+            "contract_address": "0xAbC123",
+            "token_id": "7",
+        },
+        {
+            "flag_as_suspicious": False,
+            "source": "donation",
+            "sender_address": "0xsender",
+            "decision_reason": "Score is above threshold",
+            "total_score": 57.5,
+            "multiplier": 12.0,
+            "decay_factor": 1,
+            "collection_amount_decay": 1,
+            "reward_points": 690,
+        }
+    )
+
+    table, row, on_conflict = client.upserts[0]
+    assert (table, on_conflict) == ("nft_scores", "id")
+    assert row["total_score"] == 57.5
+    assert row["rescored_total_score"] is None
+    assert row["rescored_weights_id"] is None
+    assert utils.get_current_total_score(row) == 57.5
@@ -0,0 +1,40 @@
+import pytest
+
+import helpers.utils as utils
+
+
+class FlakySession:
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def get_client(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("gotrue unavailable")
+        return "client"
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(utils.time, "sleep", lambda seconds: None)
+
+
+def test_a_failed_sign_in_is_retried(monkeypatch):
+    session = FlakySession(failures=1)
+    monkeypatch.setattr(utils, "supabase_session", session)
+    monkeypatch.setattr(utils, "supabase", None)
+
+    assert utils.refresh_or_get_supabase_client() == "client"
+    assert utils.supabase == "client"
+    assert session.calls == 2
+
+
+def test_the_sign_in_error_is_raised_once_retries_run_out(monkeypatch):
+    session = FlakySession(failures=10)
+    monkeypatch.setattr(utils, "supabase_session", session)
+    monkeypatch.setattr(utils, "supabase", None)
+
+    with pytest.raises(ConnectionError):
+        utils.refresh_or_get_supabase_client()
+    assert session.calls == utils.SUPABASE_SESSION_RETRIES + 1
@@ -0,0 +1,54 @@
+from datetime import datetime, timezone
+
+import helpers.utils as utils
+
+
+class FakeLedgerClient:
+    def __init__(self):
+        self.inserts = []
+        self.rpcs = []
+
+    def table(self, name):
+        client = self
+
+        class Table:
+            def insert(self, data):
+                client.inserts.append((name, data))
+                return self
+
+            def execute(self):
+                return type("Result", (), {"data": [client.inserts[-1][1]]})()
+
+        return Table()
+
+    def rpc(self, name, params):
+        self.rpcs.append((name, params))
+        return type("Request", (), {"execute": lambda self: None})()
+
+
+def test_prune_keeps_the_last_hour_of_minutes_and_week_of_hours():
+    ledger = {
+        "minute_buckets": {"2026-10-18T11:30": [1, 5], "2026-10-18T11:31": [1, 2], "2026-10-18T12:30": [1, 1]},
+        "hour_buckets": {"2026-10-11T12": [1, 50], "2026-10-11T13": [1, 20], "2026-10-18T12": [1, 10]},
+    }
+
+    utils._prune_wallet_ledger(ledger, datetime(2026, 10, 18, 12, 30, tzinfo=timezone.utc))
+
+    assert ledger["minute_buckets"] == {"2026-10-18T11:31": [1, 2], "2026-10-18T12:30": [1, 1]}
+    assert ledger["hour_buckets"] == {"2026-10-11T13": [1, 20], "2026-10-18T12": [1, 10]}
+
+
+def test_activity_and_ledger_buckets_use_the_same_utc_time(monkeypatch):
+    client = FakeLedgerClient()
+    monkeypatch.setattr(utils, "supabase", client)
+    monkeypatch.setattr(utils, "refresh_or_get_supabase_client", lambda: client)
+
+    utils.set_wallet_activity("ERC20_TRANSFER", "0xartto", "0xSender", "None", "BASE_MAINNET", "0x9239", 1500)
+
+    created_at = datetime.fromisoformat(client.inserts[0][1]["created_at"])
+    assert created_at.utcoffset().total_seconds() == 0
+    name, params = client.rpcs[0]
+    assert name == "record_wallet_transfer"
+    assert params["p_wallet_address"] == "0xsender"
+    assert params["p_amount"] == 1500
+    assert params["p_hour_key"] == created_at.strftime("%Y-%m-%dT%H")
@@ -0,0 +1,53 @@
+import pytest
+
+import helpers.webhook_dedupe_helpers as dedupe
+
+WEBHOOK = {
+    "type": "ADDRESS_ACTIVITY",
+    "event": {
+        "network": "BASE_MAINNET",
+        "activity": [
+            {"hash": "0xaa", "log": {"logIndex": "0x1"}, "erc721TokenId": "0x7"},
+            {"hash": "0xbb", "log": {"logIndex": "0x2"}, "erc1155Metadata": [{"tokenId": "0x1"}, {"tokenId": "0x2"}]},
+        ],
+    },
+}
+
+
+def test_a_redelivered_webhook_is_dropped(monkeypatch, fake_redis):
+    monkeypatch.setattr(dedupe, "dedupe_redis", fake_redis)
+
+    payload, claimed_keys = dedupe.dedupe_webhook_activities(WEBHOOK)
+    assert payload == WEBHOOK
+    assert len(claimed_keys) == 3
+
+    assert dedupe.dedupe_webhook_activities(WEBHOOK) == (None, [])
+    assert dedupe.get_webhook_dedupe_stats() == {"claimed": 3, "duplicates": 3}
+
+
+def test_only_the_unclaimed_erc1155_tokens_are_kept(monkeypatch, fake_redis):
+    monkeypatch.setattr(dedupe, "dedupe_redis", fake_redis)
+    dedupe.claim_transfer(dedupe.get_transfer_idempotency_key("BASE_MAINNET", "0xbb", "0x2", "0x1"))
+
+    payload, claimed_keys = dedupe.dedupe_webhook_activities(WEBHOOK)
+
+    assert payload["event"]["activity"][1]["erc1155Metadata"] == [{"tokenId": "0x2"}]
+    assert len(claimed_keys) == 2
+
+
+def test_claims_made_before_a_redis_failure_are_released(monkeypatch, fake_redis):
+    monkeypatch.setattr(dedupe, "dedupe_redis", fake_redis)
+    set_key = fake_redis.set
+    calls = []
+
+    def failing_set(key, value, **kwargs):
+        calls.append(key)
+        if len(calls) == 3:
+            raise ConnectionError("redis went away")
+        return set_key(key, value, **kwargs)
+
+    monkeypatch.setattr(fake_redis, "set", failing_set)
+
+    with pytest.raises(ConnectionError):
+        dedupe.dedupe_webhook_activities(WEBHOOK)
+    assert fake_redis.exists(*calls[:2]) == 0
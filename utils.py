@@ -23,6 +23,24 @@ def create_app() -> Flask:
             result_backend=os.getenv('CELERY_BROKER_URL', 'redis://localhost'),
             task_ignore_result=True,
             timezone='America/New_York',
+            # Webhooks get their own queue so they never wait behind scheduled
+            # posting tasks, which can run (and sleep) for minutes. Everything not
+            # routed below goes to the batch queue. See "Running the workers" in
+            # the README for the worker profile that consumes each queue.
+            task_default_queue="batch",
+            # Don't let a worker reserve messages it can't start yet
+            worker_prefetch_multiplier=int(os.getenv('CELERY_PREFETCH_MULTIPLIER', 1)),
+            task_routes={
+                "process_webhook": {"queue": "webhooks"},
+                "process_neynar_webhook": {"queue": "webhooks"},
+                "answer_specific_cast": {"queue": "webhooks"},
+                # Each donation stage has its own queue so its workers can be scaled separately
+                "donation_fetch_metadata": {"queue": "donation_metadata"},
+                "donation_analyze": {"queue": "donation_analysis"},
+                "donation_score": {"queue": "donation_scoring"},
+                "donation_decide": {"queue": "donation_decision"},
+                "donation_store": {"queue": "donation_store"},
+            },
             beat_schedule={
                 "post_recent_activity_every_day_at_2PM": {
                     "task": "post_recent_activity",
@@ -67,6 +85,11 @@ def create_app() -> Flask:
                     "schedule": crontab(minute=10, hour='*/4')
                 },
 
+                "index_image_hashes_every_4_hours": {
+                    "task": "index_image_hashes",
+                    "schedule": crontab(minute=20, hour='*/4')
+                },
+
                 # Farcaster Only
                 "post_channel_casts_every_2_hours": {
                     "task": "post_channel_casts",
@@ -117,7 +140,24 @@ def create_app() -> Flask:
                     "task": "adjust_weights",
                     "schedule": crontab(minute=0, hour='10,22')
                 },
+
+                # Picks up weights added outside adjust_weights and resumes
+                # interrupted runs; returns right away when up to date
+                "rescore_nft_scores_every_hour": {
+                    "task": "rescore_nft_scores",
+                    "schedule": crontab(minute=40, hour='*/1')
+                },
     
+                "refresh_top_collections_every_24_hours": {
+                    "task": "refresh_top_collections",
+                    "schedule": crontab(minute=5, hour=4)
+                },
+
+                "prefill_ens_cache_every_24_hours": {
+                    "task": "prefill_ens_cache",
+                    "schedule": crontab(minute=20, hour=4)
+                },
+
                 "refresh_twitter_token_every_2_hours": {
                     "task": "refresh_twitter_token",
                     "schedule": 7200
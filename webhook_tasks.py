@@ -5,12 +5,62 @@ from helpers.farcaster_helpers import *
 from helpers.coinbase_helpers import *
 from helpers.twitter_helpers import *
 from helpers.artto_decision_helpers import *
+from helpers.donation_pipeline_helpers import *
 
+import json
+import uuid
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Map webhook network names to simplehash network names
+NETWORK_MAPPING = {
+    'BASE_MAINNET': 'base',
+    'ETH_MAINNET': 'ethereum', 
+    'SHAPE_MAINNET': 'shape',
+    'ZORA_MAINNET': 'zora'
+}
+
+
+def get_incoming_nft_transfers(activities):
+    """
+    Flatten the activities of an ADDRESS_ACTIVITY webhook into one entry per
+    NFT received by our wallet. ERC1155 activities can carry several token IDs.
+
+    Returns:
+        list: (event_type, from_address, contract_address, token_id) tuples
+    """
+    our_addresses = [os.getenv('ARTTO_ADDRESS_SEPOLIA').lower(), os.getenv('ARTTO_ADDRESS_MAINNET').lower()]
+    transfers = []
+    for activity in activities:
+        if not ('erc721TokenId' in activity or 'erc1155Metadata' in activity):
+            logger.info(f"Skipping activity - not an ERC721 or ERC1155 token transfer")
+            continue
+
+        # Only process incoming transfers to our wallet
+        if activity['toAddress'].lower() not in our_addresses:
+            logger.info(f"Skipping activity - transfer not to our wallet address")
+            continue
+
+        from_address = activity['fromAddress']
+        contract_address = activity['rawContract']['address']
+
+        if 'erc721TokenId' in activity:
+            token_id = str(int(activity['erc721TokenId'], 16))  # Convert hex to decimal
+            transfers.append(("ERC721_TRANSFER", from_address, contract_address, token_id))
+        else:
+            for token in activity['erc1155Metadata']:
+                token_id = str(int(token['tokenId'], 16))
+                transfers.append(("ERC1155_TRANSFER", from_address, contract_address, token_id))
+    return transfers
+
+
 async def process_webhook(webhook_data):
+    """
+    Record every incoming NFT transfer in an ADDRESS_ACTIVITY webhook and
+    return one donation pipeline job per transfer. The caller runs each job
+    through the donation stages below.
+    """
     try:
         # Skip if not an ADDRESS_ACTIVITY event
         if webhook_data.get('type') != 'ADDRESS_ACTIVITY':
@@ -19,135 +69,61 @@ async def process_webhook(webhook_data):
                 'status': 'skipped',
                 'reason': 'Not ADDRESS_ACTIVITY event'
             }
-        
-        activity = webhook_data['event']['activity'][0]
-
-        # Skip if not an ERC721 token transfer
-        if not ('erc721TokenId' in activity or 'erc1155Metadata' in activity):
-            logger.info(f"Skipping - not an ERC721 or ERC1155 token transfer")
-            return {
-                'status': 'skipped',
-                'reason': 'Not ERC721 or ERC1155 transfer'
-            }
-        
-        if 'erc721TokenId' in activity:
-            token_id = str(int(activity['erc721TokenId'], 16))  # Convert hex to decimal
-            event_type = "ERC721_TRANSFER"
-        elif 'erc1155Metadata' in activity:
-            token_id = str(int(activity['erc1155Metadata'][0]['tokenId'], 16))
-            event_type = "ERC1155_TRANSFER"
-        else:
-            print("No token ID found")
-            return {
-                'status': 'skipped',
-                'reason': 'No token ID found'
-            }
-        
-        to_address = activity['toAddress']
-
-        # Only process if this is an incoming transfer to our wallet
-        if to_address.lower() not in [os.getenv('ARTTO_ADDRESS_SEPOLIA').lower(), os.getenv('ARTTO_ADDRESS_MAINNET').lower()]:
-            logger.info(f"Skipping - transfer not to our wallet address")
-            return {
-                'status': 'skipped', 
-                'reason': 'Not incoming transfer'
-            }
 
         webhook_network = webhook_data['event']['network']
 
-        # Map webhook network names to simplehash network names
-        network_mapping = {
-            'BASE_MAINNET': 'base',
-            'ETH_MAINNET': 'ethereum', 
-            'SHAPE_MAINNET': 'shape',
-            'ZORA_MAINNET': 'zora'
-        }
-
-        # Get simplehash network name from mapping, default to webhook network name
-        simplehash_network = network_mapping.get(webhook_network, webhook_network)
-        
-        # All mainnet networks use the same wallet address
-        current_wallet_address = os.getenv('ARTTO_ADDRESS_MAINNET')
-        
-        if not webhook_network in network_mapping:
+        if not webhook_network in NETWORK_MAPPING:
             return {
                 'status': 'skipped',
                 'reason': f'Unsupported network: {webhook_network}'
             }
         logger.info(f"Processing {webhook_network}")
 
-        from_address = activity['fromAddress']
-        contract_address = activity['rawContract']['address']
-        
-        post_content = f"I just received token #{token_id} from {from_address}!"
-        
-        print(post_content)
-        print("network:", webhook_network)
-        print("contract_address:", contract_address)
-        print("token_id:", token_id)
-
-        try:
-            set_wallet_activity(
-                event_type=event_type, 
-                from_address=from_address, 
-                to_address=current_wallet_address, 
-                token_id=token_id, 
-                network=webhook_network, 
-                contract_address=contract_address, 
-                amount=1
-            )
-        except Exception as e:
-            print(f"Error setting wallet activity: {str(e)}")
+        transfers = get_incoming_nft_transfers(webhook_data['event']['activity'])
+        if not transfers:
             return {
-                'status': 'error',
-                'error': str(e)
+                'status': 'skipped',
+                'reason': 'No incoming ERC721 or ERC1155 transfers'
             }
 
-        sender_address = from_address
-
-        response = await get_artwork_analysis_and_metadata(
-            simplehash_network,
-            contract_address,
-            token_id
-        )
-
-        artwork_analysis = response["artwork_analysis"]
-        metadata = response["metadata"]
-
-        nft_details = {
-            "artwork_analysis": artwork_analysis,
-            "image_small_url": metadata["image_small_url"],
-            "chain": simplehash_network,
-            "contract_address": contract_address,
-            "token_id": token_id,
-            "metadata": metadata
-        }
-
-        score_details = await get_total_score(artwork_analysis, nft_details, sender_address)
-
-        print("Getting final decision")
-        final_decision = await get_final_decision(artwork_analysis, metadata, from_address, score_details)
+        # All mainnet networks use the same wallet address
+        current_wallet_address = os.getenv('ARTTO_ADDRESS_MAINNET')
 
-        decision = final_decision.decision
-        rationale_post = final_decision.rationale_post
+        # Transfers of the same token in this delivery share metadata and analysis
+        batch_id = str(uuid.uuid4())
+        jobs = []
+        for event_type, from_address, contract_address, token_id in transfers:
+            print(f"I just received token #{token_id} from {from_address}!")
+            print("network:", webhook_network)
+            print("contract_address:", contract_address)
+            print("token_id:", token_id)
 
-        try:
-            reward_points = score_details["reward_points"]
-        except:
-            reward_points = 0
-        print("Reward points:", reward_points)
-        store_nft_scores(nft_details, score_details, final_decision)
+            try:
+                set_wallet_activity(
+                    event_type=event_type, 
+                    from_address=from_address, 
+                    to_address=current_wallet_address, 
+                    token_id=token_id, 
+                    network=webhook_network, 
+                    contract_address=contract_address, 
+                    amount=1
+                )
+            except Exception as e:
+                print(f"Error setting wallet activity: {str(e)}")
+                continue
 
-        print("Decision:", decision)
-        print("Rationale:", rationale_post)
-        
+            jobs.append({
+                "job_id": str(uuid.uuid4()),
+                "batch_id": batch_id,
+                "network": NETWORK_MAPPING[webhook_network],
+                "contract_address": contract_address,
+                "token_id": token_id,
+                "from_address": from_address
+            })
 
         return {
-            'status': 'success',
-            'decision': decision,
-            'rationale': rationale_post,
-            'metadata': metadata,
-            'artwork_analysis': artwork_analysis
+            'status': 'success' if jobs else 'error',
+            'jobs': jobs
         }
 
     except Exception as e:
@@ -158,6 +134,151 @@ async def process_webhook(webhook_data):
             'error': str(e)
         }
 
+
+# Donation pipeline stages. Each stage takes the job dict, persists its
+# result, and returns the job for the next stage. A stage whose result is
+# already persisted returns straight away, so a retried chain resumes where
+# it failed instead of redoing the vision call. Stages raise on failure so
+# the Celery task wrapping them can retry.
+
+# Shared by every worker, unlike a Celery rate_limit which is per worker
+donation_metadata_rate_limiter = SharedRateLimiter(
+    "donation_metadata", int(os.getenv('DONATION_METADATA_CALLS_PER_MINUTE', 60))
+)
+donation_analysis_rate_limiter = SharedRateLimiter(
+    "donation_analysis", int(os.getenv('DONATION_ANALYSIS_CALLS_PER_MINUTE', 20))
+)
+donation_decision_rate_limiter = SharedRateLimiter(
+    "donation_decision", int(os.getenv('DONATION_DECISION_CALLS_PER_MINUTE', 30))
+)
+# How long a transfer waits for another transfer of the same token to finish its analysis
+DONATION_ANALYSIS_LOCK_TTL = 300
+
+
+def _get_token_state_key(job):
+    # Jobs enqueued before batch_id existed get state of their own
+    return get_token_state_key(job.get("batch_id", job["job_id"]), job["network"], job["contract_address"], job["token_id"])
+
+
+def _get_nft_details(job, metadata, artwork_analysis):
+    return {
+        "artwork_analysis": artwork_analysis,
+        "image_small_url": metadata["image_small_url"],
+        "chain": job["network"],
+        "contract_address": job["contract_address"],
+        "token_id": job["token_id"],
+        "metadata": metadata
+    }
+
+
+def _load_metadata_and_analysis(job):
+    token_state_key = _get_token_state_key(job)
+    metadata = json.loads(get_stage_result(token_state_key, "metadata"))
+    artwork_analysis = FlatArtworkAnalysis.loads(get_stage_result(token_state_key, "artwork_analysis")).to_analysis()
+    return metadata, artwork_analysis
+
+
+async def donation_fetch_metadata(job):
+    token_state_key = _get_token_state_key(job)
+    if get_stage_result(token_state_key, "metadata") is not None:
+        return job
+
+    print("Getting NFT metadata")
+    await donation_metadata_rate_limiter.acquire()
+    metadata = await get_nft_metadata(job["network"], job["contract_address"], job["token_id"])
+    if metadata is None:
+        raise ValueError(f"No metadata for {job['contract_address']} #{job['token_id']}")
+
+    save_stage_result(token_state_key, "metadata", dumps_stage_result(metadata))
+    return job
+
+
+async def donation_analyze(job):
+    token_state_key = _get_token_state_key(job)
+    if get_stage_result(token_state_key, "artwork_analysis") is not None:
+        return job
+
+    if not claim_stage(token_state_key, "artwork_analysis", DONATION_ANALYSIS_LOCK_TTL):
+        # Another transfer of this token is analyzing it
+        if await wait_for_stage_result(token_state_key, "artwork_analysis", DONATION_ANALYSIS_LOCK_TTL) is not None:
+            return job
+        raise RuntimeError(f"Shared analysis of {job['contract_address']} #{job['token_id']} didn't finish")
+
+    try:
+        metadata = json.loads(get_stage_result(token_state_key, "metadata"))
+        artwork_analysis = await get_artwork_analysis(metadata, donation_analysis_rate_limiter)
+        save_stage_result(token_state_key, "artwork_analysis", FlatArtworkAnalysis.from_analysis(artwork_analysis).dumps())
+    finally:
+        release_stage(token_state_key, "artwork_analysis")
+    return job
+
+
+async def donation_score(job):
+    job_state_key = get_job_state_key(job["job_id"])
+    if get_stage_result(job_state_key, "score_details") is not None:
+        return job
+
+    metadata, artwork_analysis = _load_metadata_and_analysis(job)
+    nft_details = _get_nft_details(job, metadata, artwork_analysis)
+
+    # The sender's ENS name is only needed by the decision, look it up while scoring
+    latency = {}
+    score_details, ens_name = await asyncio.gather(
+        get_total_score(artwork_analysis, nft_details, job["from_address"]),
+        timed(latency, "ens_lookup", get_ens_name_async(job["from_address"]))
+    )
+    score_details["latency"].update(latency)
+
+    save_stage_result(job_state_key, "ens_name", ens_name or job["from_address"])
+    save_stage_result(job_state_key, "score_details", dumps_stage_result(score_details))
+    return job
+
+
+async def donation_decide(job):
+    job_state_key = get_job_state_key(job["job_id"])
+    if get_stage_result(job_state_key, "final_decision") is not None:
+        return job
+
+    metadata, artwork_analysis = _load_metadata_and_analysis(job)
+    score_details = json.loads(get_stage_result(job_state_key, "score_details"))
+    ens_name = get_stage_result(job_state_key, "ens_name")
+
+    print("Getting final decision")
+    latency = {}
+    await donation_decision_rate_limiter.acquire()
+    final_decision = await timed(latency, "final_decision", get_final_decision(
+        artwork_analysis, metadata, job["from_address"], score_details, ens_name=ens_name
+    ))
+    score_details["latency"].update(latency)
+    print("Latency (ms):", score_details["latency"])
+
+    save_stage_result(job_state_key, "score_details", dumps_stage_result(score_details))
+    save_stage_result(job_state_key, "final_decision", final_decision.model_dump_json())
+    return job
+
+
+async def donation_store(job):
+    job_state_key = get_job_state_key(job["job_id"])
+    metadata, artwork_analysis = _load_metadata_and_analysis(job)
+    score_details = json.loads(get_stage_result(job_state_key, "score_details"))
+    final_decision = AcquireOrReject.model_validate_json(get_stage_result(job_state_key, "final_decision"))
+
+    print("Reward points:", score_details.get("reward_points", 0))
+    store_nft_scores(_get_nft_details(job, metadata, artwork_analysis), score_details, final_decision)
+
+    print("Decision:", final_decision.decision)
+    print("Rationale:", final_decision.rationale_post)
+
+    clear_job_state(job["job_id"])
+    return {
+        'status': 'success',
+        'job_id': job["job_id"],
+        'contract_address': job["contract_address"],
+        'token_id': job["token_id"],
+        'decision': final_decision.decision,
+        'rationale': final_decision.rationale_post
+    }
+
 async def process_neynar_webhook(webhook_data):
     data = webhook_data      
     # Extract relevant data from webhook payload
@@ -168,8 +289,7 @@ async def process_neynar_webhook(webhook_data):
     cast_details = get_cast_details(cast)
     print("Responding to cast:", cast_details)
     post_params = generate_post_params()
-    posts_replied_to = get_all_posts_replied_to()
-    if any(p['parent_id'] == cast["hash"] for p in posts_replied_to):
+    if check_post_replied_to(cast["hash"]):
         print("Already replied to this parent")
         return
     reply, nft_details, score_details = await get_reply(cast_details, post_params)